@@ -0,0 +1,5 @@
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+SIZES_ENV = "ADRM_BENCH_SIZES"
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
@@ -0,0 +1,83 @@
+import asyncio
+import itertools
+
+import structlog
+
+from adrm.core.container import AppContainer
+from adrm.core.models import AiderCoderConfig, AiderConfig, ConfigModel, FakeBackendConfig, FileContextConfig, Step
+from adrm.infrastructure.file_context import FileContextHandler
+from adrm.infrastructure.file_handlers import LocalFileHandler
+from adrm.integrations.aider_client import AiderClient
+from adrm.services.step_runner import StepRunner
+
+GLOB_PATTERNS = ["src/**/*.py", "lib/pkg1/*.py", "docs/**/*.md", "tests/pkg2/**/*.py"]
+INCLUDE_PATTERNS = ["*.py", "*.js"]
+EXCLUDE_PATTERNS = ["tests/", "*_test.py", "lib/pkg3/", "module4?.py"]
+WRITES_PER_ROUND = 200
+
+quiet_logger = structlog.wrap_logger(structlog.ReturnLogger())
+
+
+def fake_aider_config(**coder) -> AiderConfig:
+    return AiderConfig(
+        model_name="bench-model",
+        backend="fake",
+        fake=FakeBackendConfig(latency_ms=0, tokens_per_second=1e9, seed=0),
+        coder=AiderCoderConfig(include_patterns=INCLUDE_PATTERNS, exclude_patterns=EXCLUDE_PATTERNS, **coder),
+        chat_history_file=None
+    )
+
+
+def bench_glob_resolution(benchmark, repo):
+    handler = FileContextHandler(config=FileContextConfig(index_path=None))
+    handler.resolve(GLOB_PATTERNS)
+    resolved = benchmark(handler.resolve, GLOB_PATTERNS)
+    assert resolved
+
+
+def bench_filter_files(benchmark, repo):
+    _, paths = repo
+    client = AiderClient(fake_aider_config(), quiet_logger)
+    try:
+        filtered = benchmark(client._filter_files, paths)
+    finally:
+        client.close()
+    assert 0 < len(filtered) < len(paths)
+
+
+def bench_config_load(benchmark, repo):
+    container = benchmark(AppContainer, {"aider_config.backend": "fake"})
+    container["aider_client"].close()
+
+
+def bench_file_handler_writes(benchmark, repo):
+    root, _ = repo
+    handler = LocalFileHandler(max_cache_entries=WRITES_PER_ROUND)
+    rounds = itertools.count()
+
+    def write_round():
+        generation = next(rounds)
+        with handler.batch():
+            for index in range(WRITES_PER_ROUND):
+                handler.handle(root / "build" / f"out{index}.txt", f"{generation}:{index}\n")
+
+    benchmark(write_round)
+    handler.close()
+
+
+def bench_run_step(benchmark, repo):
+    config = ConfigModel(
+        directories={"src": "src"},
+        openai_model="bench-model",
+        openai_api_key="bench-key",
+        file_context=FileContextConfig(index_path=None)
+    )
+    client = AiderClient(fake_aider_config(allow_edits=False), quiet_logger)
+    runner = StepRunner(config, quiet_logger, FileContextHandler(config=config.file_context), client)
+    step = Step(prompt="Add type hints", files=["lib/pkg1/*.py", "src/pkg0/*.py"])
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(lambda: loop.run_until_complete(runner.run_step(step)))
+    finally:
+        loop.close()
+        client.close()
@@ -0,0 +1,34 @@
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from adrm.bench import DEFAULT_SIZES, SIZES_ENV
+from adrm.bench.synthetic import make_repo
+
+
+def bench_sizes() -> List[int]:
+    value = os.environ.get(SIZES_ENV)
+    if not value:
+        return list(DEFAULT_SIZES)
+    return [int(size) for size in value.split(",") if size.strip()]
+
+
+def pytest_generate_tests(metafunc):
+    if "repo_size" in metafunc.fixturenames:
+        metafunc.parametrize("repo_size", bench_sizes(), ids=lambda size: f"{size}files", scope="session")
+
+
+@pytest.fixture(scope="session")
+def synthetic_repo(repo_size, tmp_path_factory) -> Tuple[Path, List[str]]:
+    root = tmp_path_factory.mktemp(f"repo{repo_size}")
+    return root, make_repo(root, repo_size)
+
+
+@pytest.fixture
+def repo(synthetic_repo, monkeypatch) -> Tuple[Path, List[str]]:
+    # Handlers resolve paths against the working directory
+    root, paths = synthetic_repo
+    monkeypatch.chdir(root)
+    return root, paths
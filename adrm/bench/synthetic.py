@@ -0,0 +1,43 @@
+import random
+from pathlib import Path
+from typing import List
+
+TOP_DIRECTORIES = ["src", "lib", "tests", "docs", "scripts"]
+EXTENSIONS = [".py", ".py", ".py", ".js", ".md", ".json", ".txt"]
+FILES_PER_DIRECTORY = 50
+SUBDIRECTORIES = 8
+
+
+def synthetic_paths(count: int, seed: int = 0) -> List[str]:
+    # A balanced tree: FILES_PER_DIRECTORY files per directory, SUBDIRECTORIES
+    # package directories per level below each top-level directory
+    rng = random.Random(seed)
+    paths = []
+    directory = 0
+    while len(paths) < count:
+        parts = [TOP_DIRECTORIES[directory % len(TOP_DIRECTORIES)]]
+        index = directory // len(TOP_DIRECTORIES)
+        while index:
+            index, remainder = divmod(index - 1, SUBDIRECTORIES)
+            parts.append(f"pkg{remainder}")
+        for position in range(min(FILES_PER_DIRECTORY, count - len(paths))):
+            paths.append("/".join(parts + [f"module{position}{rng.choice(EXTENSIONS)}"]))
+        directory += 1
+    return paths
+
+
+def make_repo(root: Path, count: int, seed: int = 0) -> List[str]:
+    paths = synthetic_paths(count, seed)
+    marker = root / f".synthetic-{count}-{seed}"
+    if marker.exists():
+        return paths
+    created = set()
+    for rel_path in paths:
+        full_path = root / rel_path
+        if full_path.parent not in created:
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            created.add(full_path.parent)
+        full_path.write_text(f"# {rel_path}\nVALUE = {len(rel_path)}\n", encoding="utf-8")
+    (root / ".gitignore").write_text("build/\n*.log\n", encoding="utf-8")
+    marker.touch()
+    return paths
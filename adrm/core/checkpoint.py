@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from adrm.core.models import Step
+
+
+def relative_path(path: str, root: Optional[Path] = None) -> str:
+    # Paths inside root are recorded relative to it, so moving or re-cloning
+    # the repository keeps its checkpoints valid
+    if root is None or not os.path.isabs(path):
+        return path
+    try:
+        return Path(path).relative_to(root).as_posix()
+    except ValueError:
+        return path
+
+
+def prompt_hash(step: Step, root: Optional[Path] = None) -> str:
+    # Everything about a step except its resolved inputs
+    payload = {
+        "prompt": step.prompt,
+        "files": [relative_path(file_path, root) for file_path in step.files],
+        "allow_edits": step.allow_edits,
+        "model_name": step.model_name,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def journal_path(root: Path, steps_file: Path) -> Path:
+    source = relative_path(str(steps_file.resolve()), root.resolve())
+    name = hashlib.sha256(source.encode()).hexdigest()[:16]
+    return root / ".adrm" / "checkpoints" / f"{name}.jsonl"
+
+
+# Append-only JSON-lines journal of workflow state transitions and completed
+# steps. A completed step records its prompt hash and the hashes of its files
+# as they were after the step ran, so a resumed run can skip it when neither
+# changed since.
+class CheckpointJournal:
+    def __init__(self, path: Path):
+        self.path = path
+        self.state: Optional[str] = None
+        self._steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "CheckpointJournal":
+        self.state = None
+        self._steps = {}
+        if not self.path.exists():
+            return self
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted write is ignored
+                continue
+            if record.get("type") == "state":
+                self.state = record["state"]
+            elif record.get("type") == "step":
+                self._steps[record["key"]] = record
+        return self
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = None
+            self._steps = {}
+            if self.path.exists():
+                self.path.unlink()
+
+    def record_state(self, state: str) -> None:
+        self.state = state
+        self._append({"type": "state", "state": state})
+
+    def record_step(self, key: str, step_hash: str, file_hashes: Dict[str, str]) -> None:
+        record = {"type": "step", "key": key, "prompt_hash": step_hash, "files": file_hashes}
+        self._steps[key] = record
+        self._append(record)
+
+    def is_complete(self, key: str, step_hash: str, file_hashes: Dict[str, str]) -> bool:
+        record = self._steps.get(key)
+        return bool(record) and record["prompt_hash"] == step_hash and record["files"] == file_hashes
+
+    def completed_steps(self) -> int:
+        return len(self._steps)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record["at"] = time.time()
+        line = json.dumps(record, sort_keys=True) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from adrm.core.models import AiderConfig, ConfigModel
+
+CACHE_VERSION = 2
+ENV_PREFIX = "ADRM__"
+MODEL_ENV = "ADRM_MODEL"
+# API keys from the environment or CLI are applied after loading, so they
+# never reach the on-disk cache
+API_KEY_ENV = "ADRM_API_KEY"
+API_KEY_OVERRIDE = "openai_api_key"
+SECRET_KEYS = frozenset({"openai_api_key", "aider_config.api_key"})
+
+
+def default_config_dir() -> Path:
+    project_dir = Path.cwd() / "config"
+    if (project_dir / "config.yaml").exists():
+        return project_dir
+    return Path(__file__).parent.parent.parent / "config"
+
+
+def deep_merge(base: Dict[str, Any], override: Mapping[str, Any]) -> Dict[str, Any]:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def set_dotted(target: Dict[str, Any], dotted_key: str, value: Any) -> None:
+    *parents, leaf = dotted_key.split(".")
+    for part in parents:
+        target = target.setdefault(part, {})
+    target[leaf] = value
+
+
+@dataclass
+class LoadedConfig:
+    config: ConfigModel
+    aider: AiderConfig
+    cache_hit: bool
+    load_ms: float
+    sources: List[str] = field(default_factory=list)
+
+
+# Merges config.yaml, aider.yaml, ADRM_* environment variables and CLI overrides
+# into ConfigModel/AiderConfig. The validated result is stored as JSON under a
+# key derived from the source contents, so unchanged inputs skip YAML parsing
+# and merging. The cache is plain data and never holds API keys; a config
+# whose YAML contains a key is not cached at all.
+class ConfigLoader:
+    def __init__(
+        self,
+        config_dir: Optional[Path] = None,
+        cache_path: Optional[Path] = None,
+        environ: Optional[Mapping[str, str]] = None
+    ):
+        self.config_dir = Path(config_dir) if config_dir else default_config_dir()
+        self.sources = [self.config_dir / "config.yaml", self.config_dir / "aider.yaml"]
+        self.cache_path = cache_path
+        self.environ = os.environ if environ is None else environ
+
+    def load(self, overrides: Optional[Dict[str, Any]] = None) -> LoadedConfig:
+        start = time.perf_counter()
+        overrides = {k: v for k, v in (overrides or {}).items() if v is not None}
+        plain_overrides = {k: v for k, v in overrides.items() if k != API_KEY_OVERRIDE}
+        if "openai_model" in plain_overrides:
+            plain_overrides.setdefault("aider_config.model_name", plain_overrides["openai_model"])
+        source_bytes = [(path, path.read_bytes() if path.exists() else None) for path in self.sources]
+        key = self._cache_key(source_bytes, plain_overrides)
+
+        cached = self._read_cache(key)
+        cache_hit = cached is not None
+        if cached is None:
+            raw = self._merge_sources(source_bytes, plain_overrides)
+            cached = self._validate(raw)
+            config, aider = cached
+            if not (config.openai_api_key or aider.api_key):
+                self._write_cache(key, cached)
+
+        config, aider = self._apply_secrets(*cached, overrides)
+        return LoadedConfig(
+            config=config,
+            aider=aider,
+            cache_hit=cache_hit,
+            load_ms=(time.perf_counter() - start) * 1000,
+            sources=[str(path) for path, data in source_bytes if data is not None]
+        )
+
+    def _env_overrides(self, secrets: bool = False) -> List[Tuple[str, str]]:
+        # Secret keys are kept apart so they stay out of the cache and its key
+        pairs = []
+        if MODEL_ENV in self.environ:
+            pairs += [
+                ("openai_model", self.environ[MODEL_ENV]),
+                ("aider_config.model_name", self.environ[MODEL_ENV])
+            ]
+        for name, value in self.environ.items():
+            if name.startswith(ENV_PREFIX):
+                # ADRM__FILE_CONTEXT__LAZY=true -> file_context.lazy
+                pairs.append((name[len(ENV_PREFIX):].lower().replace("__", "."), value))
+        return sorted(pair for pair in pairs if (pair[0] in SECRET_KEYS) == secrets)
+
+    def _cache_key(self, source_bytes: List[Tuple[Path, Optional[bytes]]], overrides: Dict[str, Any]) -> str:
+        hasher = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+        for path, data in source_bytes:
+            hasher.update(str(path).encode())
+            hasher.update(hashlib.sha256(data).digest() if data is not None else b"-")
+        hasher.update(json.dumps(self._env_overrides()).encode())
+        hasher.update(json.dumps(overrides, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def _merge_sources(self, source_bytes: List[Tuple[Path, Optional[bytes]]], overrides: Dict[str, Any]) -> Dict[str, Any]:
+        import yaml
+
+        documents = [yaml.safe_load(data) or {} for _, data in source_bytes if data is not None]
+        raw: Dict[str, Any] = {}
+        aider_section: Dict[str, Any] = {}
+        for document in documents:
+            project = document.get("project", {})
+            for section in ("directories", "files", "file_extensions"):
+                if section in project:
+                    raw[section] = deep_merge(raw.get(section, {}), project[section])
+            model = document.get("model", {})
+            if model.get("name"):
+                raw["openai_model"] = model["name"]
+            if model.get("api_key"):
+                raw["openai_api_key"] = model["api_key"]
+            if "temperature" in model:
+                raw["temperature"] = model["temperature"]
+            if "io" in document:
+                raw["io"] = {k: str(v) for k, v in document["io"].items()}
+            for section in ("max_parallel_steps", "technologies", "file_context", "tracing"):
+                if section in document:
+                    raw[section] = document[section]
+            aider_section = deep_merge(aider_section, document.get("aider", {}))
+        raw["aider_config"] = aider_section
+
+        for dotted_key, value in self._env_overrides():
+            set_dotted(raw, dotted_key, yaml.safe_load(value))
+        for dotted_key, value in overrides.items():
+            set_dotted(raw, dotted_key, value)
+        return raw
+
+    @staticmethod
+    def _validate(raw: Dict[str, Any]) -> Tuple[ConfigModel, AiderConfig]:
+        config = ConfigModel.model_validate(raw)
+        aider_fields = {k: v for k, v in config.aider_config.items() if k in AiderConfig.model_fields}
+        aider_fields.setdefault("model_name", config.openai_model)
+        return config, AiderConfig.model_validate(aider_fields)
+
+    def _apply_secrets(self, config: ConfigModel, aider: AiderConfig, overrides: Dict[str, Any]) -> Tuple[ConfigModel, AiderConfig]:
+        # CLI, then ADRM_API_KEY, then ADRM__* variables, then the YAML sources
+        env = dict(self._env_overrides(secrets=True))
+        api_key = overrides.get(API_KEY_OVERRIDE) or self.environ.get(API_KEY_ENV)
+        openai_key = api_key or env.get("openai_api_key") or config.openai_api_key
+        aider_key = api_key or env.get("aider_config.api_key") or aider.api_key or openai_key
+        if openai_key == config.openai_api_key and aider_key == aider.api_key:
+            return config, aider
+        return (
+            config.model_copy(update={"openai_api_key": openai_key}),
+            aider.model_copy(update={"api_key": aider_key})
+        )
+
+    def _read_cache(self, key: str) -> Optional[Tuple[ConfigModel, AiderConfig]]:
+        if not self.cache_path or not self.cache_path.exists():
+            return None
+        try:
+            data = json.loads(self.cache_path.read_bytes())
+            if data.get("key") != key:
+                return None
+            # Validating the cached dump is kept on purpose: in pydantic-core it
+            # takes about 20us, faster than rebuilding nested models with
+            # model_construct, and a hand-edited cache is still rejected
+            return ConfigModel.model_validate(data["config"]), AiderConfig.model_validate(data["aider"])
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            # ValidationError is a ValueError; a corrupt cache is just a miss
+            return None
+
+    def _write_cache(self, key: str, payload: Tuple[ConfigModel, AiderConfig]) -> None:
+        if not self.cache_path:
+            return
+        config, aider = payload
+        data = {
+            "key": key,
+            "config": config.model_dump(mode="json"),
+            "aider": aider.model_dump(mode="json"),
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
@@ -1,9 +1,12 @@
 from pathlib import Path
+from typing import Any, Dict, Optional
 import structlog
 from rich.console import Console
 
-from adrm.core.models import ConfigModel
+from adrm.core.config_loader import ConfigLoader, LoadedConfig
 from adrm.services.standards import FileSystemStandardsGenerator
+from adrm.services.context_packer import ContextPacker
+from adrm.services.step_runner import StepRunner
 from adrm.core.interfaces import (
     FileHandler,
     StandardsGenerator,
@@ -11,14 +14,28 @@ from adrm.core.interfaces import (
 )
 from adrm.integrations.aider_client import AiderClient
 from adrm.infrastructure.file_handlers import LocalFileHandler
+from adrm.infrastructure.file_context import FileContextHandler
+from adrm.infrastructure.snapshot_cache import FileSnapshotCache
+from adrm.infrastructure.tracing import Tracer
 
 # The container setup seems excessive for current needs
 # Consider removing dependency-injector package
 # Replace with simple factory functions
 # Current DI provides minimal benefit for the number of components
 
-def AppContainer():
-    config = ConfigModel.model_validate_json(Path.cwd() / "config.json").read_text()
+CONFIG_CACHE_PATH = Path(".adrm") / "cache" / "config.json"
+
+def AppContainer(
+    overrides: Optional[Dict[str, Any]] = None,
+    working_dir: Optional[Path] = None,
+    loaded: Optional[LoadedConfig] = None,
+    interactive: bool = True
+):
+    # An already loaded config can be shared by containers for several working trees
+    working_dir = Path(working_dir) if working_dir else Path.cwd()
+    if loaded is None:
+        loaded = ConfigLoader(cache_path=working_dir / CONFIG_CACHE_PATH).load(overrides)
+    config = loaded.config
     
     logger = structlog.wrap_logger(
         structlog.PrintLogger(),
@@ -28,17 +45,45 @@ def AppContainer():
         ]
     )
     
+    logger.debug(
+        "config_loaded",
+        cache_hit=loaded.cache_hit,
+        load_ms=round(loaded.load_ms, 2),
+        sources=loaded.sources
+    )
     console = Console()
     
     file_handler = LocalFileHandler()
-    aider_client = AiderClient(config, logger)
-    standards_generator = FileSystemStandardsGenerator(config, logger, file_handler)
+    aider_client = AiderClient(loaded.aider, logger, console, working_dir)
+    standards_generator = FileSystemStandardsGenerator(
+        config,
+        logger,
+        file_handler,
+        content_source=aider_client.complete,
+        max_workers=loaded.aider.max_workers,
+        base_path=working_dir
+    )
+    snapshot_cache = FileSnapshotCache(config.file_context.cache_max_bytes)
+    file_context = FileContextHandler(
+        snapshot_cache,
+        config.file_context,
+        writer=file_handler,
+        working_dir=working_dir,
+        interactive=interactive
+    )
+    tracer = Tracer.from_config(config.tracing, working_dir, logger)
+    packer = ContextPacker(snapshot_cache, config.file_context, working_dir)
+    step_runner = StepRunner(config, logger, file_context, aider_client, tracer, packer, working_dir)
     
     return {
         'config': config,
+        'aider_config': loaded.aider,
         'logger': logger,
         'console': console,
         'standards_generator': standards_generator,
         'file_handler': file_handler,
-        'aider_client': aider_client
+        'aider_client': aider_client,
+        'step_runner': step_runner,
+        'tracer': tracer,
+        'working_dir': working_dir
     } 
\ No newline at end of file
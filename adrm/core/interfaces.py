@@ -12,7 +12,7 @@ class FileHandler(Protocol):
 
 class StepRunnerClient(Protocol):
     @abstractmethod
-    async def execute_prompt(self, prompt: str, files: list[str]) -> None: ...
+    async def execute_prompt(self, prompt: str, files: list[str], read_only_files: list[str] | None = None) -> None: ...
 
 class StandardsGenerator(ABC):
     @abstractmethod
@@ -21,6 +21,9 @@ class StandardsGenerator(ABC):
     @abstractmethod
     def create_performance_standards(self, technology: str, content: str) -> None: ...
 
+    @abstractmethod
+    def create_standards(self, technologies: list[str], contents: dict[tuple[str, str], str] | None = None, overwrite: bool = False) -> list[Path]: ...
+
 class ProjectInitializer(ABC):
     @abstractmethod
-    def initialize(self, model_name: str | None, api_key: str | None) -> None: ... 
\ No newline at end of file
+    async def initialize(self, model_name: str | None, api_key: str | None, resume: bool = False) -> None: ... 
\ No newline at end of file
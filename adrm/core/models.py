@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Literal
+from typing import Dict, List, Optional, Literal, Union
 from pydantic import BaseModel, Field, validator, field_validator
 import os
 
@@ -9,6 +9,48 @@ class AiderCoderConfig(BaseModel):
     include_patterns: List[str] = Field(default_factory=list)
     exclude_patterns: List[str] = Field(default_factory=list)
 
+class FileContextConfig(BaseModel):
+    cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0, description="Byte budget for cached file snapshots")
+    lazy: bool = Field(default=False, description="Skip binary and oversized step files; the rest are memory-mapped and decoded only if the context packer reads them")
+    max_file_bytes: Optional[int] = Field(default=1024 * 1024, ge=0, description="Lazy mode skips files larger than this")
+    max_step_bytes: Optional[int] = Field(default=32 * 1024 * 1024, ge=0, description="Lazy mode byte budget per step")
+    use_index: bool = Field(default=True, description="Resolve glob patterns from the persistent file index")
+    index_path: Optional[str] = Field(default=".adrm/file_index.json", description="Index location; None keeps it in memory")
+    token_budget: Optional[int] = Field(default=None, ge=0, description="Estimated tokens of editable files per step; None sends every file")
+    read_only_token_budget: Optional[int] = Field(default=None, ge=0, description="Further tokens added as read-only context")
+
+class TracingConfig(BaseModel):
+    otlp_path: Optional[str] = Field(default=None, description="Append step spans as OTLP/JSON lines to this file")
+    prometheus_path: Optional[str] = Field(default=None, description="Rewrite cumulative step metrics to this textfile")
+
+class ResponseCacheConfig(BaseModel):
+    enabled: bool = Field(default=False, description="Replay recorded edits for identical prompts and inputs")
+    path: str = Field(default=".adrm/cache/responses.sqlite")
+    ttl_seconds: int = Field(default=7 * 24 * 3600, ge=0, description="Entries older than this are dropped; 0 keeps them forever")
+    max_bytes: int = Field(default=256 * 1024 * 1024, ge=0, description="Least recently used entries are evicted beyond this size")
+
+class FakeBackendConfig(BaseModel):
+    latency_ms: float = Field(default=800.0, ge=0, description="Mean time to first token")
+    latency_jitter_ms: float = Field(default=200.0, ge=0)
+    distribution: Literal["fixed", "uniform", "normal", "lognormal"] = "lognormal"
+    tokens_per_second: float = Field(default=60.0, gt=0)
+    response_tokens: int = Field(default=200, ge=0, description="Length of synthetic responses")
+    responses_file: Optional[str] = Field(default=None, description="JSON list of canned {match, response} edit blocks")
+    seed: Optional[int] = None
+    rate_limit_error_rate: float = Field(default=0.0, ge=0, le=1, description="Share of calls that fail with a simulated 429")
+
+class RateLimitConfig(BaseModel):
+    requests_per_minute: Optional[int] = Field(default=None, gt=0, description="Provider request limit for the model; None leaves it unmetered")
+    tokens_per_minute: Optional[int] = Field(default=None, gt=0, description="Provider token limit for the model; None leaves it unmetered")
+    completion_token_estimate: int = Field(default=1000, ge=0, description="Tokens reserved per call for the reply")
+    initial_concurrency: int = Field(default=4, ge=1)
+    min_concurrency: int = Field(default=1, ge=1)
+    max_concurrency: int = Field(default=32, ge=1)
+    latency_tolerance: float = Field(default=2.0, ge=1, description="Concurrency shrinks while time to first token exceeds the best seen by this factor")
+    max_retries: int = Field(default=6, ge=0)
+    backoff_base_seconds: float = Field(default=1.0, ge=0)
+    backoff_max_seconds: float = Field(default=60.0, ge=0)
+
 class AiderConfig(BaseModel):
     model_name: str = Field(..., min_length=1)
     api_key: Optional[str] = None
@@ -16,18 +58,33 @@ class AiderConfig(BaseModel):
     coder: AiderCoderConfig = Field(default_factory=AiderCoderConfig)
     chat_history_file: Optional[str] = ".aider.chat.history.md"
     git_enabled: bool = True
+    commit_policy: Literal["step", "workflow", "every_n"] = Field(default="step", description="'step' keeps aider's commit per step; the others batch step edits into fewer commits")
+    commit_every: int = Field(default=10, ge=1, description="Steps per commit for the every_n policy")
     stream_output: bool = True
     pretty: bool = True
+    output_mode: Literal["auto", "rich", "plain", "none"] = Field(default="auto", description="'auto' renders rich on a terminal and plain lines otherwise")
+    output_queue_size: int = Field(default=64, ge=1, description="Streams with output waiting to render before intermediate updates are dropped")
+    max_workers: int = Field(default=4, ge=1, description="Threads available for blocking aider calls")
+    coder_pool_size: int = Field(default=8, ge=0, description="Idle coders kept warm; 0 disables pooling")
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    backend: Literal["aider", "fake"] = Field(default="aider", description="'fake' serves local responses without a model or API key")
+    fake: FakeBackendConfig = Field(default_factory=FakeBackendConfig)
+    rate_limits: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    symbol_index_path: Optional[str] = Field(default=".adrm/cache/symbols.sqlite", description="Repo-map tags shared across coders, steps and runs; None leaves aider's own cache")
 
 class ConfigModel(BaseModel):
     directories: Dict[str, str] = Field(default_factory=dict)
     files: Dict[str, str] = Field(default_factory=dict)
     model: Dict[str, str] = Field(default_factory=dict)
     io: Dict[str, str] = Field(default_factory=dict)
-    file_extensions: Dict[str, List[str]] = Field(default_factory=dict)
+    file_extensions: Dict[str, Union[str, List[str]]] = Field(default_factory=dict)
     openai_api_key: Optional[str] = Field(default=None)
     openai_model: str = Field(default="gpt-4")
     temperature: float = Field(default=0.7)
+    max_parallel_steps: int = Field(default=4, ge=1, description="Maximum number of steps run concurrently")
+    technologies: List[str] = Field(default_factory=list, description="Technologies to generate standards for during init")
+    file_context: FileContextConfig = Field(default_factory=FileContextConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
     aider_config: Optional[dict] = Field(default_factory=dict)
 
     @field_validator("directories")
@@ -52,11 +109,13 @@ class ConfigModel(BaseModel):
         return v
 
 class Step(BaseModel):
+    id: Optional[str] = Field(default=None, description="Identifier referenced by other steps' depends_on")
     prompt: str
     files: List[str] = Field(default_factory=list, description="List of file patterns to include")
     allow_edits: bool = True
     model_name: Optional[str] = None
     api_key: Optional[str] = None
+    depends_on: List[str] = Field(default_factory=list, description="Ids of steps that must complete first")
 
     @field_validator("files")
     @classmethod
@@ -1,15 +1,34 @@
-from transitions import Machine
+from typing import Callable, Dict, Optional, Tuple
 
 class InitializationState:
     states = ['idle', 'config_loaded', 'directories_created', 'steps_executed', 'completed']
+    transitions: Dict[str, Tuple[str, str]] = {
+        'load_config': ('idle', 'config_loaded'),
+        'create_dirs': ('config_loaded', 'directories_created'),
+        'execute_steps': ('directories_created', 'steps_executed'),
+        'complete': ('steps_executed', 'completed'),
+    }
     
-    def __init__(self):
-        self.machine = Machine(
-            model=self,
-            states=InitializationState.states,
-            initial='idle'
-        )
-        self.machine.add_transition('load_config', 'idle', 'config_loaded')
-        self.machine.add_transition('create_dirs', 'config_loaded', 'directories_created')
-        self.machine.add_transition('execute_steps', 'directories_created', 'steps_executed')
-        self.machine.add_transition('complete', 'steps_executed', 'completed') 
\ No newline at end of file
+    def __init__(self, on_change: Optional[Callable[[str], None]] = None):
+        self.state = 'idle'
+        self.on_change = on_change
+
+    def trigger(self, name: str) -> None:
+        source, dest = self.transitions[name]
+        if self.state != source:
+            raise ValueError(f"Cannot {name} from state '{self.state}'")
+        self.state = dest
+        if self.on_change:
+            self.on_change(dest)
+
+    def load_config(self) -> None:
+        self.trigger('load_config')
+
+    def create_dirs(self) -> None:
+        self.trigger('create_dirs')
+
+    def execute_steps(self) -> None:
+        self.trigger('execute_steps')
+
+    def complete(self) -> None:
+        self.trigger('complete')
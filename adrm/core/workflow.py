@@ -1,23 +1,196 @@
-from typing import List
-from pydantic import BaseModel
+import glob
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
 from adrm.core.models import Step
+from adrm.infrastructure.file_index import FileIndex
+from adrm.services.scheduler import StepGraph, StepScheduler
+from adrm.services.step_runner import StepRunner
+
+BUNDLE_VERSION = 3
+BUNDLE_SUFFIX = ".bundle.json"
 
 class Workflow(BaseModel):
     name: str
     description: str
     steps: List[Step]
-    
+
     def validate_steps(self) -> bool:
         # Validate step dependencies and requirements
-        return all(step.files for step in self.steps)
+        if not all(step.files for step in self.steps):
+            return False
+        try:
+            StepGraph(self.steps)
+        except ValueError:
+            return False
+        return True
+
+class CompiledStep(BaseModel):
+    key: str
+    # Files each pattern matched when the bundle was compiled
+    matches: Dict[str, List[str]]
+    fingerprint: str
+    after: List[str]
+
+class WorkflowBundle(BaseModel):
+    version: int = BUNDLE_VERSION
+    source: str
+    source_hash: str
+    # Stat of the source when compiled; an unchanged stat skips rehashing it
+    source_size: int
+    source_mtime_ns: int
+    workflow: Workflow
+    compiled: List[CompiledStep]
+    levels: List[List[str]]
+    # Hash of workflow, compiled and levels together
+    content_hash: str = ""
+
+    def compute_hash(self) -> str:
+        return _digest(self.model_dump_json(include={"workflow", "compiled", "levels"}).encode())
+
+    def verify(self, source_path: Optional[Path] = None) -> None:
+        if self.version != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported workflow bundle version {self.version}; run adrm compile-workflow")
+        source = source_path or Path(self.source)
+        try:
+            stat = source.stat()
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and (stat.st_size, stat.st_mtime_ns) != (self.source_size, self.source_mtime_ns):
+            if _digest(source.read_bytes()) != self.source_hash:
+                raise ValueError(f"Workflow bundle is out of date with {source}; run adrm compile-workflow")
+        if self.compute_hash() != self.content_hash:
+            raise ValueError("Workflow bundle was modified after compilation; run adrm compile-workflow")
+
+    def graph(self) -> StepGraph:
+        # The compiled edges, without redoing dependency and conflict analysis
+        return StepGraph(self.workflow.steps, [entry.after for entry in self.compiled])
 
 class WorkflowRunner:
-    def __init__(self, step_runner: StepRunner):
+    def __init__(self, step_runner: StepRunner, scheduler: Optional[StepScheduler] = None):
         self.step_runner = step_runner
-    
+        self.scheduler = scheduler or StepScheduler()
+
     async def execute_workflow(self, workflow: Workflow) -> None:
         if not workflow.validate_steps():
             raise ValueError("Invalid workflow configuration")
-            
-        for step in workflow.steps:
-            await self.step_runner.run_step(step) 
\ No newline at end of file
+
+        await self.scheduler.run(workflow.steps, self.step_runner.run_step)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def bundle_path(steps_file: Path) -> Path:
+    if steps_file.name.endswith(BUNDLE_SUFFIX):
+        return steps_file
+    return steps_file.with_name(steps_file.stem + BUNDLE_SUFFIX)
+
+
+def parse_workflow(data: bytes, name: str) -> Workflow:
+    # Steps files are either a bare list of steps or a Workflow object
+    try:
+        raw = json.loads(data)
+        if isinstance(raw, list):
+            return Workflow(name=name, description="", steps=raw)
+        return Workflow(**raw)
+    except (ValueError, TypeError, ValidationError) as e:
+        raise ValueError(f"Invalid workflow: {str(e)}")
+
+
+def _expand(patterns: List[str], working_dir: Path, file_index: FileIndex) -> Dict[str, List[str]]:
+    matches: Dict[str, List[str]] = {}
+    in_tree: Dict[str, str] = {}
+    for pattern in patterns:
+        if '*' not in pattern:
+            matches[pattern] = [pattern] if (working_dir / pattern).exists() else []
+            continue
+        rel_pattern = os.path.normpath(pattern).replace(os.sep, "/")
+        if os.path.isabs(pattern) or rel_pattern.startswith(".."):
+            matches[pattern] = sorted(
+                os.path.relpath(path, working_dir)
+                for path in glob.glob(os.path.join(str(working_dir), pattern), recursive=True)
+            )
+        else:
+            in_tree[pattern] = rel_pattern
+    found = file_index.glob_many(list(set(in_tree.values())))
+    for pattern, rel_pattern in in_tree.items():
+        matches[pattern] = found[rel_pattern]
+    return {pattern: matches[pattern] for pattern in patterns}
+
+
+def compile_workflow(
+    steps_file: Path,
+    working_dir: Optional[Path] = None,
+    file_index: Optional[FileIndex] = None
+) -> WorkflowBundle:
+    # Everything a run would otherwise work out per step: ids, defaults, the
+    # dependency graph with conflict ordering and the files each pattern
+    # currently matches
+    working_dir = Path(working_dir) if working_dir else Path.cwd()
+    data = steps_file.read_bytes()
+    workflow = parse_workflow(data, steps_file.stem)
+    for index, step in enumerate(workflow.steps):
+        if not step.prompt.strip():
+            raise ValueError(f"Step '{step.id or index}' has an empty prompt")
+        if not step.files:
+            raise ValueError(f"Step '{step.id or index}' has no files")
+    graph = StepGraph(workflow.steps)
+    steps = [step.model_copy(update={"id": key}) for step, key in zip(workflow.steps, graph.keys)]
+    workflow = workflow.model_copy(update={"steps": steps})
+
+    file_index = file_index or FileIndex(working_dir)
+    compiled = []
+    for index, step in enumerate(steps):
+        matches = _expand(step.files, working_dir, file_index)
+        compiled.append(CompiledStep(
+            key=graph.keys[index],
+            matches=matches,
+            fingerprint=_digest(json.dumps(matches, sort_keys=True).encode()),
+            after=[graph.keys[p] for p in sorted(graph.predecessors[index])]
+        ))
+    stat = steps_file.stat()
+    bundle = WorkflowBundle(
+        source=str(steps_file.resolve()),
+        source_hash=_digest(data),
+        source_size=stat.st_size,
+        source_mtime_ns=stat.st_mtime_ns,
+        workflow=workflow,
+        compiled=compiled,
+        levels=graph.levels()
+    )
+    bundle.content_hash = bundle.compute_hash()
+    return bundle
+
+
+def write_bundle(bundle: WorkflowBundle, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(bundle.model_dump_json(indent=2), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def read_bundle(path: Path, source_path: Optional[Path] = None) -> WorkflowBundle:
+    try:
+        bundle = WorkflowBundle.model_validate_json(path.read_bytes())
+    except ValidationError as e:
+        raise ValueError(f"Invalid workflow bundle {path}: {str(e)}")
+    bundle.verify(source_path)
+    return bundle
+
+
+def load_workflow(steps_file: Path) -> Tuple[List[Step], StepGraph]:
+    # A compiled bundle next to the steps file is used, and must be current;
+    # its graph goes to the scheduler as is. Without one the steps file is
+    # parsed and its graph built here
+    compiled = bundle_path(steps_file)
+    if compiled.exists():
+        source = None if compiled == steps_file else steps_file
+        bundle = read_bundle(compiled, source)
+        return bundle.workflow.steps, bundle.graph()
+    workflow = parse_workflow(steps_file.read_bytes(), steps_file.stem)
+    return workflow.steps, StepGraph(workflow.steps)
@@ -0,0 +1,140 @@
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from adrm.infrastructure import tracing
+
+
+@dataclass
+class CommitStats:
+    commits: int = 0
+    steps: int = 0
+    files: int = 0
+    commit_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "commits": self.commits,
+            "steps": self.steps,
+            "files": self.files,
+            "commit_ms": round(self.commit_seconds * 1000, 1),
+        }
+
+
+# Collects the files edited by each step and commits them together with
+# GitPython's in-process index, instead of one aider commit (and several git
+# subprocesses holding the index lock) per step. Policy "workflow" commits
+# only on flush(); "every_n" also commits after every `every` steps.
+class CommitBatcher:
+    def __init__(self, root: Path, policy: str = "workflow", every: int = 10, logger: Any = None):
+        import git
+
+        if policy not in ("workflow", "every_n"):
+            raise ValueError(f"Unsupported commit policy: {policy}")
+        self.policy = policy
+        self.every = every
+        self.logger = logger
+        self.repo = git.Repo(root, search_parent_directories=True)
+        self.root = Path(self.repo.working_tree_dir)
+        self.base = Path(root)
+        self.stats = CommitStats()
+        self._paths: Dict[str, None] = {}
+        self._summaries: List[str] = []
+        self._lock = threading.Lock()
+
+    def record(self, paths: Iterable[str], summary: str = "") -> None:
+        with self._lock:
+            for path in paths:
+                self._paths[self._relative(path)] = None
+            self._summaries.append(summary.strip().splitlines()[0][:72] if summary.strip() else "step")
+            if self.policy == "every_n" and len(self._summaries) >= self.every:
+                self._commit()
+
+    def flush(self) -> Optional[str]:
+        with self._lock:
+            return self._commit()
+
+    def _relative(self, path: str) -> str:
+        full_path = Path(path) if Path(path).is_absolute() else self.base / path
+        try:
+            return full_path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def _commit(self) -> Optional[str]:
+        if not self._summaries:
+            return None
+        paths, summaries = list(self._paths), list(self._summaries)
+        start = time.perf_counter()
+        with tracing.phase("git_commit"):
+            sha = self._write_commit(paths, summaries)
+        # Cleared only once committed, so a failed commit is retried by the next flush
+        self._paths, self._summaries = {}, []
+        elapsed = time.perf_counter() - start
+        self.stats.steps += len(summaries)
+        self.stats.commit_seconds += elapsed
+        if sha:
+            self.stats.commits += 1
+            self.stats.files += len(paths)
+        if self.logger is not None:
+            self.logger.info(
+                "batched_commit",
+                commit=sha,
+                steps=len(summaries),
+                files=len(paths),
+                commit_ms=round(elapsed * 1000, 1)
+            )
+        return sha
+
+    def _write_commit(self, paths: List[str], summaries: List[str]) -> Optional[str]:
+        # The commit is HEAD plus the recorded paths, so whatever the user had
+        # staged stays out of it. Blobs, trees and index entries are written
+        # in-process: IndexFile.add changes the process working directory and
+        # remove runs git, neither of which is safe while other steps run
+        from git import IndexFile
+        from git.index.fun import stat_mode_to_index_mode
+        from git.index.typ import BaseIndexEntry, IndexEntry
+        from git.objects import Commit
+        from gitdb.base import IStream
+
+        head = self.repo.head.commit if self.repo.head.is_valid() else None
+        tree = IndexFile.new(self.repo, head.tree) if head else IndexFile.new(self.repo)
+        updates: Dict[str, Optional[IndexEntry]] = {}
+        for path in paths:
+            full_path = self.root / path
+            if not os.path.lexists(full_path):
+                updates[path] = None
+                continue
+            stat = os.lstat(full_path)
+            data = os.readlink(full_path).encode() if full_path.is_symlink() else full_path.read_bytes()
+            binsha = self.repo.odb.store(IStream("blob", len(data), io.BytesIO(data))).binsha
+            updates[path] = IndexEntry.from_base(
+                BaseIndexEntry((stat_mode_to_index_mode(stat.st_mode), binsha, 0, path))
+            )
+        for path, entry in updates.items():
+            if entry is None:
+                tree.entries.pop((path, 0), None)
+            else:
+                tree.entries[(path, 0)] = entry
+        new_tree = tree.write_tree()
+        if head is not None and new_tree.binsha == head.tree.binsha:
+            return None
+        if len(summaries) == 1:
+            message = f"adrm: {summaries[0]}"
+        else:
+            message = f"adrm: apply {len(summaries)} steps\n\n" + "\n".join(f"- {summary}" for summary in summaries)
+        commit = Commit.create_from_tree(self.repo, new_tree, message, parent_commits=[head] if head else [], head=True)
+
+        # The on-disk index follows the commit for these paths only
+        index = self.repo.index
+        for path, entry in updates.items():
+            if entry is None:
+                index.entries.pop((path, 0), None)
+            else:
+                index.entries[(path, 0)] = entry
+        index.write()
+        return commit.hexsha
@@ -1,50 +1,138 @@
 from pathlib import Path
 import glob
-from typing import List, Optional, Dict
+from typing import List, Mapping, Optional, Dict
 import typer
 import os
+from adrm.core.models import FileContextConfig
+from adrm.infrastructure.file_handlers import LocalFileHandler
+from adrm.infrastructure.file_index import FileIndex
+from adrm.infrastructure.lazy_context import build_lazy_content
+from adrm.infrastructure.snapshot_cache import FileSnapshotCache, SnapshotContent
 
 class FileContextHandler:
-    def __init__(self):
-        self.files_content: Dict[str, str] = {}
-        self.working_dir = Path.cwd()
+    def __init__(
+        self,
+        snapshot_cache: Optional[FileSnapshotCache] = None,
+        config: Optional[FileContextConfig] = None,
+        file_index: Optional[FileIndex] = None,
+        writer: Optional[LocalFileHandler] = None,
+        working_dir: Optional[Path] = None,
+        interactive: bool = True
+    ):
+        # Only paths are tracked; contents live in the byte-budgeted snapshot cache
+        self.files: Dict[str, None] = {}
+        self.snapshot_cache = snapshot_cache or FileSnapshotCache()
+        self.config = config or FileContextConfig()
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        if file_index is None and self.config.use_index:
+            index_path = self.working_dir / self.config.index_path if self.config.index_path else None
+            file_index = FileIndex(self.working_dir, index_path)
+        self.file_index = file_index
+        self.writer = writer or LocalFileHandler()
+        # Without a terminal to ask on, missing files are skipped
+        self.interactive = interactive
 
     def add_files(self, patterns: List[str]) -> None:
+        self.files.update(dict.fromkeys(self.resolve(patterns)))
+
+    def resolve(self, patterns: List[str], create_missing: bool = True) -> List[str]:
+        # Resolves patterns into a fresh list so concurrent steps never share state
+        resolved: Dict[str, None] = {}
+        glob_matches = self._match_globs([p for p in patterns if '*' in p])
+        # Files created for this step are written together before it reads them
+        with self.writer.batch(background=False):
+            for pattern in patterns:
+                if '*' in pattern:
+                    self._handle_glob_pattern(pattern, glob_matches.get(pattern), resolved, create_missing)
+                else:
+                    self._handle_single_file(pattern, resolved, create_missing)
+        return list(resolved)
+
+    def digests(self, patterns: List[str]) -> Dict[str, str]:
+        # Content hashes of the files a pattern list currently resolves to
+        return {
+            file_path: self.snapshot_cache.digest(self.working_dir / file_path)
+            for file_path in self.resolve(patterns, create_missing=False)
+        }
+
+    def _match_globs(self, patterns: List[str]) -> Dict[str, List[str]]:
+        # Patterns inside the working tree are answered by the index in one pass
+        if not self.file_index or not patterns:
+            return {}
+        root = self.file_index.root
+        relative: Dict[str, str] = {}
         for pattern in patterns:
-            if '*' in pattern:
-                self._handle_glob_pattern(pattern)
-            else:
-                self._handle_single_file(pattern)
-
-    def _handle_glob_pattern(self, pattern: str) -> None:
-        # Use os.path.join to ensure proper path handling on all platforms
-        full_pattern = os.path.join(str(self.working_dir), pattern)
-        matched_files = glob.glob(full_pattern, recursive=True)
+            full_pattern = Path(os.path.join(str(root), pattern))
+            try:
+                rel_pattern = full_pattern.relative_to(root).as_posix()
+            except ValueError:
+                continue
+            if not rel_pattern.startswith(".."):
+                relative[pattern] = rel_pattern
+        matches = self.file_index.glob_many(list(set(relative.values())))
+        # The index leaves out gitignored files, so a pattern it cannot match
+        # (e.g. build/*.py) is globbed on disk as it was before the index
+        return {
+            pattern: [str(root / match) for match in matches[rel_pattern]]
+            for pattern, rel_pattern in relative.items()
+            if matches[rel_pattern]
+        }
+
+    def collect(self, patterns: List[str]) -> Mapping[str, str]:
+        return self.read(self.resolve(patterns))
+
+    def read(self, file_paths: List[str]) -> Mapping[str, str]:
+        if self.config.lazy:
+            return build_lazy_content(
+                self.working_dir,
+                file_paths,
+                max_file_bytes=self.config.max_file_bytes,
+                max_step_bytes=self.config.max_step_bytes
+            )
+        return SnapshotContent(self.snapshot_cache, self.working_dir, file_paths)
+
+    def _handle_glob_pattern(
+        self,
+        pattern: str,
+        matched_files: Optional[List[str]],
+        resolved: Dict[str, None],
+        create_missing: bool = True
+    ) -> None:
+        if matched_files is None:
+            # Use os.path.join to ensure proper path handling on all platforms
+            full_pattern = os.path.join(str(self.working_dir), pattern)
+            matched_files = glob.glob(full_pattern, recursive=True)
         
         if not matched_files:
+            if not create_missing:
+                return
             typer.echo(f"Warning: No files matched pattern '{pattern}'")
             return
             
         for file_path in matched_files:
             # Convert absolute path back to relative for consistency
             relative_path = os.path.relpath(file_path, self.working_dir)
-            self._handle_single_file(relative_path)
+            self._handle_single_file(relative_path, resolved, create_missing)
 
-    def _handle_single_file(self, file_path: str) -> None:
+    def _handle_single_file(self, file_path: str, resolved: Dict[str, None], create_missing: bool = True) -> None:
+        if file_path in resolved:
+            return
         # Resolve path relative to working directory
         full_path = self.working_dir / file_path
         
         if not full_path.exists():
+            if not create_missing:
+                return
             content = self._prompt_for_content(file_path)
             if content:
-                self.files_content[file_path] = content
-                # Create the file in the correct location
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                full_path.write_text(content)
+                self.writer.handle(full_path, content)
+                resolved[file_path] = None
         else:
-            self.files_content[file_path] = full_path.read_text()
+            resolved[file_path] = None
 
     def _prompt_for_content(self, file_path: str) -> Optional[str]:
+        if not self.interactive:
+            return None
         create_file = typer.confirm(
             f"File '{file_path}' does not exist. Would you like to create it?",
             default=True
@@ -60,4 +148,7 @@ class FileContextHandler:
         return None
 
     def get_files_content(self) -> Dict[str, str]:
-        return self.files_content 
\ No newline at end of file
+        return {
+            file_path: self.snapshot_cache.read_text(self.working_dir / file_path)
+            for file_path in self.files
+        } 
\ No newline at end of file
@@ -1,21 +1,123 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
 from adrm.core.interfaces import FileHandler
 
+def content_digest(content: str) -> bytes:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+# Writes are deduplicated against the digest of the last content written to each
+# path. Inside batch() they are buffered, coalesced per path and committed in
+# one flush, each file via a temporary file and os.replace so readers never see
+# a partial write. Flushes may run on a background thread. Batches belong to
+# the thread that opened them, so concurrent steps sharing a handler each
+# flush their own writes when their batch exits.
 class LocalFileHandler:
-    def __init__(self, filepath: Path = None):
-        self._cache = {}
+    def __init__(self, filepath: Path = None, max_cache_entries: int = 4096, background: bool = False):
         self.filepath = filepath
+        self.max_cache_entries = max_cache_entries
+        self.background = background
+        self._cache: "OrderedDict[Path, bytes]" = OrderedDict()
+        self._local = threading.local()
+        self._created_dirs: Set[Path] = set()
+        self._futures: List[Future] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.RLock()
 
     def handle(self, filepath: Path, content: str) -> None:
-        filepath = filepath or self.filepath
-        if self._cache.get(filepath) != content:
+        filepath = Path(filepath or self.filepath)
+        batches = self._batches()
+        if batches:
+            batches[-1][filepath] = content
+            return
+        self._commit({filepath: content})
+
+    def _batches(self) -> List[Dict[Path, str]]:
+        batches = getattr(self._local, "batches", None)
+        if batches is None:
+            batches = self._local.batches = []
+        return batches
+
+    @contextmanager
+    def batch(self, background: Optional[bool] = None) -> Iterator["LocalFileHandler"]:
+        batches = self._batches()
+        batches.append({})
+        try:
+            yield self
+        finally:
+            writes = batches.pop()
+            if batches:
+                # Nested batches are committed with the outermost one
+                batches[-1].update(writes)
+            else:
+                self._flush(writes, background)
+
+    def _flush(self, writes: Dict[Path, str], background: Optional[bool] = None) -> None:
+        if not writes:
+            return
+        if self.background if background is None else background:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="adrm-writer")
+                self._futures.append(self._executor.submit(self._commit, writes))
+        else:
+            self._commit(writes)
+
+    def wait(self) -> None:
+        # Re-raises the first error from a background flush
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self.wait()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _commit(self, writes: Dict[Path, str]) -> None:
+        for filepath, content in writes.items():
+            digest = content_digest(content)
+            with self._lock:
+                if self._cache.get(filepath) == digest:
+                    self._cache.move_to_end(filepath)
+                    continue
+            self._replace(filepath, content)
+            with self._lock:
+                self._cache[filepath] = digest
+                self._cache.move_to_end(filepath)
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+
+    def _replace(self, filepath: Path, content: str) -> None:
+        temp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        if filepath.parent not in self._created_dirs:
             filepath.parent.mkdir(parents=True, exist_ok=True)
-            filepath.write_text(content, encoding="utf-8")
-            self._cache[filepath] = content
+            self._created_dirs.add(filepath.parent)
+        try:
+            try:
+                temp_path.write_text(content, encoding="utf-8")
+            except FileNotFoundError:
+                # The directory was removed since it was first created
+                filepath.parent.mkdir(parents=True, exist_ok=True)
+                temp_path.write_text(content, encoding="utf-8")
+            os.replace(temp_path, filepath)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
 
     def read(self) -> str:
         if not self.filepath:
             raise ValueError("No file path specified")
+        for writes in reversed(self._batches()):
+            if Path(self.filepath) in writes:
+                return writes[Path(self.filepath)]
         return self.filepath.read_text(encoding="utf-8")
 
     def write(self, content: str) -> None:
@@ -29,4 +131,4 @@ class LocalFileHandler:
 #         self.client.upload(filepath, content)
 
 # FileHandlerFactory adds unnecessary abstraction
-# class FileHandlerFactory: ... 
\ No newline at end of file
+# class FileHandlerFactory: ...
@@ -0,0 +1,213 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from adrm.infrastructure.path_matcher import PatternSet
+
+INDEX_VERSION = 1
+ALWAYS_IGNORED = {".git", ".adrm"}
+
+
+class DirEntry(NamedTuple):
+    mtime_ns: int
+    files: List[str]
+    subdirs: List[str]
+
+
+def _translate_segment(segment: str) -> str:
+    parts = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", index + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = segment[index + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    regex = "".join(parts)
+    # Like glob.glob, wildcards never match a leading dot
+    if segment[:1] in ("*", "?", "["):
+        regex = r"(?!\.)" + regex
+    return regex
+
+
+def translate_glob(pattern: str) -> str:
+    segments = pattern.strip("/").split("/")
+    regex = ""
+    for position, segment in enumerate(segments):
+        last = position == len(segments) - 1
+        if segment == "**":
+            regex += r"(?:[^/.][^/]*/)*" + (r"[^/.][^/]*" if last else "")
+        else:
+            regex += _translate_segment(segment) + ("" if last else "/")
+    return regex + r"\Z"
+
+
+def static_prefix(pattern: str) -> str:
+    # Leading directories that contain no wildcard characters
+    prefix = []
+    for segment in pattern.strip("/").split("/")[:-1]:
+        if any(char in segment for char in "*?["):
+            break
+        prefix.append(segment + "/")
+    return "".join(prefix)
+
+
+# Persistent listing of the working tree used to answer glob patterns without
+# walking the filesystem. Only directories whose mtime changed are rescanned on
+# refresh, and the root .gitignore is honored.
+class FileIndex:
+    def __init__(self, root: Path, index_path: Optional[Path] = None):
+        self.root = Path(root).resolve()
+        self.index_path = index_path
+        self._dirs: Dict[str, DirEntry] = {}
+        self._files: Optional[List[str]] = None
+        self._ignore_hash = ""
+        self._ignore = PatternSet([])
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            ignore_hash = self._read_ignore_rules()
+            if ignore_hash != self._ignore_hash:
+                self._dirs = {}
+                self._ignore_hash = ignore_hash
+
+            dirs: Dict[str, DirEntry] = {}
+            changed = self._walk("", dirs)
+            if changed or dirs.keys() != self._dirs.keys():
+                self._dirs = dirs
+                self._files = None
+                self._save()
+
+    def files(self) -> List[str]:
+        if self._files is None:
+            files = []
+            for rel_dir, entry in self._dirs.items():
+                files.extend(rel_dir + name for name in entry.files)
+            self._files = sorted(files)
+        return self._files
+
+    def glob(self, pattern: str) -> List[str]:
+        return self.glob_many([pattern])[pattern]
+
+    def glob_many(self, patterns: List[str]) -> Dict[str, List[str]]:
+        self.refresh()
+        files = self.files()
+        matches: Dict[str, List[str]] = {pattern: [] for pattern in patterns}
+        if not patterns:
+            return matches
+
+        ranges: List[Tuple[int, int]] = []
+        for pattern in patterns:
+            prefix = static_prefix(pattern)
+            ranges.append((
+                bisect.bisect_left(files, prefix),
+                bisect.bisect_left(files, prefix + "\uffff")
+            ))
+        regexes = [translate_glob(pattern) for pattern in patterns]
+
+        # One pass over the union of candidate ranges with a merged regex finds
+        # every file matched by any pattern; only those hits are attributed
+        low = min(start for start, _ in ranges)
+        high = max(end for _, end in ranges)
+        merged = re.compile("|".join(f"(?:{regex})" for regex in regexes))
+        hits = [(position, files[position]) for position in range(low, high) if merged.match(files[position])]
+        if len(patterns) == 1:
+            matches[patterns[0]] = [file_path for _, file_path in hits]
+            return matches
+
+        compiled = [re.compile(regex) for regex in regexes]
+        for position, file_path in hits:
+            for pattern, regex, (start, end) in zip(patterns, compiled, ranges):
+                if start <= position < end and regex.match(file_path):
+                    matches[pattern].append(file_path)
+        return matches
+
+    def _walk(self, rel_dir: str, dirs: Dict[str, DirEntry]) -> bool:
+        full_dir = self.root / rel_dir if rel_dir else self.root
+        try:
+            mtime_ns = full_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return True
+
+        changed = False
+        entry = self._dirs.get(rel_dir)
+        if entry is None or entry.mtime_ns != mtime_ns:
+            entry = self._scan(rel_dir, full_dir, mtime_ns)
+            changed = True
+        dirs[rel_dir] = entry
+        for subdir in entry.subdirs:
+            changed = self._walk(rel_dir + subdir + "/", dirs) or changed
+        return changed
+
+    def _scan(self, rel_dir: str, full_dir: Path, mtime_ns: int) -> DirEntry:
+        files: List[str] = []
+        subdirs: List[str] = []
+        with os.scandir(full_dir) as entries:
+            for item in entries:
+                if item.name in ALWAYS_IGNORED:
+                    continue
+                is_dir = item.is_dir(follow_symlinks=False)
+                if not is_dir and not item.is_file():
+                    continue
+                if self._ignore.match(rel_dir + item.name, is_dir):
+                    continue
+                (subdirs if is_dir else files).append(item.name)
+        return DirEntry(mtime_ns, sorted(files), sorted(subdirs))
+
+    def _read_ignore_rules(self) -> str:
+        gitignore = self.root / ".gitignore"
+        data = gitignore.read_bytes() if gitignore.is_file() else b""
+        self._ignore = PatternSet(data.decode("utf-8", "replace").splitlines())
+        return hashlib.sha256(data).hexdigest()
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != str(self.root):
+            return
+        self._ignore_hash = data.get("ignore_hash", "")
+        self._dirs = {
+            rel_dir: DirEntry(mtime_ns, files, subdirs)
+            for rel_dir, (mtime_ns, files, subdirs) in data.get("dirs", {}).items()
+        }
+
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        payload = {
+            "version": INDEX_VERSION,
+            "root": str(self.root),
+            "ignore_hash": self._ignore_hash,
+            "dirs": {rel_dir: list(entry) for rel_dir, entry in self._dirs.items()},
+        }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp_path, self.index_path)
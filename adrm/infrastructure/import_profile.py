@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+            timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return timings
+
+
+def profile_startup(args: List[str], top: int = 25) -> int:
+    # Re-run the CLI under -X importtime and summarize where startup time goes
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "adrm.main", *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    sys.stdout.write(result.stdout)
+    # Everything but the importtime lines, e.g. a traceback or usage error
+    sys.stderr.write("".join(
+        line for line in result.stderr.splitlines(keepends=True)
+        if not line.startswith("import time:")
+    ))
+    timings = parse_importtime(result.stderr)
+    roots = [timing for timing in timings if timing.depth == 0]
+    total_us = sum(timing.cumulative_us for timing in roots)
+
+    print(f"\nImport time: {total_us / 1000:.1f} ms across {len(timings)} modules")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in sorted(roots, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        print(f"{timing.cumulative_us / 1000:14.1f} {timing.self_us / 1000:9.1f}  {timing.module}")
+    return result.returncode
@@ -0,0 +1,75 @@
+import codecs
+import mmap
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+BINARY_SNIFF_BYTES = 8192
+CHUNK_BYTES = 64 * 1024
+
+
+def is_binary(path: Path) -> bool:
+    with open(path, "rb") as handle:
+        return b"\0" in handle.read(BINARY_SNIFF_BYTES)
+
+
+# Read-only mapping of relative path -> text whose values are memory-mapped and
+# decoded only when accessed, so a step holds paths rather than file contents.
+class LazyFileContent(Mapping[str, str]):
+    def __init__(self, paths: Dict[str, Path], encoding: str = "utf-8"):
+        self._paths = paths
+        self.encoding = encoding
+        self.skipped: List[Tuple[str, str]] = []
+        self.total_bytes = 0
+
+    def __getitem__(self, key: str) -> str:
+        return "".join(self.iter_text(key))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def path(self, key: str) -> Path:
+        return self._paths[key]
+
+    def iter_text(self, key: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[str]:
+        path = self._paths[key]
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        with open(path, "rb") as handle:
+            size = path.stat().st_size
+            if size == 0:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                for offset in range(0, len(view), chunk_bytes):
+                    text = decoder.decode(view[offset:offset + chunk_bytes])
+                    if text:
+                        yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def build_lazy_content(
+    working_dir: Path,
+    file_paths: List[str],
+    max_file_bytes: Optional[int] = None,
+    max_step_bytes: Optional[int] = None
+) -> LazyFileContent:
+    paths: Dict[str, Path] = {}
+    content = LazyFileContent(paths)
+    for file_path in file_paths:
+        full_path = working_dir / file_path
+        size = full_path.stat().st_size
+        if max_file_bytes is not None and size > max_file_bytes:
+            content.skipped.append((file_path, "oversized"))
+            continue
+        if max_step_bytes is not None and content.total_bytes + size > max_step_bytes:
+            content.skipped.append((file_path, "step_budget"))
+            continue
+        if is_binary(full_path):
+            content.skipped.append((file_path, "binary"))
+            continue
+        paths[file_path] = full_path
+        content.total_bytes += size
+    return content
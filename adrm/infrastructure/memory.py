@@ -0,0 +1,34 @@
+import os
+import sys
+import tracemalloc
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_bytes() -> Optional[int]:
+    # Resident set size right now; only Linux exposes it without psutil
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def process_peak_rss_bytes() -> Optional[int]:
+    # High-water mark of the whole process since it started, not of one step
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def traced_peak_bytes() -> Optional[int]:
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[1]
@@ -0,0 +1,238 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, TextIO
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.rule import Rule
+from rich.text import Text
+
+from adrm.infrastructure import tracing
+
+OUTPUT_MODES = ("auto", "rich", "plain", "none")
+
+
+@dataclass
+class Update:
+    stream_id: int
+    label: str
+    text: str
+    final: bool
+
+
+@dataclass
+class OutputStats:
+    updates: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    rendered: int = 0
+    render_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "updates": self.updates,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "rendered": self.rendered,
+            "render_ms": round(self.render_ms, 1),
+        }
+
+
+def resolve_mode(mode: str, console: Console, pretty: bool = True) -> str:
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unsupported output mode: {mode}")
+    if mode != "auto":
+        return mode
+    if pretty and console.is_terminal and not os.environ.get("CI"):
+        return "rich"
+    return "plain"
+
+
+class PlainRenderer:
+    # Complete lines only, prefixed with the stream label, so concurrent
+    # streams interleave readably in CI logs
+    def __init__(self, output: Optional[TextIO] = None):
+        self.output = output
+        self._offsets: Dict[int, int] = {}
+        self._partial: Dict[int, str] = {}
+
+    def render(self, updates: List[Update]) -> None:
+        out = self.output or sys.stdout
+        lines = []
+        for update in updates:
+            offset = self._offsets.get(update.stream_id, 0)
+            if len(update.text) < offset:
+                offset = 0
+            pending = self._partial.pop(update.stream_id, "") + update.text[offset:]
+            self._offsets[update.stream_id] = len(update.text)
+            *complete, rest = pending.split("\n")
+            if update.final:
+                if rest:
+                    complete.append(rest)
+                self._offsets.pop(update.stream_id, None)
+            elif rest:
+                self._partial[update.stream_id] = rest
+            lines += [f"[{update.label}] {line}\n" for line in complete]
+        if lines:
+            out.write("".join(lines))
+            out.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class RichRenderer:
+    # One Live region shows the tail of every active stream; finished
+    # responses are printed above it as Markdown
+    def __init__(self, console: Console, tail_lines: int = 6):
+        self.console = console
+        self.tail_lines = tail_lines
+        self._active: "OrderedDict[int, Update]" = OrderedDict()
+        self._live: Optional[Live] = None
+
+    def render(self, updates: List[Update]) -> None:
+        finished = []
+        for update in updates:
+            if update.final:
+                self._active.pop(update.stream_id, None)
+                finished.append(update)
+            else:
+                self._active[update.stream_id] = update
+        if finished and self._live is not None:
+            self._stop_live()
+        for update in finished:
+            self.console.print(Rule(update.label))
+            self.console.print(Markdown(update.text))
+        if self._active:
+            if self._live is None:
+                self._live = Live(console=self.console, auto_refresh=False, transient=True)
+                self._live.start()
+            self._live.update(Group(*[self._panel(update) for update in self._active.values()]), refresh=True)
+
+    def _panel(self, update: Update) -> Panel:
+        tail = "\n".join(update.text.splitlines()[-self.tail_lines:])
+        return Panel(Text(tail), title=update.label, title_align="left")
+
+    def _stop_live(self) -> None:
+        self._live.stop()
+        self._live = None
+
+    def close(self) -> None:
+        if self._live is not None:
+            self._stop_live()
+
+
+# Decouples model streams from rendering. Producers hand over full-text
+# snapshots and never wait: pending updates are coalesced per stream, so a
+# slow renderer sees fewer, larger updates rather than holding up the
+# model. Once max_pending streams are waiting, intermediate snapshots for
+# further streams are dropped; final snapshots are always kept.
+class OutputPipeline:
+    def __init__(self, renderer: Any, max_pending: int = 64, min_interval: float = 0.05, mode: str = "plain"):
+        self.renderer = renderer
+        self.mode = mode
+        self.max_pending = max_pending
+        self.min_interval = min_interval
+        self.stats = OutputStats()
+        self._pending: "OrderedDict[int, Update]" = OrderedDict()
+        self._next_id = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        if renderer is not None:
+            self._thread = threading.Thread(target=self._run, name="adrm-output", daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def create(
+        cls,
+        mode: str,
+        console: Console,
+        pretty: bool = True,
+        max_pending: int = 64,
+        output: Optional[TextIO] = None
+    ) -> "OutputPipeline":
+        mode = resolve_mode(mode, console, pretty)
+        if mode == "none":
+            renderer = None
+        elif mode == "rich":
+            renderer = RichRenderer(console)
+        else:
+            renderer = PlainRenderer(output)
+        return cls(renderer, max_pending, mode=mode)
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def open_stream(self, label: Optional[str] = None) -> "PipelineStream":
+        with self._condition:
+            self._next_id += 1
+            stream_id = self._next_id
+        if label is None:
+            span = tracing.current_span()
+            label = (span.attributes.get("step_id") if span else None) or f"response {stream_id}"
+        return PipelineStream(self, stream_id, label)
+
+    def submit(self, stream_id: int, label: str, text: str, final: bool = False) -> None:
+        if not self.enabled:
+            return
+        with self._condition:
+            if self._closed:
+                return
+            self.stats.updates += 1
+            if stream_id in self._pending:
+                self.stats.coalesced += 1
+                final = final or self._pending[stream_id].final
+            elif len(self._pending) >= self.max_pending and not final:
+                self.stats.dropped += 1
+                return
+            self._pending[stream_id] = Update(stream_id, label, text, final)
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    break
+                updates = list(self._pending.values())
+                self._pending.clear()
+            start = time.perf_counter()
+            try:
+                self.renderer.render(updates)
+            except Exception:
+                # A broken console must not take the model stream down with it
+                pass
+            elapsed = time.perf_counter() - start
+            self.stats.rendered += len(updates)
+            self.stats.render_ms += elapsed * 1000
+            # Rendering no more often than min_interval lets updates coalesce
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+        self.renderer.close()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class PipelineStream:
+    # Quacks like aider's MarkdownStream
+    def __init__(self, pipeline: OutputPipeline, stream_id: int, label: str):
+        self.pipeline = pipeline
+        self.stream_id = stream_id
+        self.label = label
+
+    def update(self, text: str, final: bool = False) -> None:
+        self.pipeline.submit(self.stream_id, self.label, text, final)
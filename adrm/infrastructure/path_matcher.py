@@ -0,0 +1,154 @@
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+from adrm.core.models import AiderCoderConfig
+
+
+def _translate(pattern: str) -> str:
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**", index):
+            # "**/" spans zero or more directories, a trailing "**" everything below
+            if pattern.startswith("**/", index):
+                parts.append("(?:.*/)?")
+                index += 3
+            else:
+                parts.append(".*")
+                index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+class Rule(NamedTuple):
+    negated: bool
+    anchored: bool
+    directory_only: bool
+    body: str
+
+
+def parse_rule(pattern: str) -> Rule:
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    return Rule(negated, anchored, directory_only, _translate(pattern.lstrip("/")))
+
+
+def rules_regex(rules: Sequence[Rule]) -> str:
+    # Rules sharing anchoring and directory handling are grouped behind one
+    # prefix/tail, so the engine tries each path position once per group.
+    # Regexes run against "path" for files and "path/" for directories.
+    groups = []
+    for anchored in (True, False):
+        for directory_only in (False, True):
+            bodies = [r.body for r in rules if r.anchored == anchored and r.directory_only == directory_only]
+            if not bodies:
+                continue
+            prefix = "" if anchored else "(?:.*/)?"
+            # A matching directory also matches everything beneath it
+            tail = r"/.*\Z" if directory_only else r"(?:/.*)?\Z"
+            groups.append(prefix + "(?:" + "|".join(bodies) + ")" + tail)
+    return "|".join(f"(?:{group})" for group in groups)
+
+
+class PatternSet:
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = [p.strip() for p in patterns if p.strip() and not p.strip().startswith("#")]
+        rules = [parse_rule(pattern) for pattern in self.patterns]
+        self.has_negation = any(rule.negated for rule in rules)
+        self._merged: Optional[Pattern[str]] = None
+        self._rules: List[Tuple[bool, Pattern[str]]] = []
+        if not rules:
+            return
+        if self.has_negation:
+            # Later rules take precedence, so they are checked first
+            self._rules = [(rule.negated, re.compile(rules_regex([rule]))) for rule in reversed(rules)]
+        else:
+            self._merged = re.compile(rules_regex(rules))
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def match(self, path: str, is_dir: bool = False) -> bool:
+        if is_dir:
+            path += "/"
+        if self._merged is not None:
+            return self._merged.match(path) is not None
+        for negated, regex in self._rules:
+            if regex.match(path):
+                return not negated
+        return False
+
+
+# Include/exclude filter compiled once from configuration and reused across steps.
+# Patterns follow gitignore conventions: "!" negates, a leading "/" or inner "/"
+# anchors to the root, a trailing "/" matches directories only, and patterns
+# without a slash match the file name at any depth.
+class PathMatcher:
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = (), root: Optional[Path] = None):
+        self.include = compile_patterns(tuple(include))
+        self.exclude = compile_patterns(tuple(exclude))
+        self.root = str(root) if root else None
+
+    @classmethod
+    def from_config(cls, coder_config: AiderCoderConfig, root: Optional[Path] = None) -> "PathMatcher":
+        return compile_matcher(
+            tuple(coder_config.include_patterns),
+            tuple(coder_config.exclude_patterns),
+            str(root) if root else None
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude)
+
+    def relative(self, path: str) -> str:
+        path = path.replace(os.sep, "/")
+        if self.root and os.path.isabs(path):
+            root = self.root.replace(os.sep, "/").rstrip("/") + "/"
+            if path.startswith(root):
+                return path[len(root):]
+        return path.lstrip("/")
+
+    def matches(self, path: str) -> bool:
+        rel_path = self.relative(path)
+        if self.include and not self.include.match(rel_path):
+            return False
+        return not (self.exclude and self.exclude.match(rel_path))
+
+    def filter(self, paths: Iterable[str]) -> List[str]:
+        return [path for path in paths if self.matches(path)]
+
+
+# Compiled pattern sets are shared by matchers for different roots, so one
+# configuration is compiled once per process however many trees it filters
+@lru_cache(maxsize=64)
+def compile_patterns(patterns: Tuple[str, ...]) -> PatternSet:
+    return PatternSet(patterns)
+
+
+@lru_cache(maxsize=32)
+def compile_matcher(include: Tuple[str, ...], exclude: Tuple[str, ...], root: Optional[str] = None) -> PathMatcher:
+    return PathMatcher(include, exclude, Path(root) if root else None)
@@ -0,0 +1,245 @@
+import functools
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from adrm.core.models import RateLimitConfig
+from adrm.infrastructure import tracing
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504, 529})
+# litellm exception names, matched by name so litellm is not imported here
+RETRYABLE_ERRORS = frozenset({
+    "RateLimitError", "APIConnectionError", "Timeout", "ServiceUnavailableError", "InternalServerError"
+})
+CHARS_PER_TOKEN = 4
+
+
+def is_throttled(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def is_retryable(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS or type(error).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float) -> float:
+        # Blocks until `amount` is available and returns the seconds waited.
+        # Requests larger than the bucket wait for a full bucket.
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._level >= amount:
+                    self._level -= amount
+                    return waited
+                delay = (amount - self._level) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# Additive increase, multiplicative decrease: one more slot per window of
+# healthy calls, halved on throttling and trimmed while time to first token
+# drifts above the best seen, which is where provider-side queueing shows.
+class AdaptiveLimiter:
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_tolerance: float):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self._latency: Optional[float] = None
+        self._best: Optional[float] = None
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        start = time.monotonic()
+        with self._condition:
+            while self.inflight >= int(self.limit):
+                self._condition.wait()
+            self.inflight += 1
+        return time.monotonic() - start
+
+    def release(self) -> None:
+        with self._condition:
+            self.inflight -= 1
+            self._condition.notify()
+
+    def on_success(self, latency: float) -> None:
+        with self._condition:
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            self._best = self._latency if self._best is None else min(self._best, self._latency)
+            if self._latency > self._best * self.latency_tolerance:
+                self.limit = max(self.minimum, self.limit * 0.9)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self) -> None:
+        with self._condition:
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+@dataclass
+class GovernorStats:
+    calls: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failures: int = 0
+    wait_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "backoff_seconds": round(self.backoff_seconds, 3),
+        }
+
+
+class ModelGovernor:
+    def __init__(self, model: str, config: RateLimitConfig, rng: Optional[random.Random] = None):
+        self.model = model
+        self.config = config
+        self.rng = rng or random.Random()
+        self.requests = TokenBucket(config.requests_per_minute) if config.requests_per_minute else None
+        self.tokens = TokenBucket(config.tokens_per_minute) if config.tokens_per_minute else None
+        self.limiter = AdaptiveLimiter(
+            config.initial_concurrency,
+            config.min_concurrency,
+            config.max_concurrency,
+            config.latency_tolerance
+        )
+        self.stats = GovernorStats()
+        self._lock = threading.Lock()
+
+    def estimate_tokens(self, payload: Any) -> int:
+        return len(str(payload)) // CHARS_PER_TOKEN + self.config.completion_token_estimate
+
+    def call(self, func: Callable[[], Any], tokens: int = 0) -> Any:
+        for attempt in itertools.count():
+            self._admit(tokens)
+            start = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                self.limiter.release()
+                if not self._retry(e, attempt):
+                    raise
+                continue
+            self.limiter.release()
+            self.limiter.on_success(time.monotonic() - start)
+            return result
+
+    def stream(self, func: Callable[[], Iterator[Any]], tokens: int = 0, retry: bool = True) -> Iterator[Any]:
+        # Retried only until the first chunk; once output has been yielded a
+        # failure belongs to the caller. With retry=False every failure is
+        # raised to a caller that retries itself, after adjusting the limits
+        for attempt in itertools.count() if retry else (self.config.max_retries,):
+            self._admit(tokens)
+            start = time.monotonic()
+            started = False
+            try:
+                for chunk in func():
+                    if not started:
+                        started = True
+                        self.limiter.on_success(time.monotonic() - start)
+                    yield chunk
+            except Exception as e:
+                self.limiter.release()
+                if started or not self._retry(e, attempt):
+                    raise
+                continue
+            except BaseException:
+                self.limiter.release()
+                raise
+            self.limiter.release()
+            if not started:
+                self.limiter.on_success(time.monotonic() - start)
+            return
+
+    def _admit(self, tokens: int) -> None:
+        with tracing.phase("rate_limit_wait"):
+            waited = self.limiter.acquire()
+            if self.requests:
+                waited += self.requests.acquire(1)
+            if self.tokens and tokens:
+                waited += self.tokens.acquire(tokens)
+        with self._lock:
+            self.stats.calls += 1
+            self.stats.wait_seconds += waited
+
+    def _retry(self, error: Exception, attempt: int) -> bool:
+        throttled = is_throttled(error)
+        if throttled:
+            self.limiter.on_throttle()
+        if not is_retryable(error) or attempt >= self.config.max_retries:
+            with self._lock:
+                self.stats.failures += 1
+                self.stats.throttled += throttled
+            return False
+        # Full jitter keeps parallel steps from retrying in lockstep
+        delay = retry_after(error)
+        if delay is None:
+            delay = self.rng.uniform(0, min(self.config.backoff_max_seconds, self.config.backoff_base_seconds * 2 ** attempt))
+        with self._lock:
+            self.stats.retries += 1
+            self.stats.throttled += throttled
+            self.stats.backoff_seconds += delay
+        tracing.count("rate_limit_retries", 1)
+        with tracing.phase("retry_backoff"):
+            time.sleep(delay)
+        return True
+
+
+_governors: Dict[str, ModelGovernor] = {}
+_registry_lock = threading.Lock()
+
+
+def governor_for(model: str, config: RateLimitConfig) -> ModelGovernor:
+    # One governor per model for the whole process, so every client and
+    # coder calling a model shares its limits; the first config seen wins
+    with _registry_lock:
+        governor = _governors.get(model)
+        if governor is None:
+            governor = _governors[model] = ModelGovernor(model, config)
+        return governor
+
+
+def governed_stream(target: Any, method: str, governor: ModelGovernor, retry: bool = True) -> None:
+    # Replaces a generator method so each call is admitted, and unless the
+    # caller has its own retry loop also retried, by the governor
+    original = getattr(target, method, None)
+    if original is None:
+        return
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        tokens = governor.estimate_tokens(args[0] if args else kwargs)
+        yield from governor.stream(lambda: original(*args, **kwargs), tokens, retry)
+
+    setattr(target, method, wrapper)
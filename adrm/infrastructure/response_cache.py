@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA_VERSION = 2
+
+# Recorded edits: relative path -> file content after the run, or None when
+# the run deleted the file
+Edits = Dict[str, Optional[str]]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+            "saved_ms": round(self.saved_seconds * 1000, 1),
+        }
+
+
+@dataclass
+class CachedResponse:
+    edits: Edits
+    elapsed_seconds: float
+
+
+# SQLite-backed cache of model runs keyed by (model, coder type, prompt, input
+# file hashes). Each entry stores the zlib-compressed file contents the run
+# produced, so a hit writes the same result back without calling the model.
+class ResponseCache:
+    def __init__(self, path: Path, root: Path, ttl_seconds: int = 0, max_bytes: int = 0):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Several processes may share the file, so writers wait on each other
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, "
+            "elapsed REAL NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self._db.commit()
+
+    def relative(self, file_path: str) -> str:
+        path = Path(file_path)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(self.root)
+            except ValueError:
+                pass
+        return path.as_posix()
+
+    def snapshot(self, files: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        contents: Dict[str, Optional[bytes]] = {}
+        for file_path in files:
+            try:
+                contents[self.relative(file_path)] = (self.root / self.relative(file_path)).read_bytes()
+            except FileNotFoundError:
+                contents[self.relative(file_path)] = None
+        return contents
+
+    def key(
+        self,
+        model_name: str,
+        coder_type: str,
+        allow_edits: bool,
+        prompt: str,
+        files: List[str],
+        read_only_files: Iterable[str] = ()
+    ) -> str:
+        inputs = [
+            sorted(
+                (rel_path, hashlib.sha256(data).hexdigest() if data is not None else None)
+                for rel_path, data in self.snapshot(group).items()
+            )
+            for group in (files, read_only_files)
+        ]
+        payload = [SCHEMA_VERSION, model_name, coder_type, allow_edits, prompt, *inputs]
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, elapsed, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and row[2] < now - self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self.stats.evictions += 1
+                row = None
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.stats.hits += 1
+            self.stats.saved_seconds += row[1]
+        return CachedResponse(json.loads(zlib.decompress(row[0])), row[1])
+
+    def put(self, key: str, edits: Edits, elapsed_seconds: float) -> None:
+        payload = zlib.compress(json.dumps(edits, sort_keys=True).encode())
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, elapsed, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload), elapsed_seconds, now, now)
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def replay(self, response: CachedResponse) -> List[str]:
+        written = []
+        for rel_path, content in response.edits.items():
+            full_path = self.root / rel_path
+            if content is None:
+                if full_path.exists():
+                    full_path.unlink()
+            else:
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = full_path.with_name(f".{full_path.name}.adrm-tmp")
+                temp_path.write_text(content, encoding="utf-8")
+                os.replace(temp_path, full_path)
+            written.append(rel_path)
+        return written
+
+    @staticmethod
+    def diff(before: Dict[str, Optional[bytes]], after: Dict[str, Optional[bytes]]) -> Edits:
+        return {
+            rel_path: data.decode("utf-8") if data is not None else None
+            for rel_path, data in after.items()
+            if before.get(rel_path) != data
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            cursor = self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.stats.evictions += max(cursor.rowcount, 0)
+        if not self.max_bytes:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
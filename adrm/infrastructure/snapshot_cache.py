@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Tuple, Union
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 65536
+
+
+class FileSignature(NamedTuple):
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result) -> "FileSignature":
+        return cls(stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+@dataclass
+class SnapshotStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_cached: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes_cached": self.bytes_cached,
+        }
+
+
+# Content-addressed cache of file contents. A path maps to the signature it was
+# read with and a digest; identical contents share one blob. Unchanged files cost
+# a single stat(). Blobs are evicted least recently used once the byte budget
+# is exceeded, path entries once there are more than max_entries.
+class FileSnapshotCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stats = SnapshotStats()
+        self._entries: "OrderedDict[str, Tuple[FileSignature, str]]" = OrderedDict()
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_bytes(self, path: Union[str, Path]) -> bytes:
+        key = os.fspath(path)
+        signature = FileSignature.from_stat(os.stat(key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature and entry[1] in self._blobs:
+                self._entries.move_to_end(key)
+                self._blobs.move_to_end(entry[1])
+                self.stats.hits += 1
+                return self._blobs[entry[1]]
+
+        with open(key, "rb") as handle:
+            data = handle.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.stats.misses += 1
+            self._remember(key, signature, digest)
+            self._store(digest, data)
+        return data
+
+    def read_text(self, path: Union[str, Path], encoding: str = "utf-8") -> str:
+        return self.read_bytes(path).decode(encoding)
+
+    def digest(self, path: Union[str, Path]) -> str:
+        key = os.fspath(path)
+        signature = FileSignature.from_stat(os.stat(key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1]
+        with open(key, "rb") as handle:
+            digest = hashlib.sha256(handle.read()).hexdigest()
+        with self._lock:
+            self._remember(key, signature, digest)
+        return digest
+
+    def invalidate(self, path: Union[str, Path]) -> None:
+        with self._lock:
+            self._entries.pop(os.fspath(path), None)
+
+    def _remember(self, key: str, signature: FileSignature, digest: str) -> None:
+        self._entries[key] = (signature, digest)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, digest: str, data: bytes) -> None:
+        if digest in self._blobs:
+            self._blobs.move_to_end(digest)
+            return
+        if len(data) > self.max_bytes:
+            return
+        self._blobs[digest] = data
+        self.stats.bytes_cached += len(data)
+        while self.stats.bytes_cached > self.max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self.stats.bytes_cached -= len(evicted)
+            self.stats.evictions += 1
+
+
+# Read-only mapping of relative path -> text for a step's files. Only the names
+# are held; a file is read through the cache when its text is asked for, so
+# steps that only pass names on never read contents at all.
+class SnapshotContent(Mapping[str, str]):
+    def __init__(self, cache: FileSnapshotCache, working_dir: Path, file_paths: List[str]):
+        self._cache = cache
+        self._working_dir = working_dir
+        self._file_paths = dict.fromkeys(file_paths)
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self._file_paths:
+            raise KeyError(key)
+        return self._cache.read_text(self._working_dir / key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._file_paths)
+
+    def __len__(self) -> int:
+        return len(self._file_paths)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from adrm.infrastructure import tracing
+
+SCHEMA_VERSION = 1
+
+# (line, name, kind): a tag without the file it was found in, so files with
+# identical contents share one entry
+SymbolRow = Tuple[int, str, str]
+
+
+@dataclass
+class SymbolIndexStats:
+    lookups: int = 0
+    reused: int = 0
+    parsed: int = 0
+    refresh_seconds: float = 0.0
+    build_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "lookups": self.lookups,
+            "reused": self.reused,
+            "parsed": self.parsed,
+            "refresh_ms": round(self.refresh_seconds * 1000, 1),
+            "build_ms": round(self.build_seconds * 1000, 1),
+        }
+
+
+# Persistent tags for aider's repo map, keyed by file content hash and
+# extension. File digests are memoized by (size, mtime), so an unchanged file
+# costs a stat and one indexed lookup; only new or edited contents are
+# parsed. The SQLite file is shared by every coder, step and process using
+# the same path. `namespace` separates parsers whose output may differ.
+class SymbolIndex:
+    def __init__(self, path: Path, namespace: str = ""):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.stats = SymbolIndexStats()
+        self._memory: Dict[str, List[SymbolRow]] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use, so clients that never build a repo map leave no file behind
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # One commit per parsed file; with WAL, NORMAL still cannot corrupt the index
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS tags (key TEXT PRIMARY KEY, rows TEXT NOT NULL)")
+            self._db.commit()
+        return self._db
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+
+    def digest(self, fname: str) -> Optional[str]:
+        try:
+            stat = os.stat(fname)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._connect().execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (fname,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        try:
+            with open(fname, "rb") as handle:
+                digest = hashlib.sha256(handle.read()).hexdigest()
+        except OSError:
+            return None
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                (fname, stat.st_size, stat.st_mtime_ns, digest)
+            )
+            db.commit()
+        return digest
+
+    def key(self, fname: str, digest: str) -> str:
+        return f"v{SCHEMA_VERSION}:{self.namespace}:{Path(fname).suffix.lower()}:{digest}"
+
+    def tags(self, fname: str, rel_fname: str, parse: Callable[[], Iterable[Any]], tag_type: Callable[..., Any]) -> List[Any]:
+        start = time.perf_counter()
+        digest = self.digest(fname)
+        if digest is None:
+            return []
+        key = self.key(fname, digest)
+        rows = self._lookup(key)
+        if rows is not None:
+            with self._lock:
+                self.stats.lookups += 1
+                self.stats.reused += 1
+                self.stats.refresh_seconds += time.perf_counter() - start
+            tracing.count("symbol_files_reused", 1)
+        else:
+            build_start = time.perf_counter()
+            rows = [(tag.line, tag.name, tag.kind) for tag in parse()]
+            self._store(key, rows)
+            with self._lock:
+                self.stats.lookups += 1
+                self.stats.parsed += 1
+                self.stats.refresh_seconds += build_start - start
+                self.stats.build_seconds += time.perf_counter() - build_start
+            tracing.count("symbol_files_parsed", 1)
+        return [tag_type(rel_fname, fname, line, name, kind) for line, name, kind in rows]
+
+    def _lookup(self, key: str) -> Optional[List[SymbolRow]]:
+        with self._lock:
+            rows = self._memory.get(key)
+            if rows is not None:
+                return rows
+            row = self._connect().execute("SELECT rows FROM tags WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            rows = [tuple(item) for item in json.loads(row[0])]
+            self._memory[key] = rows
+            return rows
+
+    def _store(self, key: str, rows: List[SymbolRow]) -> None:
+        with self._lock:
+            self._memory[key] = rows
+            db = self._connect()
+            db.execute("INSERT OR REPLACE INTO tags (key, rows) VALUES (?, ?)", (key, json.dumps(rows)))
+            db.commit()
+
+    def install(self, repo_map: Any) -> None:
+        # Serves aider's RepoMap.get_tags from the index; get_tags_raw still
+        # does the parsing on a miss
+        from aider.repomap import Tag
+
+        def get_tags(fname, rel_fname):
+            return self.tags(fname, rel_fname, lambda: repo_map.get_tags_raw(fname, rel_fname), Tag)
+
+        repo_map.get_tags = get_tags
+        # get_ranked_tags compares len(TAGS_CACHE) with the file count to decide
+        # whether this is a first scan
+        repo_map.TAGS_CACHE = self
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
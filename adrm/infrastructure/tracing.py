@@ -0,0 +1,305 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("adrm_span", default=None)
+
+
+@dataclass
+class Phase:
+    name: str
+    start_ns: int
+    end_ns: int
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    start_ns: int
+    end_ns: int = 0
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    phases: List[Phase] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start_ns = time.time_ns()
+        try:
+            yield
+        finally:
+            self.record_phase(name, start_ns, time.time_ns())
+
+    def record_phase(self, name: str, start_ns: int, end_ns: int) -> None:
+        with self._lock:
+            self.phases.append(Phase(name, start_ns, end_ns))
+
+    def add(self, counter: str, value: int) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def phase_seconds(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for item in self.phases:
+            totals[item.name] = totals.get(item.name, 0.0) + item.seconds
+        return totals
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    # Times a phase of the active span; a no-op outside of one
+    span = _current_span.get()
+    if span is None:
+        yield
+        return
+    with span.phase(name):
+        yield
+
+
+def count(counter: str, value: int) -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.add(counter, value)
+
+
+def traced_method(target: Any, method: str, phase_name: str) -> None:
+    # Replaces target.method with a wrapper timing each call as phase_name
+    original = getattr(target, method, None)
+    if original is None:
+        return
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        with phase(phase_name):
+            return original(*args, **kwargs)
+
+    setattr(target, method, wrapper)
+
+
+def counted_method(target: Any, method: str, counters: Dict[str, str]) -> None:
+    # Adds target attributes to span counters just before each call, for
+    # methods that report and then reset running totals
+    original = getattr(target, method, None)
+    if original is None:
+        return
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        for counter, attribute in counters.items():
+            value = getattr(target, attribute, 0)
+            if isinstance(value, int):
+                count(counter, value)
+        return original(*args, **kwargs)
+
+    setattr(target, method, wrapper)
+
+
+def traced_stream(target: Any, method: str) -> None:
+    # Generator variant: model latency covers the whole stream and the first
+    # yielded chunk marks time to first token
+    original = getattr(target, method, None)
+    if original is None:
+        return
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        span = _current_span.get()
+        if span is None:
+            yield from original(*args, **kwargs)
+            return
+        start_ns = time.time_ns()
+        first = True
+        try:
+            for chunk in original(*args, **kwargs):
+                if first:
+                    span.record_phase("time_to_first_token", start_ns, time.time_ns())
+                    first = False
+                yield chunk
+        finally:
+            span.record_phase("model_latency", start_ns, time.time_ns())
+
+    setattr(target, method, wrapper)
+
+
+class OtlpJsonExporter:
+    # One OTLP/JSON ExportTraceServiceRequest per line, the format written by
+    # the OpenTelemetry collector's file exporter. Phases become child spans.
+    def __init__(self, path: Path, service_name: str = "adrm"):
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        spans = [self._span(span.name, span.trace_id, span.span_id, "", span.start_ns, span.end_ns,
+                            {**span.attributes, **span.counters}, span.status)]
+        for index, item in enumerate(span.phases):
+            spans.append(self._span(item.name, span.trace_id, f"{span.span_id[:12]}{index:04x}",
+                                    span.span_id, item.start_ns, item.end_ns, {}, "ok"))
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "adrm"}, "spans": spans}]
+            }]
+        }
+        line = json.dumps(request, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+
+    @staticmethod
+    def _span(name: str, trace_id: str, span_id: str, parent_id: str, start_ns: int, end_ns: int,
+              attributes: Dict[str, Any], status: str) -> Dict[str, Any]:
+        return {
+            "traceId": trace_id,
+            "spanId": span_id,
+            "parentSpanId": parent_id,
+            "name": name,
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_attribute(key, value) for key, value in sorted(attributes.items())],
+            "status": {"code": 1 if status == "ok" else 2}
+        }
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class PrometheusTextfileExporter:
+    # Cumulative totals rewritten atomically after every span, for the
+    # node_exporter textfile collector
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._steps: Dict[str, int] = {}
+        self._step_seconds = 0.0
+        self._phase_seconds: Dict[str, float] = {}
+        self._phase_count: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._steps[span.status] = self._steps.get(span.status, 0) + 1
+            self._step_seconds += span.seconds
+            for item in span.phases:
+                self._phase_seconds[item.name] = self._phase_seconds.get(item.name, 0.0) + item.seconds
+                self._phase_count[item.name] = self._phase_count.get(item.name, 0) + 1
+            for name, value in span.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            self._write()
+
+    def render(self) -> str:
+        lines = [
+            "# HELP adrm_steps_total Steps finished, by status",
+            "# TYPE adrm_steps_total counter",
+        ]
+        lines += [f'adrm_steps_total{{status="{status}"}} {value}' for status, value in sorted(self._steps.items())]
+        lines += [
+            "# HELP adrm_step_seconds_total Wall-clock time spent in steps",
+            "# TYPE adrm_step_seconds_total counter",
+            f"adrm_step_seconds_total {self._step_seconds:.6f}",
+            "# HELP adrm_phase_seconds_total Time spent per step phase",
+            "# TYPE adrm_phase_seconds_total counter",
+        ]
+        lines += [
+            f'adrm_phase_seconds_total{{phase="{name}"}} {value:.6f}'
+            for name, value in sorted(self._phase_seconds.items())
+        ]
+        lines += [
+            "# HELP adrm_phase_count_total Timed occurrences per step phase",
+            "# TYPE adrm_phase_count_total counter",
+        ]
+        lines += [f'adrm_phase_count_total{{phase="{name}"}} {value}' for name, value in sorted(self._phase_count.items())]
+        for name, value in sorted(self._counters.items()):
+            lines += [f"# TYPE adrm_{name}_total counter", f"adrm_{name}_total {value}"]
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+
+class Tracer:
+    def __init__(self, exporters: Optional[List[Any]] = None, logger: Any = None):
+        self.exporters = exporters or []
+        self.logger = logger
+
+    @classmethod
+    def from_config(cls, config, root: Path, logger: Any = None) -> "Tracer":
+        exporters: List[Any] = []
+        if config.otlp_path:
+            exporters.append(OtlpJsonExporter(root / config.otlp_path))
+        if config.prometheus_path:
+            exporters.append(PrometheusTextfileExporter(root / config.prometheus_path))
+        return cls(exporters, logger)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            start_ns=time.time_ns(),
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        if self.logger is not None:
+            self.logger.info(
+                "step_trace",
+                span=span.name,
+                status=span.status,
+                seconds=round(span.seconds, 4),
+                phases={name: round(value, 4) for name, value in span.phase_seconds().items()},
+                **span.counters
+            )
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+def in_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    # run_in_executor does not carry context variables into the worker thread
+    return functools.partial(contextvars.copy_context().run, func)
@@ -1,4 +1,8 @@
-from typing import List, Optional, Type
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Type
 from pathlib import Path
 import structlog
 from aider.coders import (
@@ -8,8 +12,17 @@ from aider.coders import (
     ArchitectCoder
 )
 from aider.models import Model
-from aider.io import InputOutput
 from adrm.core.models import AiderConfig, AiderCoderConfig
+from adrm.integrations.coder_pool import CoderKey, CoderPool
+from adrm.integrations.fake_backend import CannedResponse, FakeCoder, load_canned_responses
+from adrm.integrations.pipeline_io import PipelineIO, stream_through_pipeline
+from adrm.infrastructure.output_pipeline import OutputPipeline
+from adrm.infrastructure.commit_batcher import CommitBatcher
+from adrm.infrastructure.path_matcher import PathMatcher
+from adrm.infrastructure.rate_governor import governed_stream, governor_for
+from adrm.infrastructure.response_cache import ResponseCache
+from adrm.infrastructure.symbol_index import SymbolIndex
+from adrm.infrastructure import tracing
 import os
 from rich.console import Console
 
@@ -20,11 +33,73 @@ class AiderClient:
         "architect": ArchitectCoder
     }
 
-    def __init__(self, config: AiderConfig, logger: structlog.BoundLogger, console: Optional[Console] = None):
+    def __init__(
+        self,
+        config: AiderConfig,
+        logger: structlog.BoundLogger,
+        console: Optional[Console] = None,
+        working_dir: Optional[Path] = None
+    ):
         self.config = config
         self.logger = logger
-        self.model = Model(config.model_name)
-        api_key = config.api_key or os.getenv("ADRM_API_KEY")
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.model_name = config.model_name
+        self.fake_responses: List[CannedResponse] = []
+        if config.backend == "fake":
+            self.model = None
+            if config.fake.responses_file:
+                self.fake_responses = load_canned_responses(Path(config.fake.responses_file))
+            self._fake_rng = random.Random(config.fake.seed)
+        else:
+            self.model = self._create_model()
+        # Shared by every client in the process that calls this model
+        self.governor = governor_for(self.model_name, config.rate_limits)
+        self.console = console or Console()
+        # Model streams hand rendering to a separate thread
+        self.output = OutputPipeline.create(
+            config.output_mode,
+            self.console,
+            pretty=config.pretty,
+            max_pending=config.output_queue_size
+        )
+        self.io = PipelineIO(
+            self.output,
+            yes=config.coder.auto_confirm,
+            pretty=config.pretty
+        )
+        self.path_matcher = PathMatcher.from_config(config.coder, self.working_dir)
+        self.coder_pool = CoderPool(
+            lambda key: self.create_coder(list(key[2]), list(key[3])),
+            max_size=config.coder_pool_size
+        )
+        self.response_cache: Optional[ResponseCache] = None
+        if config.response_cache.enabled:
+            # An absolute path lets several working trees share one cache
+            self.response_cache = ResponseCache(
+                self.working_dir / config.response_cache.path,
+                self.working_dir,
+                ttl_seconds=config.response_cache.ttl_seconds,
+                max_bytes=config.response_cache.max_bytes
+            )
+        self.symbol_index: Optional[SymbolIndex] = None
+        if config.symbol_index_path and config.backend != "fake":
+            from aider import __version__ as aider_version
+            self.symbol_index = SymbolIndex(
+                self.working_dir / config.symbol_index_path,
+                namespace=f"aider-{aider_version}"
+            )
+        self.commits: Optional[CommitBatcher] = None
+        if config.git_enabled and config.commit_policy != "step":
+            self.commits = self._create_commit_batcher()
+        # Coder construction and Coder.run block, so they run on a bounded pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.max_workers,
+            thread_name_prefix="adrm-aider"
+        )
+
+    def _create_model(self) -> Model:
+        model = Model(self.config.model_name)
+        api_key = self.config.api_key or os.getenv("ADRM_API_KEY")
         if not api_key:
             error_message = """
 API key not found. Please set your API key using one of these methods:
@@ -43,12 +118,17 @@ You can get your API key from: https://platform.openai.com/api-keys
             self.logger.error("api_key_not_found")
             raise ValueError(error_message)
             
-        self.model.api_key = api_key
-        self.console = console or Console()
-        self.io = InputOutput(
-            yes=config.coder.auto_confirm,
-            pretty=config.pretty
-        )
+        model.api_key = api_key
+        return model
+
+    def _create_commit_batcher(self) -> Optional[CommitBatcher]:
+        import git
+
+        try:
+            return CommitBatcher(self.working_dir, self.config.commit_policy, self.config.commit_every, self.logger)
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+            self.logger.warning("commit_batching_disabled", reason="not a git repository")
+            return None
 
     def _get_coder_class(self) -> Type[Coder]:
         coder_type = self.config.coder.type
@@ -56,45 +136,204 @@ You can get your API key from: https://platform.openai.com/api-keys
             raise ValueError(f"Unsupported coder type: {coder_type}")
         return self.CODER_TYPES[coder_type]
 
-    def create_coder(self, files: List[str]) -> Coder:
+    def create_coder(self, files: List[str], read_only_files: Optional[List[str]] = None) -> Coder:
+        with tracing.phase("coder_construction"):
+            coder = self._build_coder(files, read_only_files or [])
+        self._instrument(coder)
+        return coder
+
+    def _build_coder(self, files: List[str], read_only_files: List[str]) -> Coder:
         coder_class = self._get_coder_class()
         
         # Filter files based on include/exclude patterns
         filtered_files = self._filter_files(files)
+
+        if self.config.backend == "fake":
+            return FakeCoder(
+                self.config.fake,
+                filtered_files,
+                self.working_dir,
+                read_only_fnames=read_only_files,
+                allow_edits=self.config.coder.allow_edits,
+                responses=self.fake_responses,
+                rng=random.Random(self._fake_rng.getrandbits(64)),
+                io=self.io
+            )
         
-        return coder_class.create(
+        coder = coder_class.create(
             main_model=self.model,
             fnames=filtered_files,
+            read_only_fnames=read_only_files,
             io=self.io,
-            allow_edits=self.config.coder.allow_edits,
-            git_enabled=self.config.git_enabled,
-            chat_history_file=self.config.chat_history_file
+            edit_format=coder_class.edit_format,
+            dry_run=not self.config.coder.allow_edits,
+            use_git=self.config.git_enabled,
+            stream=self.config.stream_output,
+            auto_commits=self.config.commit_policy == "step",
+            dirty_commits=self.config.commit_policy == "step"
         )
+        stream_through_pipeline(coder)
+        if self.symbol_index is not None and getattr(coder, "repo_map", None) is not None:
+            self.symbol_index.install(coder.repo_map)
+        return coder
+
+    def _instrument(self, coder: Coder) -> None:
+        # Wrappers record into whichever step span is active when they run
+        tracing.traced_stream(coder, "send")
+        # Applied last so waits and backoff stay out of the model latency phases.
+        # Aider's send_message already retries failed sends, so the governor
+        # only admits them and adapts its limits; the fake coder has no loop
+        governed_stream(coder, "send", self.governor, retry=self.config.backend == "fake")
+        tracing.traced_method(coder, "apply_updates", "edit_apply")
+        tracing.traced_method(coder, "auto_commit", "git_commit")
+        tracing.counted_method(coder, "show_usage_report", {
+            "prompt_tokens": "message_tokens_sent",
+            "completion_tokens": "message_tokens_received"
+        })
+
+    def _coder_key(self, files: List[str], read_only_files: List[str]) -> CoderKey:
+        return (self.config.coder.type, self.model_name, tuple(sorted(files)), tuple(sorted(read_only_files)))
+
+    def _run_pooled(self, prompt: str, files: List[str], read_only_files: List[str]) -> Optional[Set[str]]:
+        key = self._coder_key(files, read_only_files)
+        with self.coder_pool.lease(key) as coder:
+            coder.run(prompt)
+            edited = getattr(coder, "aider_edited_files", None)
+            root = getattr(coder, "root", None)
+        self.logger.debug("coder_pool_stats", **self.coder_pool.stats.as_dict())
+        if not isinstance(edited, (set, frozenset, list, tuple)):
+            return None
+        # Aider reports edits relative to the coder's git root, which is not
+        # necessarily the working directory or the process cwd
+        root = Path(root) if isinstance(root, (str, os.PathLike)) else self.working_dir
+        edited = {str(root / path) for path in edited}
+        tracing.count("bytes_written", self._written_bytes(edited))
+        if self.commits:
+            self.commits.record(edited, prompt)
+        return edited
+
+    @staticmethod
+    def _written_bytes(edited) -> int:
+        total = 0
+        for file_path in edited:
+            try:
+                total += os.path.getsize(file_path)
+            except OSError:
+                pass
+        return total
+
+    def _run_cached(self, prompt: str, files: List[str], read_only_files: List[str]) -> None:
+        cache = self.response_cache
+        if cache is None:
+            self._run_pooled(prompt, files, read_only_files)
+            return
+
+        cache_key = cache.key(
+            self.model_name,
+            self.config.coder.type,
+            self.config.coder.allow_edits,
+            prompt,
+            files,
+            read_only_files
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            written = cache.replay(cached)
+            if self.commits:
+                self.commits.record(written, prompt)
+            tracing.count("bytes_written", sum(len(content or "") for content in cached.edits.values()))
+            self.logger.info(
+                "response_cache_hit",
+                files=written,
+                step_saved_ms=round(cached.elapsed_seconds * 1000, 1),
+                **cache.stats.as_dict()
+            )
+            return
+
+        before = cache.snapshot(files)
+        start = time.perf_counter()
+        edited = self._run_pooled(prompt, files, read_only_files)
+        elapsed = time.perf_counter() - start
+        # Files the model created outside the step's list are recorded too
+        if isinstance(edited, (set, frozenset, list, tuple)):
+            before.update({path: None for path in map(cache.relative, edited) if path not in before})
+        try:
+            cache.put(cache_key, cache.diff(before, cache.snapshot(before)), elapsed)
+        except UnicodeDecodeError:
+            self.logger.warning("response_cache_skipped", reason="binary edit")
+        self.logger.debug("response_cache_stats", **cache.stats.as_dict())
+
+    def complete(self, prompt: str) -> str:
+        # A single chat completion with no files or edits, e.g. for generated documents
+        if self.config.backend == "fake":
+            coder = FakeCoder(
+                self.config.fake,
+                [],
+                self.working_dir,
+                allow_edits=False,
+                responses=self.fake_responses,
+                rng=random.Random(self._fake_rng.getrandbits(64))
+            )
+            return self.governor.call(lambda: coder.run(prompt), self.governor.estimate_tokens(prompt))
+
+        # send_completion raises litellm errors, unlike simple_send_with_retries,
+        # so throttling reaches the governor and it alone retries
+        from aider.sendchat import send_completion
+        messages = [{"role": "user", "content": prompt}]
+
+        def send():
+            _, response = send_completion(
+                self.model.name,
+                messages,
+                None,
+                False,
+                temperature=0 if self.model.use_temperature else None,
+                extra_params=self.model.extra_params
+            )
+            return response
+
+        response = self.governor.call(send, self.governor.estimate_tokens(messages))
+        choices = getattr(response, "choices", None)
+        if not choices or choices[0].message.content is None:
+            raise RuntimeError("Model returned no content")
+        return choices[0].message.content
+
+    def flush_commits(self) -> None:
+        # Commits edits still pending under a batched commit policy
+        if self.commits:
+            self.commits.flush()
 
     def _filter_files(self, files: List[str]) -> List[str]:
-        if not (self.config.coder.include_patterns or self.config.coder.exclude_patterns):
+        if not self.path_matcher:
             return files
+        return self.path_matcher.filter(files)
 
-        import fnmatch
-        filtered = []
-        for file in files:
-            # Check include patterns
-            if self.config.coder.include_patterns:
-                if not any(fnmatch.fnmatch(file, p) for p in self.config.coder.include_patterns):
-                    continue
-            
-            # Check exclude patterns
-            if self.config.coder.exclude_patterns:
-                if any(fnmatch.fnmatch(file, p) for p in self.config.coder.exclude_patterns):
-                    continue
-                    
-            filtered.append(file)
-        return filtered
-
-    async def execute_prompt(self, prompt: str, files: List[str]) -> None:
+    async def execute_prompt(self, prompt: str, files: List[str], read_only_files: Optional[List[str]] = None) -> None:
+        loop = asyncio.get_running_loop()
         try:
-            coder = self.create_coder(files)
-            await coder.run(prompt)
+            await loop.run_in_executor(
+                self._executor,
+                tracing.in_context(self._run_cached),
+                prompt,
+                files,
+                list(read_only_files or [])
+            )
         except Exception as e:
             self.logger.error("aider_execution_failed", error=str(e))
-            raise 
\ No newline at end of file
+            raise
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.coder_pool.clear()
+        if self.commits:
+            self.commits.flush()
+            self.logger.info("commit_stats", **self.commits.stats.as_dict())
+        self.output.close()
+        self.logger.debug("rate_governor_stats", model=self.model_name, **self.governor.stats.as_dict())
+        self.logger.debug("output_pipeline_stats", mode=self.output.mode, **self.output.stats.as_dict())
+        if self.symbol_index:
+            self.logger.info("symbol_index_stats", **self.symbol_index.stats.as_dict())
+            self.symbol_index.close()
+        if self.response_cache:
+            self.logger.info("response_cache_stats", **self.response_cache.stats.as_dict())
+            self.response_cache.close() 
\ No newline at end of file
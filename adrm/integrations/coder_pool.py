@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+# (coder type, model name, editable files, read-only files)
+CoderKey = Tuple[str, str, Tuple[str, ...], Tuple[str, ...]]
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+@dataclass
+class _PooledCoder:
+    coder: Any
+    abs_fnames: Set[str] = field(default_factory=set)
+
+
+# Keyed LRU cache of warmed aider Coders. A leased coder belongs to one step until
+# it is returned, so concurrent steps never share chat state. Coders leased by a
+# step that failed are discarded.
+class CoderPool:
+    def __init__(self, factory: Callable[[CoderKey], Any], max_size: int = 8):
+        self.factory = factory
+        self.max_size = max_size
+        self.stats = PoolStats()
+        self._idle: "OrderedDict[CoderKey, List[_PooledCoder]]" = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, key: CoderKey) -> Iterator[Any]:
+        entry = self._checkout(key)
+        self._reset(entry)
+        # A coder whose run raised may hold half-updated chat state, so only
+        # coders that finished cleanly go back to the pool
+        yield entry.coder
+        self._checkin(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._idle_count = 0
+
+    def __len__(self) -> int:
+        return self._idle_count
+
+    def _checkout(self, key: CoderKey) -> _PooledCoder:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                entry = idle.pop()
+                self._idle_count -= 1
+                if not idle:
+                    del self._idle[key]
+                self.stats.hits += 1
+                return entry
+            self.stats.misses += 1
+
+        coder = self.factory(key)
+        abs_fnames = getattr(coder, "abs_fnames", None)
+        if not isinstance(abs_fnames, (set, frozenset, list, tuple)):
+            abs_fnames = ()
+        return _PooledCoder(coder, set(abs_fnames))
+
+    def _checkin(self, key: CoderKey, entry: _PooledCoder) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._idle.setdefault(key, []).append(entry)
+            self._idle.move_to_end(key)
+            self._idle_count += 1
+            while self._idle_count > self.max_size:
+                oldest_key, oldest = next(iter(self._idle.items()))
+                oldest.pop(0)
+                if not oldest:
+                    del self._idle[oldest_key]
+                self._idle_count -= 1
+                self.stats.evictions += 1
+
+    @staticmethod
+    def _reset(entry: _PooledCoder) -> None:
+        # Drop per-step chat state while keeping repo map, git handle and model warm
+        coder = entry.coder
+        coder.cur_messages = []
+        coder.done_messages = []
+        coder.reflected_message = None
+        coder.abs_fnames = set(entry.abs_fnames)
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from adrm.core.models import FakeBackendConfig
+
+EDIT_BLOCK = re.compile(
+    r"^(?P<path>[^\n]+)\n<<<<<<< SEARCH\n(?P<search>.*?)^=======\n(?P<replace>.*?)^>>>>>>> REPLACE\n?",
+    re.MULTILINE | re.DOTALL
+)
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("Simulated rate limit (429)")
+
+
+class EditBlock(NamedTuple):
+    path: str
+    search: str
+    replace: str
+
+
+class CannedResponse(NamedTuple):
+    match: "re.Pattern[str]"
+    response: str
+
+
+def parse_edit_blocks(text: str) -> List[EditBlock]:
+    return [
+        EditBlock(m.group("path").strip().strip("`"), m.group("search"), m.group("replace"))
+        for m in EDIT_BLOCK.finditer(text)
+    ]
+
+
+def apply_edit_block(root: Path, block: EditBlock) -> bool:
+    full_path = root / block.path
+    original = full_path.read_text(encoding="utf-8") if full_path.exists() else ""
+    if not block.search:
+        # An empty SEARCH section appends, or creates the file
+        updated = original + block.replace
+    elif block.search in original:
+        updated = original.replace(block.search, block.replace, 1)
+    else:
+        return False
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+    full_path.write_text(updated, encoding="utf-8")
+    return True
+
+
+def load_canned_responses(path: Path) -> List[CannedResponse]:
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    return [CannedResponse(re.compile(entry.get("match", "")), entry["response"]) for entry in entries]
+
+
+def sample_latency(config: FakeBackendConfig, rng: random.Random) -> float:
+    mean = config.latency_ms
+    jitter = config.latency_jitter_ms
+    if config.distribution == "fixed" or not jitter:
+        value = mean
+    elif config.distribution == "uniform":
+        value = rng.uniform(mean - jitter, mean + jitter)
+    elif config.distribution == "normal":
+        value = rng.gauss(mean, jitter)
+    else:
+        # Parameterized so the samples have the configured mean and spread
+        sigma2 = math.log(1 + (jitter / mean) ** 2) if mean else 0.0
+        value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2)) if mean else 0.0
+    return max(value, 0.0) / 1000
+
+
+# Stand-in for an aider Coder that answers from canned or synthetic edit blocks
+# after a simulated time to first token and token stream. It carries the Coder
+# attributes the pool and response cache rely on.
+class FakeCoder:
+    def __init__(
+        self,
+        config: FakeBackendConfig,
+        fnames: List[str],
+        root: Path,
+        read_only_fnames: Optional[List[str]] = None,
+        allow_edits: bool = True,
+        responses: Optional[List[CannedResponse]] = None,
+        rng: Optional[random.Random] = None,
+        io: Any = None
+    ):
+        self.config = config
+        self.root = Path(root)
+        self.abs_fnames: Set[str] = {str(self.root / fname) for fname in fnames}
+        self.abs_read_only_fnames: Set[str] = {str(self.root / fname) for fname in read_only_fnames or []}
+        self.allow_edits = allow_edits
+        self.responses = responses or []
+        self.rng = rng or random.Random(config.seed)
+        self.io = io
+        self.cur_messages: List[Dict[str, Any]] = []
+        self.done_messages: List[Dict[str, Any]] = []
+        self.reflected_message: Optional[str] = None
+        self.aider_edited_files: Set[str] = set()
+        self.partial_response_content = ""
+        self.message_tokens_sent = 0
+        self.message_tokens_received = 0
+        self.last_timing: Dict[str, float] = {}
+
+    def run(self, with_message: str) -> str:
+        self.aider_edited_files = set()
+        self.partial_response_content = ""
+        # Rendered like aider's markdown stream when an io is attached
+        mdstream = self.io.get_assistant_mdstream() if self.io is not None else None
+        for _ in self.send(with_message):
+            if mdstream is not None:
+                mdstream.update(self.partial_response_content)
+        response = self.partial_response_content
+        if mdstream is not None:
+            mdstream.update(response, final=True)
+        self.cur_messages += [
+            {"role": "user", "content": with_message},
+            {"role": "assistant", "content": response}
+        ]
+        if self.allow_edits:
+            self.aider_edited_files = self.apply_updates()
+        self.show_usage_report()
+        return response
+
+    def send(self, prompt: str) -> Iterator[str]:
+        if self.config.rate_limit_error_rate and self.rng.random() < self.config.rate_limit_error_rate:
+            raise FakeRateLimitError()
+        response = self._respond(prompt)
+        tokens = max(len(response) // 4, 1)
+        ttft = sample_latency(self.config, self.rng)
+        stream = tokens / self.config.tokens_per_second
+        self.last_timing = {"ttft_seconds": ttft, "stream_seconds": stream, "tokens": tokens}
+        self.message_tokens_sent += max(len(prompt) // 4, 1)
+        self.message_tokens_received += tokens
+
+        time.sleep(ttft)
+        # Stream in a handful of chunks so time to first token is observable
+        chunk_size = max(len(response) // 4, 1)
+        for start in range(0, len(response), chunk_size):
+            chunk = response[start:start + chunk_size]
+            self.partial_response_content += chunk
+            yield chunk
+            time.sleep(stream * len(chunk) / len(response))
+
+    def apply_updates(self) -> Set[str]:
+        edited = set()
+        for block in parse_edit_blocks(self.partial_response_content):
+            if apply_edit_block(self.root, block):
+                edited.add(block.path)
+        return edited
+
+    def show_usage_report(self) -> None:
+        self.message_tokens_sent = 0
+        self.message_tokens_received = 0
+
+    def _respond(self, prompt: str) -> str:
+        for canned in self.responses:
+            if canned.match.search(prompt):
+                return canned.response
+        return self._synthetic(prompt)
+
+    def _synthetic(self, prompt: str) -> str:
+        marker = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        # Pad the reply so its length tracks the configured response size
+        padding = "x" * max(self.config.response_tokens * 4 - 64 * len(self.abs_fnames), 0)
+        blocks = [f"Synthetic response {marker}\n{padding}\n"]
+        for abs_fname in sorted(self.abs_fnames):
+            try:
+                rel_path = Path(abs_fname).relative_to(self.root).as_posix()
+            except ValueError:
+                continue
+            blocks.append(f"{rel_path}\n<<<<<<< SEARCH\n=======\n# adrm-fake {marker}\n>>>>>>> REPLACE\n")
+        return "\n".join(blocks)
@@ -0,0 +1,25 @@
+from aider.io import InputOutput
+
+from adrm.infrastructure.output_pipeline import OutputPipeline, PipelineStream
+
+
+class PipelineIO(InputOutput):
+    # Routes assistant output through an OutputPipeline instead of rendering
+    # on the thread consuming the model stream
+    def __init__(self, pipeline: OutputPipeline, **kwargs):
+        super().__init__(**kwargs)
+        self.pipeline = pipeline
+
+    def get_assistant_mdstream(self) -> PipelineStream:
+        return self.pipeline.open_stream()
+
+    def assistant_output(self, message, pretty=None):
+        self.pipeline.open_stream().update(message or "<no response>", final=True)
+
+
+def stream_through_pipeline(coder) -> None:
+    # Coders only stream through get_assistant_mdstream when show_pretty();
+    # otherwise they write tokens straight to stdout. Rendering style is the
+    # pipeline's choice, so the coder stays on the stream path while io.pretty
+    # (aider.pretty, NO_COLOR, dumb terminals) still governs tool output.
+    coder.show_pretty = lambda: coder.fence[0][0] == "`"
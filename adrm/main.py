@@ -1,24 +1,41 @@
 #!/usr/bin/env python3
+import sys
 import typer
 import os
 from pathlib import Path
-from rich import print
-from adrm.core.container import AppContainer
-from adrm.services.initializer import ProjectInitializer
+from typing import Optional
+
+# Heavy modules (aider, litellm, structlog, the container) are imported inside
+# the commands that need them, so lightweight commands start quickly.
+# Run `adrm --profile-startup <command>` for an import-time breakdown.
+
+PROFILE_STARTUP_FLAG = "--profile-startup"
 
 app = typer.Typer()
 
 def get_config_locations() -> dict:
     package_dir = Path(__file__).parent.parent
     config_locations = {
+        "project_config": package_dir / "config" / "config.yaml",
         "aider_config": package_dir / "config" / "aider.yaml",
         "steps_config": package_dir / "config" / "steps.json",
     }
     return {k: str(v.absolute()) for k, v in config_locations.items()}
 
+@app.callback()
+def callback(
+    profile_startup: bool = typer.Option(
+        False,
+        PROFILE_STARTUP_FLAG,
+        help="Print an import-time breakdown after running the command"
+    )
+):
+    """ADRM command line interface"""
+
 @app.command()
 def config():
     """Show configuration file locations"""
+    from rich import print
     locations = get_config_locations()
     print("\n[bold]Configuration file locations:[/bold]")
     for name, path in locations.items():
@@ -26,22 +43,253 @@ def config():
         print(f"{name}: {path} ({exists})")
 
 @app.command()
-def init(model: str = typer.Option(...), api_key: str = typer.Option(...)):
+def validate(steps_file: Optional[Path] = typer.Argument(None, help="Steps file to validate")):
+    """Validate a steps file without contacting the model"""
+    import json
+    from pydantic import ValidationError
+    from adrm.core.models import Step
+    from adrm.services.scheduler import StepGraph
+
+    steps_path = steps_file or Path(get_config_locations()["steps_config"])
+    try:
+        steps = [Step(**step) for step in json.loads(steps_path.read_text())]
+        levels = StepGraph(steps).levels()
+    except (OSError, ValueError, TypeError, ValidationError) as e:
+        typer.secho(f"Invalid steps file {steps_path}: {str(e)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    typer.secho(f"{steps_path}: {len(steps)} steps in {len(levels)} stages", fg=typer.colors.GREEN)
+
+@app.command("compile-workflow")
+def compile_workflow(
+    steps_file: Optional[Path] = typer.Argument(None, help="Steps file to compile"),
+    output: Optional[Path] = typer.Option(None, help="Bundle location; defaults to <steps>.bundle.json beside the steps file"),
+    check: bool = typer.Option(False, "--check", help="Fail if the existing bundle is stale instead of writing it")
+):
+    """Compile a steps file into a validated bundle that runs load directly"""
+    from adrm.core.models import FileContextConfig
+    from adrm.core.workflow import bundle_path, compile_workflow as compile_bundle, read_bundle, write_bundle
+    from adrm.infrastructure.file_index import FileIndex
+
+    steps_path = steps_file or Path(get_config_locations()["steps_config"])
+    target = output or bundle_path(steps_path)
+    index_path = FileContextConfig().index_path
+    file_index = FileIndex(Path.cwd(), Path.cwd() / index_path if index_path else None)
+    try:
+        bundle = compile_bundle(steps_path, Path.cwd(), file_index)
+        if check:
+            existing = read_bundle(target, steps_path)
+            if existing.compiled != bundle.compiled:
+                raise ValueError(f"{target} does not match the files currently matched by its patterns")
+    except (OSError, ValueError) as e:
+        typer.secho(f"Invalid workflow {steps_path}: {str(e)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    if check:
+        typer.secho(f"{target} is up to date", fg=typer.colors.GREEN)
+        return
+    write_bundle(bundle, target)
+    typer.secho(
+        f"{target}: {len(bundle.compiled)} steps in {len(bundle.levels)} stages",
+        fg=typer.colors.GREEN
+    )
+
+@app.command()
+def init(
+    model: str = typer.Option(...),
+    api_key: Optional[str] = typer.Option(None, help="Required unless the config provides one or aider.backend is fake"),
+    resume: bool = typer.Option(False, "--resume", help="Skip steps whose prompt and files are unchanged since the last run")
+):
     """Initialize the project with model and API key"""
+    import asyncio
+    from adrm.core.container import AppContainer
+    from adrm.services.initializer import ProjectInitializer
+
     try:
-        container = AppContainer()
+        container = AppContainer({"openai_model": model, "openai_api_key": api_key})
         initializer = ProjectInitializer(
-            config=container.config(),
-            standards_generator=container.standards_generator(),
-            logger=container.logger(),
-            console=container.console()
+            config=container['config'],
+            standards_generator=container['standards_generator'],
+            logger=container['logger'],
+            console=container['console'],
+            step_runner=container['step_runner']
         )
-        initializer.initialize(model, api_key)
+        try:
+            if not container['config'].openai_api_key and not container['step_runner'].offline:
+                raise ValueError("Missing --api-key")
+            asyncio.run(initializer.initialize(model, api_key, resume=resume))
+        finally:
+            container['file_handler'].close()
+            container['aider_client'].close()
+    except Exception as e:
+        typer.secho(f"Error: {str(e)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+@app.command()
+def run(
+    repos: Path = typer.Option(..., "--repos", help="File listing one repository path per line"),
+    steps: Optional[Path] = typer.Option(None, help="Steps file applied to every repository"),
+    jobs: int = typer.Option(min(4, os.cpu_count() or 1), min=1, help="Repositories processed in parallel"),
+    model: Optional[str] = typer.Option(None),
+    api_key: Optional[str] = typer.Option(None),
+    resume: bool = typer.Option(False, "--resume", help="Skip steps unchanged since each repository's last run"),
+    summary: Optional[Path] = typer.Option(None, help="Write the JSON summary to this file")
+):
+    """Run one workflow across many repositories"""
+    import json
+    from adrm.core.config_loader import ConfigLoader
+    from adrm.core.container import CONFIG_CACHE_PATH
+    from adrm.services.fanout import read_repo_list, run_fanout, shared_config
+
+    try:
+        repo_paths = read_repo_list(repos)
+        root = Path.cwd()
+        loaded = ConfigLoader(cache_path=root / CONFIG_CACHE_PATH).load({"openai_model": model, "openai_api_key": api_key})
+        loaded = shared_config(loaded, steps, root)
     except Exception as e:
         typer.secho(f"Error: {str(e)}", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
+    def report(result):
+        color = typer.colors.GREEN if result.status == "ok" else typer.colors.RED
+        detail = f": {result.error}" if result.error else ""
+        typer.secho(f"[{result.status}] {result.repo} ({result.seconds:.1f}s){detail}", fg=color)
+
+    outcome = run_fanout(
+        repo_paths,
+        loaded,
+        jobs,
+        {"model": model, "api_key": api_key, "resume": resume},
+        on_result=report
+    )
+    totals = outcome.as_dict()
+    typer.echo(
+        f"{totals['succeeded']}/{totals['repositories']} repositories succeeded in {totals['seconds']:.1f}s"
+    )
+    if summary:
+        summary.parent.mkdir(parents=True, exist_ok=True)
+        summary.write_text(json.dumps(totals, indent=2))
+    if outcome.failed:
+        raise typer.Exit(code=1)
+
+@app.command()
+def serve(
+    socket_path: Path = typer.Option(Path(".adrm/adrm.sock"), "--socket", help="Unix socket to listen on"),
+    concurrency: int = typer.Option(2, min=1, help="Jobs run at once"),
+    model: Optional[str] = typer.Option(None),
+    api_key: Optional[str] = typer.Option(None),
+    stop: bool = typer.Option(False, "--stop", help="Ask the daemon listening on the socket to shut down")
+):
+    """Keep aider and the configuration loaded and run jobs submitted with adrm submit"""
+    import asyncio
+    from adrm.services.daemon import AdrmDaemon, send_request
+
+    if stop:
+        try:
+            send_request({"op": "shutdown"}, socket_path)
+        except OSError:
+            typer.secho(f"No daemon listening on {socket_path}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        typer.secho("Daemon stopped", fg=typer.colors.GREEN)
+        return
+
+    from adrm.core.config_loader import ConfigLoader
+    from adrm.core.container import CONFIG_CACHE_PATH
+    import structlog
+
+    try:
+        loaded = ConfigLoader(cache_path=Path.cwd() / CONFIG_CACHE_PATH).load({"openai_model": model, "openai_api_key": api_key})
+        daemon = AdrmDaemon(
+            loaded,
+            socket_path.absolute(),
+            concurrency,
+            logger=structlog.get_logger(),
+            model=model,
+            api_key=api_key
+        )
+        asyncio.run(daemon.serve(ready=lambda: typer.secho(f"Listening on {socket_path}", fg=typer.colors.GREEN)))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        typer.secho(f"Error: {str(e)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+@app.command()
+def submit(
+    steps_file: Optional[Path] = typer.Argument(None, help="Workflow steps file; defaults to the configured one"),
+    prompt: Optional[str] = typer.Option(None, help="Run a single step with this prompt instead of a workflow"),
+    files: Optional[str] = typer.Option(None, help="Comma-separated files or patterns for --prompt"),
+    priority: int = typer.Option(0, help="Higher priorities run first"),
+    resume: bool = typer.Option(False, "--resume", help="Skip steps unchanged since the last run"),
+    socket_path: Path = typer.Option(Path(".adrm/adrm.sock"), "--socket", help="Socket of a running adrm serve")
+):
+    """Submit a workflow or a single step to a running adrm serve"""
+    from adrm.services.daemon import send_request
+
+    request = {"op": "submit", "priority": priority, "working_dir": str(Path.cwd()), "resume": resume}
+    if prompt:
+        request.update(kind="step", step={"prompt": prompt, "files": [f for f in (files or "").split(",") if f]})
+    else:
+        request["kind"] = "workflow"
+        if steps_file:
+            request["steps_file"] = str(steps_file.absolute())
+
+    def report(event):
+        if event["event"] == "step":
+            color = typer.colors.RED if event["status"] == "failed" else None
+            typer.secho(f"[{event['status']}] {event['step']}", fg=color)
+        elif event["event"] in ("queued", "started"):
+            typer.echo(f"Job {event['job']} {event['event']}")
+
+    try:
+        result = send_request(request, socket_path, report)
+    except OSError:
+        typer.secho(f"No daemon listening on {socket_path}; start one with adrm serve", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    except RuntimeError as e:
+        typer.secho(f"Error: {str(e)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    if result.get("status") != "ok":
+        typer.secho(f"Error: {result.get('error')}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    typer.secho(f"Job {result['job']} finished in {result['seconds']:.1f}s", fg=typer.colors.GREEN)
+
+@app.command()
+def bench(
+    sizes: str = typer.Option("1000,10000,100000", help="Comma-separated synthetic repository sizes"),
+    output: Path = typer.Option(Path(".adrm/bench/results.json"), help="Where to write the JSON results"),
+    keyword: Optional[str] = typer.Option(None, "-k", help="Only run scenarios matching this expression")
+):
+    """Benchmark the step pipeline against synthetic repositories"""
+    import importlib.util
+    if importlib.util.find_spec("pytest_benchmark") is None:
+        typer.secho("adrm bench requires pytest-benchmark: pip install pytest-benchmark", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    import pytest
+    from adrm.bench import BENCH_DIR, SIZES_ENV
+
+    os.environ[SIZES_ENV] = sizes
+    output = output.absolute()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    args = [
+        str(BENCH_DIR),
+        "-o", "python_files=bench_*.py",
+        "-o", "python_functions=bench_*",
+        "-o", "addopts=",
+        "-p", "no:cacheprovider",
+        f"--benchmark-json={output}",
+        "-q"
+    ]
+    if keyword:
+        args += ["-k", keyword]
+    exit_code = pytest.main(args)
+    if exit_code == 0:
+        typer.secho(f"Results written to {output}", fg=typer.colors.GREEN)
+    raise typer.Exit(code=int(exit_code))
+
 def main():
+    if PROFILE_STARTUP_FLAG in sys.argv[1:]:
+        from adrm.infrastructure.import_profile import profile_startup
+        args = [arg for arg in sys.argv[1:] if arg != PROFILE_STARTUP_FLAG]
+        sys.exit(profile_startup(args))
     app()
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set
+
+from adrm.core.models import FileContextConfig
+from adrm.infrastructure.snapshot_cache import FileSnapshotCache
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+|\S")
+TERM_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+STOPWORDS = frozenset(
+    "the and for with that this from into add use all any are can each file files make new "
+    "not only should will when where which code please update change ensure".split()
+)
+# Identifiers and punctuation split roughly 1.3 model tokens each for BPE tokenizers
+TOKENS_PER_LEXEME = 1.3
+
+
+class FileProfile(NamedTuple):
+    tokens: int
+    terms: Counter
+
+
+@dataclass
+class PackedContext:
+    editable: List[str] = field(default_factory=list)
+    read_only: List[str] = field(default_factory=list)
+    omitted: List[str] = field(default_factory=list)
+    tokens_total: int = 0
+    tokens_packed: int = 0
+    pack_ms: float = 0.0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_total - self.tokens_packed
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "editable": len(self.editable),
+            "read_only": len(self.read_only),
+            "omitted": len(self.omitted),
+            "tokens_total": self.tokens_total,
+            "tokens_packed": self.tokens_packed,
+            "tokens_saved": self.tokens_saved,
+            "pack_ms": round(self.pack_ms, 2),
+        }
+
+
+def prompt_terms(prompt: str) -> Set[str]:
+    return {term for term in (t.lower() for t in TERM_PATTERN.findall(prompt)) if term not in STOPWORDS}
+
+
+def profile_text(text: str) -> FileProfile:
+    lexemes = TOKEN_PATTERN.findall(text)
+    terms = Counter(term.lower() for term in lexemes if len(term) > 2 and term[0].isalpha())
+    return FileProfile(math.ceil(len(lexemes) * TOKENS_PER_LEXEME), terms)
+
+
+# Fits a step's files into a token budget. Files are ranked by how often the
+# prompt's terms appear in their path and content; the best ranked fill the
+# editable budget, the next the read-only budget, and the rest are left to the
+# coder's repo map. Per-file profiles are cached by content hash.
+class ContextPacker:
+    def __init__(
+        self,
+        snapshot_cache: FileSnapshotCache,
+        config: FileContextConfig,
+        working_dir: Optional[Path] = None,
+        max_profiles: int = 4096
+    ):
+        self.snapshot_cache = snapshot_cache
+        self.config = config
+        self.working_dir = working_dir or Path.cwd()
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, FileProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.token_budget is not None
+
+    def profile(self, file_path: str, read_text: Callable[[], str]) -> FileProfile:
+        digest = self.snapshot_cache.digest(self.working_dir / file_path)
+        with self._lock:
+            cached = self._profiles.get(digest)
+            if cached is not None:
+                self._profiles.move_to_end(digest)
+                return cached
+        profile = profile_text(read_text())
+        with self._lock:
+            self._profiles[digest] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def pack(self, prompt: str, files_content: Mapping[str, str], pinned: Iterable[str] = ()) -> PackedContext:
+        start = time.perf_counter()
+        terms = prompt_terms(prompt)
+        pinned = set(pinned)
+        profiles = {
+            file_path: self.profile(file_path, lambda file_path=file_path: files_content[file_path])
+            for file_path in files_content
+        }
+
+        def score(file_path: str) -> float:
+            path_terms = prompt_terms(Path(file_path).as_posix().replace("/", " "))
+            content = profiles[file_path].terms
+            return 5.0 * len(terms & path_terms) + sum(math.log1p(content[term]) for term in terms)
+
+        # Pinned files first, then by relevance; smaller files win ties
+        ranked = sorted(
+            files_content,
+            key=lambda path: (path not in pinned, -score(path), profiles[path].tokens, path)
+        )
+        packed = PackedContext(tokens_total=sum(profile.tokens for profile in profiles.values()))
+        editable_left = self.config.token_budget
+        read_only_left = self.config.read_only_token_budget or 0
+        for file_path in ranked:
+            tokens = profiles[file_path].tokens
+            if file_path in pinned or tokens <= editable_left:
+                packed.editable.append(file_path)
+                editable_left -= tokens
+            elif tokens <= read_only_left:
+                packed.read_only.append(file_path)
+                read_only_left -= tokens
+            else:
+                packed.omitted.append(file_path)
+                continue
+            packed.tokens_packed += tokens
+        packed.pack_ms = (time.perf_counter() - start) * 1000
+        return packed
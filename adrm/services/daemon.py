@@ -0,0 +1,253 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Kept out of the import path of send_request, the thin client
+    from adrm.core.config_loader import LoadedConfig
+
+DEFAULT_SOCKET = Path(".adrm") / "adrm.sock"
+JOB_KINDS = ("workflow", "step")
+TERMINAL_EVENTS = ("done", "error")
+SENTINEL_PRIORITY = sys.maxsize
+
+
+class Job:
+    def __init__(self, job_id: int, request: Dict[str, Any]):
+        self.id = job_id
+        self.request = request
+        self.events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.events.put_nowait({**event, "job": self.id})
+
+
+def validate_request(request: Dict[str, Any]) -> None:
+    kind = request.get("kind")
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unsupported job kind: {kind}")
+    if kind == "step" and not isinstance(request.get("step"), dict):
+        raise ValueError("Step jobs need a 'step' object")
+    if not isinstance(request.get("priority", 0), int):
+        raise ValueError("Priority must be an integer")
+
+
+# Keeps aider, the validated config and one AppContainer per working tree
+# loaded between jobs. Clients send one JSON request per line over a Unix
+# socket and receive JSON progress events until the job's "done" event.
+# Jobs are queued by priority (higher first, then arrival order) and at most
+# `concurrency` run at once. Jobs for the same working tree share its container,
+# file handler and pending commits, so they run one at a time.
+class AdrmDaemon:
+    def __init__(
+        self,
+        loaded: "LoadedConfig",
+        socket_path: Path,
+        concurrency: int = 2,
+        logger: Any = None,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None
+    ):
+        self.loaded = loaded
+        self.socket_path = Path(socket_path)
+        self.concurrency = concurrency
+        self.logger = logger
+        self.model = model
+        self.api_key = api_key
+        self._containers: Dict[Path, Dict[str, Any]] = {}
+        self._tree_locks: Dict[Path, asyncio.Lock] = {}
+        self._container_lock: Optional[asyncio.Lock] = None
+        self._queue: "Optional[asyncio.PriorityQueue[Tuple[int, int, Job]]]" = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._ids = itertools.count(1)
+        self.running = 0
+
+    async def serve(self, ready: Optional[Callable[[], None]] = None) -> None:
+        self._container_lock = asyncio.Lock()
+        self._queue = asyncio.PriorityQueue()
+        self._stopping = asyncio.Event()
+        self._claim_socket()
+        # Paying for imports and the first container up front keeps them off every job
+        await self._container(Path.cwd())
+        server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._log("daemon_started", socket=str(self.socket_path), concurrency=self.concurrency)
+        if ready:
+            ready()
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            while not self._queue.empty():
+                _, _, job = self._queue.get_nowait()
+                job.emit({"event": "done", "status": "failed", "error": "daemon shutting down"})
+            # Running jobs finish; each worker then takes one sentinel and exits
+            for _ in workers:
+                self._queue.put_nowait((SENTINEL_PRIORITY, next(self._ids), None))
+            await asyncio.gather(*workers, return_exceptions=True)
+            await server.wait_closed()
+            for container in self._containers.values():
+                container['file_handler'].close()
+                container['aider_client'].close()
+            self._containers.clear()
+            self.socket_path.unlink(missing_ok=True)
+            self._log("daemon_stopped")
+
+    def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def _claim_socket(self) -> None:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink()
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    async def _container(self, working_dir: Path) -> Dict[str, Any]:
+        from adrm.core.container import AppContainer
+
+        async with self._container_lock:
+            container = self._containers.get(working_dir)
+            if container is None:
+                # Nobody is at the daemon's terminal to answer prompts for missing files
+                container = await asyncio.to_thread(
+                    AppContainer,
+                    working_dir=working_dir,
+                    loaded=self.loaded,
+                    interactive=False
+                )
+                self._containers[working_dir] = container
+                self._tree_locks[working_dir] = asyncio.Lock()
+            return container
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request.get("op", "submit")
+                    if op == "shutdown":
+                        await self._send(writer, {"event": "done", "status": "ok"})
+                        self.stop()
+                        break
+                    if op != "submit":
+                        raise ValueError(f"Unsupported operation: {op}")
+                    validate_request(request)
+                except (ValueError, AttributeError) as e:
+                    await self._send(writer, {"event": "error", "error": str(e)})
+                    continue
+                await self._stream_job(request, writer)
+        except ConnectionError:
+            # The job keeps running; only its progress stream is lost
+            pass
+        finally:
+            writer.close()
+
+    async def _stream_job(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        job = Job(next(self._ids), request)
+        job.emit({"event": "queued", "position": self._queue.qsize() + 1, "running": self.running})
+        self._queue.put_nowait((-request.get("priority", 0), job.id, job))
+        while True:
+            event = await job.events.get()
+            await self._send(writer, event)
+            if event["event"] in TERMINAL_EVENTS:
+                return
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, event: Dict[str, Any]) -> None:
+        writer.write((json.dumps(event) + "\n").encode())
+        await writer.drain()
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            if job is None:
+                return
+            self.running += 1
+            try:
+                await self._run(job)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        request = job.request
+        start = time.perf_counter()
+        try:
+            working_dir = Path(request.get("working_dir") or os.getcwd()).resolve()
+            container = await self._container(working_dir)
+            async with self._tree_locks[working_dir]:
+                job.emit({"event": "started", "working_dir": str(working_dir)})
+                await self._run_in(container, working_dir, job)
+        except Exception as e:
+            job.emit({"event": "done", "status": "failed", "seconds": round(time.perf_counter() - start, 3), "error": str(e)})
+            return
+        job.emit({"event": "done", "status": "ok", "seconds": round(time.perf_counter() - start, 3)})
+
+    async def _run_in(self, container: Dict[str, Any], working_dir: Path, job: Job) -> None:
+        from adrm.core.models import Step
+        from adrm.services.initializer import ProjectInitializer
+
+        request = job.request
+        logger = container['logger'].bind(job=job.id)
+        if request["kind"] == "step":
+            step_runner = container['step_runner']
+            try:
+                await step_runner.run_step(Step(**request["step"]))
+            finally:
+                await asyncio.to_thread(step_runner.finish)
+            return
+        config = container['config']
+        if request.get("steps_file"):
+            config = config.model_copy(update={"files": {**config.files, "steps": request["steps_file"]}})
+        initializer = ProjectInitializer(
+            config=config,
+            standards_generator=container['standards_generator'],
+            logger=logger,
+            console=container['console'],
+            step_runner=container['step_runner'],
+            working_dir=working_dir,
+            progress=job.emit
+        )
+        await initializer.initialize(self.model, self.api_key, resume=request.get("resume", False))
+
+    def _log(self, event: str, **fields: Any) -> None:
+        if self.logger is not None:
+            self.logger.info(event, **fields)
+
+
+def send_request(
+    request: Dict[str, Any],
+    socket_path: Path,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    # Thin client: stdlib only, so submitting a job starts instantly
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                event = json.loads(line)
+                if on_event:
+                    on_event(event)
+                if event.get("event") in TERMINAL_EVENTS:
+                    return event
+    raise RuntimeError("The daemon closed the connection before the job finished")
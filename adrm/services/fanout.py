@@ -0,0 +1,134 @@
+import asyncio
+import dataclasses
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from adrm.core.config_loader import LoadedConfig
+
+
+@dataclass
+class RepoResult:
+    repo: str
+    status: str
+    seconds: float
+    error: Optional[str] = None
+
+
+@dataclass
+class FanoutSummary:
+    results: List[RepoResult]
+    seconds: float
+
+    @property
+    def failed(self) -> List[RepoResult]:
+        return [result for result in self.results if result.status != "ok"]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "repositories": len(self.results),
+            "succeeded": len(self.results) - len(self.failed),
+            "failed": len(self.failed),
+            "seconds": round(self.seconds, 3),
+            "results": [dataclasses.asdict(result) for result in self.results],
+        }
+
+
+def read_repo_list(path: Path) -> List[Path]:
+    # One repository per line; relative entries are resolved against the list's directory
+    repos = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        repo = Path(entry).expanduser()
+        repos.append((repo if repo.is_absolute() else path.parent / repo).resolve())
+    return repos
+
+
+def shared_config(loaded: LoadedConfig, steps_file: Optional[Path], root: Path) -> LoadedConfig:
+    # Paths meant to be shared by every repository are pinned to the invoking directory
+    config = loaded.config
+    if steps_file is not None:
+        config = config.model_copy(update={"files": {**config.files, "steps": str(steps_file.resolve())}})
+    aider = loaded.aider
+    cache_path = Path(aider.response_cache.path)
+    if not cache_path.is_absolute():
+        aider = aider.model_copy(update={
+            "response_cache": aider.response_cache.model_copy(update={"path": str(root / cache_path)})
+        })
+    return dataclasses.replace(loaded, config=config, aider=aider)
+
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(loaded: LoadedConfig, options: Dict[str, Any]) -> None:
+    _worker.update(options, loaded=loaded)
+
+
+def run_repository(repo: str) -> RepoResult:
+    from adrm.core.container import AppContainer
+    from adrm.services.initializer import ProjectInitializer
+
+    start = time.perf_counter()
+    previous = os.getcwd()
+    try:
+        # A worker runs one repository at a time but many in turn. The working
+        # directory is switched for this task and restored below, so aider and
+        # git helpers see this repository; module-level state (the shared
+        # config, rate governors per model) deliberately carries over between
+        # repositories handled by the same worker
+        os.chdir(repo)
+        # Pool workers have no terminal to answer prompts for missing files
+        container = AppContainer(working_dir=Path(repo), loaded=_worker["loaded"], interactive=False)
+        try:
+            initializer = ProjectInitializer(
+                config=container['config'],
+                standards_generator=container['standards_generator'],
+                logger=container['logger'].bind(repo=repo),
+                console=container['console'],
+                step_runner=container['step_runner'],
+                working_dir=Path(repo)
+            )
+            asyncio.run(initializer.initialize(_worker.get("model"), _worker.get("api_key"), resume=_worker.get("resume", False)))
+        finally:
+            container['file_handler'].close()
+            container['aider_client'].close()
+        return RepoResult(repo, "ok", time.perf_counter() - start)
+    except Exception as e:
+        return RepoResult(repo, "failed", time.perf_counter() - start, str(e))
+    finally:
+        os.chdir(previous)
+
+
+def run_fanout(
+    repos: List[Path],
+    loaded: LoadedConfig,
+    jobs: int,
+    options: Optional[Dict[str, Any]] = None,
+    on_result: Optional[Callable[[RepoResult], None]] = None
+) -> FanoutSummary:
+    start = time.perf_counter()
+    results: Dict[str, RepoResult] = {}
+    # Config is sent once per worker process rather than once per repository
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(loaded, options or {})
+    ) as pool:
+        futures = {pool.submit(run_repository, str(repo)): str(repo) for repo in repos}
+        for future in as_completed(futures):
+            repo = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died, e.g. BrokenProcessPool
+                result = RepoResult(repo, "failed", 0.0, f"{type(e).__name__}: {e}")
+            results[repo] = result
+            if on_result:
+                on_result(result)
+    return FanoutSummary([results[str(repo)] for repo in repos], time.perf_counter() - start)
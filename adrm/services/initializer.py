@@ -1,13 +1,17 @@
 import os
-import json
+import asyncio
 from pathlib import Path
 import structlog
 from rich.console import Console
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 
+from adrm.core.checkpoint import CheckpointJournal, journal_path, prompt_hash, relative_path
 from adrm.core.models import ConfigModel, Step
 from adrm.core.interfaces import StandardsGenerator
+from adrm.core.state import InitializationState
+from adrm.core.workflow import load_workflow
 from adrm.services.step_runner import StepRunner
+from adrm.services.scheduler import StepScheduler
 
 class ProjectInitializer:
     def __init__(
@@ -16,13 +20,21 @@ class ProjectInitializer:
         standards_generator: StandardsGenerator,
         logger: structlog.BoundLogger,
         console: Console,
-        step_runner: StepRunner
+        step_runner: StepRunner,
+        scheduler: Optional[StepScheduler] = None,
+        working_dir: Optional[Path] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
     ):
         self.config = config
         self.standards_generator = standards_generator
         self.logger = logger
         self.console = console
         self.step_runner = step_runner
+        self.scheduler = scheduler or StepScheduler(config.max_parallel_steps, logger)
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.progress = progress
+        self.journal: Optional[CheckpointJournal] = None
+        self.state = InitializationState()
 
     def _validate_model_config(self, model_name: Optional[str], api_key: Optional[str]) -> None:
         if model_name and not isinstance(model_name, str):
@@ -34,42 +46,112 @@ class ProjectInitializer:
 
     def _setup_directories(self) -> None:
         for directory in self.config.directories.values():
-            Path(directory).mkdir(parents=True, exist_ok=True)
+            (self.working_dir / directory).mkdir(parents=True, exist_ok=True)
 
-    def _initialize_aider(self, model_name: Optional[str], api_key: Optional[str]) -> None:
+    def _open_journal(self, steps_file: Path, resume: bool) -> CheckpointJournal:
+        journal = CheckpointJournal(journal_path(self.working_dir, steps_file))
+        if resume:
+            journal.load()
+            self.logger.info(
+                "checkpoint_loaded",
+                path=str(journal.path),
+                state=journal.state,
+                completed_steps=journal.completed_steps()
+            )
+        else:
+            journal.reset()
+        self.state = InitializationState(on_change=journal.record_state)
+        return journal
+
+    async def _initialize_aider(self, model_name: Optional[str], api_key: Optional[str]) -> None:
         try:
             self._setup_directories()
-            self._run_steps(model_name, api_key)
+            self.state.create_dirs()
+            if self.config.technologies:
+                await asyncio.to_thread(self.standards_generator.create_standards, self.config.technologies)
+            await self._run_steps(model_name, api_key)
+            self.state.execute_steps()
             
         except Exception as e:
             self.logger.error("aider_initialization_failed", error=str(e))
             raise RuntimeError(f"Failed to initialize Aider: {str(e)}")
 
-    def _run_steps(self, model_name: Optional[str], api_key: Optional[str]) -> None:
-        steps_file = Path.cwd() / self.config.files.get("steps", "steps.json")
+    def _steps_file(self) -> Path:
+        return self.working_dir / self.config.files.get("steps", "steps.json")
+
+    async def _run_steps(self, model_name: Optional[str], api_key: Optional[str]) -> None:
+        steps_file = self._steps_file()
         if not steps_file.exists():
             raise FileNotFoundError(f"Steps file not found: {steps_file}")
 
         try:
-            steps_data = json.loads(steps_file.read_text())
-            steps = [Step(**step) for step in steps_data]
-            
+            steps, graph = await asyncio.to_thread(load_workflow, steps_file)
+
             for step in steps:
                 if not step.model_name:
                     step.model_name = model_name
                 if not step.api_key:
                     step.api_key = api_key
-                step.files = [str(Path.cwd() / f) for f in step.files]
-                self.step_runner.run_step(step)
-                
+                step.files = [str(self.working_dir / f) for f in step.files]
+
+            try:
+                await self.scheduler.run(steps, self._checkpointed(steps), graph)
+            finally:
+                # Edits of the steps that completed are committed even if a later one failed
+                await asyncio.to_thread(self.step_runner.finish)
+
         except Exception as e:
             self.logger.error("steps_execution_failed", error=str(e))
             raise RuntimeError(f"Failed to execute steps: {str(e)}")
 
-    def initialize(self, model_name: Optional[str] = None, api_key: Optional[str] = None) -> None:
+    def _checkpointed(self, steps: List[Step]):
+        keys: Dict[int, str] = {id(step): step.id or str(index) for index, step in enumerate(steps)}
+
+        async def execute(step: Step) -> None:
+            key = keys[id(step)]
+            if self.journal is not None:
+                step_hash = prompt_hash(step, self.working_dir)
+                digests = await asyncio.to_thread(self._input_digests, step)
+                if self.journal.is_complete(key, step_hash, digests):
+                    self.logger.info("step_skipped", step=key, reason="unchanged since checkpoint")
+                    self._report(key, "skipped")
+                    return
+            self._report(key, "started")
+            try:
+                await self.step_runner.run_step(step)
+            except Exception:
+                self._report(key, "failed")
+                raise
+            if self.journal is not None:
+                # Hashes are taken after the step so its own edits count as up to date
+                digests = await asyncio.to_thread(self._input_digests, step)
+                await asyncio.to_thread(self.journal.record_step, key, step_hash, digests)
+            self._report(key, "done")
+
+        return execute
+
+    def _input_digests(self, step: Step) -> Dict[str, str]:
+        return {
+            relative_path(file_path, self.working_dir): digest
+            for file_path, digest in self.step_runner.input_digests(step).items()
+        }
+
+    def _report(self, step: str, status: str) -> None:
+        if self.progress is not None:
+            self.progress({"event": "step", "step": step, "status": status})
+
+    async def initialize(
+        self,
+        model_name: Optional[str] = None,
+        api_key: Optional[str] = None,
+        resume: bool = False
+    ) -> None:
         try:
             self._validate_model_config(model_name, api_key)
-            self._initialize_aider(model_name, api_key)
+            self.journal = self._open_journal(self._steps_file(), resume)
+            self.state.load_config()
+            await self._initialize_aider(model_name, api_key)
+            self.state.complete()
         except Exception as e:
             self.logger.error("initialization_failed", error=str(e))
             raise RuntimeError(f"Project initialization failed: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,176 @@
+import asyncio
+import fnmatch
+import heapq
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import structlog
+
+from adrm.core.models import Step
+
+GLOB_CHARS = "*?["
+
+
+def _static_prefix(pattern: str) -> str:
+    # Portion of the pattern before the first wildcard character
+    for index, char in enumerate(pattern):
+        if char in GLOB_CHARS:
+            return pattern[:index]
+    return pattern
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(char in pattern for char in GLOB_CHARS)
+
+
+def patterns_overlap(first: str, second: str) -> bool:
+    first = os.path.normpath(first)
+    second = os.path.normpath(second)
+    if first == second:
+        return True
+
+    first_glob, second_glob = _is_glob(first), _is_glob(second)
+    if not first_glob and not second_glob:
+        return False
+    if not first_glob:
+        return fnmatch.fnmatch(first, second)
+    if not second_glob:
+        return fnmatch.fnmatch(second, first)
+
+    # Two globs may match a common file whenever one static prefix contains the other
+    first_prefix, second_prefix = _static_prefix(first), _static_prefix(second)
+    return first_prefix.startswith(second_prefix) or second_prefix.startswith(first_prefix)
+
+
+def steps_conflict(first: Step, second: Step) -> bool:
+    if not (first.allow_edits or second.allow_edits):
+        return False
+    return any(
+        patterns_overlap(a, b) for a in first.files for b in second.files
+    )
+
+
+class StepGraph:
+    def __init__(self, steps: List[Step], predecessors: Optional[List[List[str]]] = None):
+        # `predecessors` are the complete edges of an already validated graph,
+        # e.g. from a compiled workflow, and skip dependency and conflict analysis
+        self.steps = steps
+        self.keys = [step.id or str(index) for index, step in enumerate(steps)]
+        self.predecessors: Dict[int, Set[int]] = {i: set() for i in range(len(steps))}
+        self.successors: Dict[int, Set[int]] = {i: set() for i in range(len(steps))}
+
+        index_by_key: Dict[str, int] = {}
+        for index, key in enumerate(self.keys):
+            if key in index_by_key:
+                raise ValueError(f"Duplicate step id: {key}")
+            index_by_key[key] = index
+
+        if predecessors is not None:
+            for index, keys in enumerate(predecessors):
+                for key in keys:
+                    self._add_edge(index_by_key[key], index)
+            self.order = self._topological_order()
+            return
+
+        for index, step in enumerate(steps):
+            for dependency in step.depends_on:
+                if dependency not in index_by_key:
+                    raise ValueError(f"Step '{self.keys[index]}' depends on unknown step '{dependency}'")
+                self._add_edge(index_by_key[dependency], index)
+
+        self.order = self._topological_order()
+
+        # Conflicting steps follow their declared order, so results stay deterministic
+        position = {index: rank for rank, index in enumerate(self.order)}
+        for i in range(len(steps)):
+            for j in range(i + 1, len(steps)):
+                if steps_conflict(steps[i], steps[j]):
+                    before, after = sorted((i, j), key=position.__getitem__)
+                    self._add_edge(before, after)
+
+    def _add_edge(self, before: int, after: int) -> None:
+        if before == after:
+            raise ValueError(f"Step '{self.keys[before]}' depends on itself")
+        self.successors[before].add(after)
+        self.predecessors[after].add(before)
+
+    def _topological_order(self) -> List[int]:
+        remaining = {index: len(preds) for index, preds in self.predecessors.items()}
+        ready = [index for index, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        order: List[int] = []
+        while ready:
+            index = heapq.heappop(ready)
+            order.append(index)
+            for successor in self.successors[index]:
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    heapq.heappush(ready, successor)
+
+        if len(order) != len(self.steps):
+            cyclic = sorted(self.keys[i] for i, count in remaining.items() if count > 0)
+            raise ValueError(f"Step dependency cycle detected: {', '.join(cyclic)}")
+        return order
+
+    def levels(self) -> List[List[str]]:
+        # Groups of step keys that may run concurrently, in execution order
+        depth: Dict[int, int] = {}
+        for index in self.order:
+            depth[index] = max((depth[p] + 1 for p in self.predecessors[index]), default=0)
+        grouped: Dict[int, List[str]] = {}
+        for index in self.order:
+            grouped.setdefault(depth[index], []).append(self.keys[index])
+        return [grouped[level] for level in sorted(grouped)]
+
+
+class StepScheduler:
+    def __init__(self, max_parallel: int = 1, logger: Optional[structlog.BoundLogger] = None):
+        if max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        self.max_parallel = max_parallel
+        self.logger = logger or structlog.get_logger()
+
+    async def run(
+        self,
+        steps: List[Step],
+        execute: Callable[[Step], Awaitable[None]],
+        graph: Optional[StepGraph] = None
+    ) -> None:
+        graph = graph or StepGraph(steps)
+        position = {index: rank for rank, index in enumerate(graph.order)}
+        waiting = {index: len(preds) for index, preds in graph.predecessors.items()}
+        ready = [(position[i], i) for i, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+
+        running: Dict["asyncio.Task[None]", int] = {}
+        errors: List[BaseException] = []
+
+        try:
+            while ready or running:
+                while ready and not errors and len(running) < self.max_parallel:
+                    _, index = heapq.heappop(ready)
+                    self.logger.debug("step_started", step=graph.keys[index])
+                    task = asyncio.ensure_future(execute(steps[index]))
+                    running[task] = index
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: position[running[t]]):
+                    index = running.pop(task)
+                    if task.exception() is not None:
+                        self.logger.error("step_failed", step=graph.keys[index], error=str(task.exception()))
+                        errors.append(task.exception())
+                        continue
+                    self.logger.debug("step_completed", step=graph.keys[index])
+                    for successor in graph.successors[index]:
+                        waiting[successor] -= 1
+                        if waiting[successor] == 0:
+                            heapq.heappush(ready, (position[successor], successor))
+        finally:
+            for task in running:
+                task.cancel()
+
+        if errors:
+            raise errors[0]
@@ -1,30 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from string import Template
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 import structlog
 from adrm.core.interfaces import StandardsGenerator, FileHandler
 from adrm.core.models import ConfigModel
 from adrm.infrastructure.file_handlers import LocalFileHandler
 
-def create_standard_file(standard_type: str, technology: str, content: str):
-    path = f"{technology}_{standard_type}.md"
-    Path(path).write_text(content)
+STANDARD_KINDS = ("implementation", "performance")
+FILENAME_TEMPLATE = Template("${technology}_${kind}_standards${extension}")
+PROMPT_TEMPLATES = {
+    "implementation": Template(
+        "Write concise implementation standards for ${technology} projects as Markdown: "
+        "project layout, naming, error handling, testing and code review expectations."
+    ),
+    "performance": Template(
+        "Write concise performance standards for ${technology} projects as Markdown: "
+        "profiling practice, common hot spots, memory and I/O guidelines, and benchmarks to keep."
+    ),
+}
 
 class FileSystemStandardsGenerator(StandardsGenerator):
     def __init__(
         self,
         config: ConfigModel,
         logger: structlog.BoundLogger,
-        file_handler: FileHandler
+        file_handler: Optional[FileHandler] = None,
+        content_source: Optional[Callable[[str], str]] = None,
+        max_workers: int = 4,
+        base_path: Optional[Path] = None
     ):
         self.config = config
         self.logger = logger
-        self.file_handler = file_handler
+        self.file_handler = file_handler or LocalFileHandler()
+        self.content_source = content_source
+        self.max_workers = max_workers
+        self.base_path = Path(base_path) if base_path else Path.cwd()
+
+    def _standard_path(self, technology: str, kind: str) -> Path:
+        filename = FILENAME_TEMPLATE.substitute(
+            technology=technology,
+            kind=kind,
+            extension=self.config.file_extensions.get("standards", ".md")
+        )
+        return self.base_path / self.config.directories["standards"] / filename
+
+    def _write(self, technology: str, kind: str, content: str) -> None:
+        try:
+            self.file_handler.handle(self._standard_path(technology, kind), content)
+        except OSError as e:
+            raise RuntimeError(f"Failed to create standards: {str(e)}") from e
 
     def create_implementation_standards(self, technology: str, content: str) -> None:
-        filename = self.base_path / self.config.directories["standards"] / f"{technology}_implementation_standards{self.config.file_extensions['standards']}"
-        self.file_handler.handle(filename, content)
+        self._write(technology, "implementation", content)
         self.logger.info("created_implementation_standards", technology=technology)
 
     def create_performance_standards(self, technology: str, content: str) -> None:
-        filename = self.base_path / self.config.directories["standards"] / f"{technology}_performance_standards{self.config.file_extensions['standards']}"
-        self.file_handler.handle(filename, content)
-        self.logger.info("created_performance_standards", technology=technology) 
\ No newline at end of file
+        self._write(technology, "performance", content)
+        self.logger.info("created_performance_standards", technology=technology)
+
+    def create_standards(
+        self,
+        technologies: Sequence[str],
+        contents: Optional[Dict[Tuple[str, str], str]] = None,
+        overwrite: bool = False
+    ) -> List[Path]:
+        # Content missing from `contents` is generated by the content source on
+        # a bounded pool; every file is then written in a single flush. Standards
+        # that already exist, possibly edited by hand, are kept unless `overwrite`
+        pairs = [(technology, kind) for technology in dict.fromkeys(technologies) for kind in STANDARD_KINDS]
+        if not overwrite:
+            pairs = [pair for pair in pairs if not self._standard_path(*pair).exists()]
+        contents = {pair: content for pair, content in (contents or {}).items() if pair in pairs}
+        jobs = [pair for pair in pairs if pair not in contents]
+        if jobs:
+            if self.content_source is None:
+                raise ValueError("No content source configured for standards generation")
+            prompts = [PROMPT_TEMPLATES[kind].substitute(technology=technology) for technology, kind in jobs]
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(jobs)))) as pool:
+                try:
+                    contents.update(zip(jobs, pool.map(self.content_source, prompts)))
+                except Exception as e:
+                    self.logger.error("standards_generation_failed", error=str(e))
+                    raise RuntimeError(f"Failed to generate standards: {str(e)}") from e
+
+        batch = getattr(self.file_handler, "batch", None)
+        written = []
+        try:
+            if batch is None:
+                for (technology, kind), content in contents.items():
+                    self._write(technology, kind, content)
+            else:
+                with batch():
+                    for (technology, kind), content in contents.items():
+                        self._write(technology, kind, content)
+            for technology, kind in contents:
+                written.append(self._standard_path(technology, kind))
+        except OSError as e:
+            raise RuntimeError(f"Failed to create standards: {str(e)}") from e
+        self.logger.info(
+            "created_standards",
+            technologies=list(dict.fromkeys(technologies)),
+            files=len(written),
+            kept=len(dict.fromkeys(technologies)) * len(STANDARD_KINDS) - len(written)
+        )
+        return written
@@ -1,12 +1,15 @@
-from typing import Optional
+import asyncio
+import hashlib
+import os
+from typing import Dict, Mapping, Optional
 import structlog
 from pathlib import Path
-from aider.coders import Coder
-from aider.models import Model
-from aider.io import InputOutput
 from adrm.core.models import ConfigModel, Step
-from adrm.integrations.aider_client import AiderClient
 from adrm.infrastructure.file_context import FileContextHandler
+from adrm.infrastructure.memory import current_rss_bytes, process_peak_rss_bytes, traced_peak_bytes
+from adrm.infrastructure import tracing
+from adrm.infrastructure.tracing import Tracer
+from adrm.services.context_packer import ContextPacker
 from adrm.core.interfaces import FileHandler, StepRunnerClient
 
 class StepRunner:
@@ -15,34 +18,102 @@ class StepRunner:
         config: ConfigModel,
         logger: structlog.BoundLogger,
         file_handler: FileHandler,
-        client: StepRunnerClient
+        client: StepRunnerClient,
+        tracer: Optional[Tracer] = None,
+        packer: Optional[ContextPacker] = None,
+        working_dir: Optional[Path] = None
     ) -> None:
         self.config = config
         self.logger = logger
         self.file_handler = file_handler
         self.client = client
-        self.working_dir = Path.cwd()
+        self.tracer = tracer or Tracer()
+        self.packer = packer
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
 
-    def run_step(self, step: Step) -> None:
+    def _context_bytes(self, files_content: Mapping[str, str]) -> int:
+        total_bytes = getattr(files_content, "total_bytes", None)
+        if isinstance(total_bytes, int):
+            return total_bytes
+        total = 0
+        for file_path in files_content:
+            try:
+                total += os.path.getsize(self.working_dir / file_path)
+            except OSError:
+                pass
+        return total
+
+    @property
+    def offline(self) -> bool:
+        # The fake backend never contacts a provider, so it needs no API key
+        return getattr(getattr(self.client, "config", None), "backend", None) == "fake"
+
+    def input_digests(self, step: Step) -> Dict[str, str]:
+        return self.file_handler.digests(step.files)
+
+    def finish(self) -> None:
+        # End of a workflow: commits held back by a batched commit policy
+        if getattr(self.client, "commits", None) is None:
+            return
+        with self.tracer.span("commit"):
+            self.client.flush_commits()
+
+    async def run_step(self, step: Step) -> None:
         try:
-            model_name = step.model_name or self.config.model_name
-            api_key = step.api_key or self.config.api_key
+            model_name = step.model_name or self.config.openai_model
+            api_key = step.api_key or self.config.openai_api_key
             
-            if not model_name or not api_key:
+            if not model_name or not (api_key or self.offline):
                 raise ValueError("Missing model configuration")
 
             # Log the working directory for debugging
             self.logger.debug("executing_step", working_dir=str(self.working_dir))
+            rss_before = current_rss_bytes()
+
+            with self.tracer.span(
+                "step",
+                step_id=step.id or "",
+                model=model_name,
+                prompt_sha=hashlib.sha256(step.prompt.encode()).hexdigest()[:12],
+                patterns=len(step.files)
+            ) as span:
+                # Handle file patterns and non-existent files
+                with tracing.phase("file_resolution"):
+                    file_paths = await asyncio.to_thread(self.file_handler.resolve, step.files)
+                with tracing.phase("file_read"):
+                    files_content = await asyncio.to_thread(self.file_handler.read, file_paths)
+                span.attributes["files"] = len(files_content)
+                span.add("bytes_read", self._context_bytes(files_content))
+
+                for file_path, reason in getattr(files_content, "skipped", ()):
+                    self.logger.warning("file_skipped", file=file_path, reason=reason)
 
-            # Handle file patterns and non-existent files
-            self.file_handler.add_files(step.files)
-            files_content = self.file_handler.get_files_content()
+                if not files_content:
+                    self.logger.warning("no_files_found", patterns=step.files)
+                    return
 
-            if not files_content:
-                self.logger.warning("no_files_found", patterns=step.files)
-                return
+                editable, read_only = list(files_content), []
+                if self.packer and self.packer.enabled:
+                    # Files named without wildcards are always sent as editable
+                    pinned = [pattern for pattern in step.files if '*' not in pattern]
+                    with tracing.phase("context_packing"):
+                        packed = await asyncio.to_thread(self.packer.pack, step.prompt, files_content, pinned)
+                    span.add("tokens_saved", packed.tokens_saved)
+                    self.logger.info("context_packed", **packed.as_dict())
+                    editable, read_only = packed.editable, packed.read_only
 
-            self.client.execute_prompt(step.prompt, files_content)
+                await self.client.execute_prompt(step.prompt, editable, read_only)
+            # The RSS delta also counts steps running alongside this one; the
+            # peak is the whole process's high-water mark so far
+            rss_after = current_rss_bytes()
+            self.logger.info(
+                "step_memory",
+                files=len(files_content),
+                context_bytes=getattr(files_content, "total_bytes", None),
+                rss_delta_bytes=None if rss_before is None or rss_after is None else rss_after - rss_before,
+                process_peak_rss_bytes=process_peak_rss_bytes(),
+                traced_peak_bytes=traced_peak_bytes()
+            )
             
         except ValueError as e:
             self.logger.error("configuration_error", error=str(e))
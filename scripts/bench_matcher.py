@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import fnmatch
+import random
+import time
+import typer
+from rich import print
+
+from adrm.infrastructure.path_matcher import PathMatcher
+
+app = typer.Typer()
+
+EXTENSIONS = [".py", ".js", ".ts", ".md", ".json", ".yaml", ".txt", ".css"]
+DIRECTORIES = ["src", "lib", "tests", "docs", "build", "scripts", "vendor", "app"]
+
+def generate_paths(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        depth = rng.randint(1, 5)
+        parts = [rng.choice(DIRECTORIES)] + [f"pkg{rng.randint(0, 50)}" for _ in range(depth - 1)]
+        paths.append("/".join(parts) + f"/file{index}{rng.choice(EXTENSIONS)}")
+    return paths
+
+def generate_patterns(count: int, seed: int) -> tuple:
+    rng = random.Random(seed)
+    include = [f"*{ext}" for ext in EXTENSIONS[:4]]
+    exclude = []
+    while len(include) + len(exclude) < count:
+        choice = rng.random()
+        if choice < 0.4:
+            exclude.append(f"{rng.choice(DIRECTORIES)}/pkg{rng.randint(0, 50)}/*")
+        elif choice < 0.7:
+            exclude.append(f"*_{rng.randint(0, 999)}{rng.choice(EXTENSIONS)}")
+        else:
+            exclude.append(f"file{rng.randint(0, 99999)}.*")
+    return include, exclude
+
+def fnmatch_filter(paths: list, include: list, exclude: list) -> list:
+    filtered = []
+    for path in paths:
+        if include and not any(fnmatch.fnmatch(path, p) for p in include):
+            continue
+        if exclude and any(fnmatch.fnmatch(path, p) for p in exclude):
+            continue
+        filtered.append(path)
+    return filtered
+
+@app.command()
+def run(
+    paths: int = typer.Option(100_000, help="Number of synthetic paths"),
+    patterns: int = typer.Option(50, help="Number of include/exclude patterns"),
+    seed: int = typer.Option(0, help="Random seed")
+):
+    """Compare PathMatcher against per-call fnmatch filtering."""
+    path_list = generate_paths(paths, seed)
+    include, exclude = generate_patterns(patterns, seed)
+
+    start = time.perf_counter()
+    baseline = fnmatch_filter(path_list, include, exclude)
+    fnmatch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = PathMatcher(include, exclude)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = matcher.filter(path_list)
+    match_seconds = time.perf_counter() - start
+
+    print(f"[bold]{paths} paths x {patterns} patterns[/bold]")
+    print(f"fnmatch:      {fnmatch_seconds * 1000:8.1f} ms ({len(baseline)} kept)")
+    print(f"compile:      {compile_seconds * 1000:8.1f} ms")
+    print(f"PathMatcher:  {match_seconds * 1000:8.1f} ms ({len(compiled)} kept)")
+    print(f"speedup:      {fnmatch_seconds / max(match_seconds, 1e-9):8.1f}x")
+
+if __name__ == "__main__":
+    app()
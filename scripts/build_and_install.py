@@ -5,7 +5,9 @@ from pathlib import Path
 import shutil
 import hashlib
 import json
-from pkg_resources import get_distribution
+import os
+from importlib import metadata
+from typing import List, Optional
 
 def run_command(command: str, allow_non_zero_exit: bool = False) -> bool:
     try:
@@ -40,15 +42,72 @@ def update_config_files(project_root: Path, site_packages: Path) -> None:
         else:
             print(f"Warning: Source file {src_path} not found")
 
-def get_source_files_hash(project_root: Path) -> str:
-    source_files = []
-    for ext in ('*.py', '*.yaml', '*.json'):
-        source_files.extend(project_root.rglob(ext))
-    
-    hasher = hashlib.md5()
-    for file in sorted(source_files):
-        if 'dist' not in str(file) and 'build' not in str(file):
-            hasher.update(file.read_bytes())
+SOURCE_SUFFIXES = ('.py', '.yaml', '.json')
+# Only used outside a git checkout, where tracked files are unknown
+SKIPPED_DIRS = {'.git', '.venv', 'venv', 'dist', 'build', '__pycache__', 'node_modules', '.adrm'}
+MANIFEST_VERSION = 1
+
+def file_hash(path: Path) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def list_source_files(project_root: Path) -> List[str]:
+    # Tracked files plus new ones git does not ignore, so virtualenvs and
+    # .git objects are never scanned
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=project_root, capture_output=True, check=True
+        )
+        paths = result.stdout.decode("utf-8").split("\0")
+    except (OSError, subprocess.CalledProcessError):
+        paths = [
+            path.relative_to(project_root).as_posix()
+            for path in project_root.rglob('*')
+            if not SKIPPED_DIRS.intersection(path.relative_to(project_root).parts)
+        ]
+    return sorted(path for path in set(paths) if path.endswith(SOURCE_SUFFIXES))
+
+def load_manifest(manifest_file: Path) -> dict:
+    try:
+        manifest = json.loads(manifest_file.read_text())
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "files": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+def save_manifest(manifest_file: Path, manifest: dict) -> None:
+    temp_file = manifest_file.with_suffix('.tmp')
+    temp_file.write_text(json.dumps(manifest, separators=(',', ':')))
+    os.replace(temp_file, manifest_file)
+
+def get_source_files_hash(project_root: Path, manifest: dict) -> str:
+    # Files whose (mtime, size) match the manifest reuse their recorded hash
+    previous = manifest.get("files", {})
+    files = {}
+    rehashed = 0
+    for rel_path in list_source_files(project_root):
+        try:
+            stat = (project_root / rel_path).stat()
+        except FileNotFoundError:
+            continue  # deleted but not yet staged
+        entry = previous.get(rel_path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            digest = entry[2]
+        else:
+            digest = file_hash(project_root / rel_path)
+            rehashed += 1
+        files[rel_path] = [stat.st_mtime_ns, stat.st_size, digest]
+    manifest["files"] = files
+    print(f"Hashed {rehashed} of {len(files)} source files")
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for rel_path, (_, _, digest) in files.items():
+        hasher.update(f"{rel_path}\0{digest}\n".encode())
     return hasher.hexdigest()
 
 def get_package_dependencies(project_root: Path) -> dict:
@@ -58,65 +117,91 @@ def get_package_dependencies(project_root: Path) -> dict:
     
     try:
         result = subprocess.run(["poetry", "export", "--format", "requirements.txt"], 
-                              capture_output=True, text=True, check=True)
+                              capture_output=True, text=True, check=True, cwd=project_root)
         deps = {}
         for line in result.stdout.splitlines():
             if "==" in line:
                 name, version = line.split("==", 1)
-                deps[name] = version.split(";")[0]  # Remove any platform specifiers
+                deps[name] = version.split(";")[0].strip()  # Remove any platform specifiers
         return deps
-    except subprocess.CalledProcessError:
+    except (OSError, subprocess.CalledProcessError):
         return {}
 
-def check_dependencies_changed(project_root: Path, cache_file: Path) -> bool:
+def get_lock_hash(project_root: Path) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    for name in ("poetry.lock", "pyproject.toml"):
+        path = project_root / name
+        hasher.update(file_hash(path).encode() if path.exists() else b"-")
+    return hasher.hexdigest()
+
+def check_dependencies_changed(project_root: Path, manifest: dict) -> bool:
+    # poetry export only runs when poetry.lock or pyproject.toml changed
+    cached = manifest.get("dependencies")
+    lock_hash = get_lock_hash(project_root)
+    if cached and cached.get("lock_hash") == lock_hash:
+        return False
+
     current_deps = get_package_dependencies(project_root)
-    deps_cache_file = cache_file.with_suffix('.deps')
-    
-    if not deps_cache_file.exists():
-        deps_cache_file.write_text(json.dumps(current_deps))
-        return True
-        
-    cached_deps = json.loads(deps_cache_file.read_text())
-    if current_deps != cached_deps:
-        deps_cache_file.write_text(json.dumps(current_deps))
-        return True
-        
-    return False
+    manifest["dependencies"] = {"lock_hash": lock_hash, "packages": current_deps}
+    return not cached or cached.get("packages") != current_deps
+
+def newest_wheel(project_root: Path) -> Path:
+    # The build just written, even when dist/ still holds older versions
+    return max((project_root / "dist").glob("*.whl"), key=lambda path: path.stat().st_mtime_ns)
+
+def wheel_version(wheel_file: Path) -> str:
+    # Wheel names are <distribution>-<version>-<python>-<abi>-<platform>.whl
+    return wheel_file.name.split("-")[1]
+
+def installed_version(distribution: str) -> Optional[str]:
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return None
 
 def main():
     project_root = Path(__file__).parent.parent
-    cache_file = project_root / '.build_cache'
+    manifest_file = project_root / '.build_cache.json'
+    manifest = load_manifest(manifest_file)
     
     print("\n1. Checking build cache...")
-    current_hash = get_source_files_hash(project_root)
+    current_hash = get_source_files_hash(project_root, manifest)
+    # Only the wheel this script last built counts; older builds may share dist/
+    wheel_file = project_root / "dist" / manifest["wheel"] if manifest.get("wheel") else None
+    if wheel_file is not None and not wheel_file.exists():
+        wheel_file = None
     
     should_build = True
-    if cache_file.exists():
-        cached_hash = cache_file.read_text().strip()
-        if cached_hash == current_hash:
-            print("No changes detected, skipping build...")
-            should_build = False
+    if manifest.get("source_hash") == current_hash and wheel_file is not None:
+        print("No changes detected, skipping build...")
+        should_build = False
     
     if should_build:
         print("\n2. Building package...")
         if not run_command("poetry build"):
             sys.exit(1)
-        cache_file.write_text(current_hash)
+        manifest["source_hash"] = current_hash
+        wheel_file = newest_wheel(project_root)
+        manifest["wheel"] = wheel_file.name
     
     print("\n3. Installing package...")
-    wheel_file = next(project_root.glob("dist/*.whl"))
     
     # Check if dependencies have changed
-    deps_changed = check_dependencies_changed(project_root, cache_file)
+    deps_changed = check_dependencies_changed(project_root, manifest)
     install_cmd = f"pip install {wheel_file}"
-    if deps_changed:
+    should_install = should_build or deps_changed or installed_version("adrm") != wheel_version(wheel_file)
+    if not should_install:
+        print("Installed package is current, skipping install...")
+    elif deps_changed:
         print("Dependencies have changed, forcing reinstall...")
         install_cmd += " --force-reinstall"
     else:
         print("Dependencies unchanged, performing minimal install...")
     
-    if not run_command(install_cmd):
+    if should_install and not run_command(install_cmd):
         sys.exit(1)
+    # Recorded only once installed, so a failed install is retried in full
+    save_manifest(manifest_file, manifest)
         
     print("\n✨ Build and installation completed successfully!")
     
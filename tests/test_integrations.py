@@ -1,8 +1,15 @@
+import json
+import os
+import time
 import pytest
 from unittest.mock import Mock, patch
 from pathlib import Path
 from adrm.integrations.aider_client import AiderClient
-from adrm.core.models import AiderConfig, AiderCoderConfig
+from adrm.core.models import AiderConfig, AiderCoderConfig, FakeBackendConfig
+from adrm.integrations.coder_pool import CoderPool
+from adrm.infrastructure.response_cache import ResponseCache
+from adrm.infrastructure.tracing import OtlpJsonExporter, PrometheusTextfileExporter, Tracer
+from adrm.integrations.fake_backend import parse_edit_blocks, sample_latency
 
 @pytest.fixture
 def mock_logger():
@@ -52,4 +59,478 @@ class TestAiderClient:
             "README.md"
         ]
         filtered = client._filter_files(files)
-        assert filtered == ["src/main.py"] 
\ No newline at end of file
+        assert filtered == ["src/main.py"]
+
+class TestCoderPool:
+    def test_reuses_coder_for_same_key(self):
+        factory = Mock(side_effect=lambda key: Mock(abs_fnames={"/repo/a.py"}))
+        pool = CoderPool(factory, max_size=2)
+        key = ("editblock", "test-model", ("a.py",))
+
+        with pool.lease(key) as first:
+            first.cur_messages = ["stale"]
+            first.abs_fnames.add("/repo/extra.py")
+        with pool.lease(key) as second:
+            assert second is first
+            assert second.cur_messages == []
+            assert second.abs_fnames == {"/repo/a.py"}
+
+        assert factory.call_count == 1
+        assert pool.stats.as_dict()["hits"] == 1
+        assert pool.stats.as_dict()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        pool = CoderPool(lambda key: Mock(abs_fnames=set()), max_size=2)
+        for name in ("a.py", "b.py", "c.py"):
+            with pool.lease(("editblock", "m", (name,))):
+                pass
+
+        assert len(pool) == 2
+        assert pool.stats.evictions == 1
+        with pool.lease(("editblock", "m", ("a.py",))):
+            pass
+        assert pool.stats.misses == 4
+
+    def test_discards_coder_after_failed_run(self):
+        pool = CoderPool(lambda key: Mock(abs_fnames=set()), max_size=2)
+        key = ("editblock", "m", ("a.py",))
+        with pytest.raises(RuntimeError):
+            with pool.lease(key) as failed:
+                raise RuntimeError("model error")
+
+        assert len(pool) == 0
+        with pool.lease(key) as fresh:
+            assert fresh is not failed
+        assert len(pool) == 1
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_replays_recorded_edits(self, tmp_path, test_config, mock_logger, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "app.py").write_text("x = 1\n")
+        config = test_config.model_copy(update={
+            "response_cache": test_config.response_cache.model_copy(update={"enabled": True})
+        })
+
+        def edit(prompt):
+            (tmp_path / "app.py").write_text("x = 2\n")
+
+        with patch("aider.coders.EditBlockCoder.create") as mock_create:
+            mock_create.return_value = Mock(run=Mock(side_effect=edit))
+            client = AiderClient(config, mock_logger)
+            await client.execute_prompt("bump", ["app.py"])
+
+            (tmp_path / "app.py").write_text("x = 1\n")
+            await client.execute_prompt("bump", ["app.py"])
+            client.close()
+
+        assert mock_create.return_value.run.call_count == 1
+        assert (tmp_path / "app.py").read_text() == "x = 2\n"
+        assert client.response_cache.stats.hits == 1
+
+    def test_ttl_and_size_eviction(self, tmp_path):
+        cache = ResponseCache(tmp_path / "responses.sqlite", tmp_path, ttl_seconds=60, max_bytes=200)
+        cache.put("old", {"a.py": "a" * 10}, 1.0)
+        cache._db.execute("UPDATE responses SET created_at = 0 WHERE key = 'old'")
+        assert cache.get("old") is None
+
+        contents = [os.urandom(60).hex() for _ in range(5)]
+        for index, content in enumerate(contents):
+            cache.put(f"k{index}", {"a.py": content}, 0.5)
+        assert cache.get("k0") is None
+        assert cache.get("k4").edits == {"a.py": contents[4]}
+        assert cache.stats.saved_seconds == 0.5
+        cache.close()
+
+class TestFakeBackend:
+    @pytest.mark.asyncio
+    async def test_runs_without_api_key(self, tmp_path, mock_logger, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("ADRM_API_KEY", raising=False)
+        (tmp_path / "app.py").write_text("x = 1\n")
+        (tmp_path / "responses.json").write_text(json.dumps([{
+            "match": "bump",
+            "response": "app.py\n<<<<<<< SEARCH\nx = 1\n=======\nx = 2\n>>>>>>> REPLACE\n"
+        }]))
+        config = AiderConfig(
+            model_name="fake-model",
+            backend="fake",
+            fake=FakeBackendConfig(latency_ms=0, tokens_per_second=1e6, responses_file=str(tmp_path / "responses.json"))
+        )
+        client = AiderClient(config, mock_logger)
+        await client.execute_prompt("please bump x", ["app.py"])
+        await client.execute_prompt("something else", ["app.py"])
+        client.close()
+
+        assert (tmp_path / "app.py").read_text().startswith("x = 2\n# adrm-fake ")
+
+    @pytest.mark.asyncio
+    async def test_step_runner_needs_no_api_key(self, tmp_path, mock_logger, monkeypatch):
+        from adrm.core.models import ConfigModel, Step
+        from adrm.infrastructure.file_context import FileContextHandler
+        from adrm.services.step_runner import StepRunner
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "app.py").write_text("x = 1\n")
+        config = ConfigModel(directories={"src": "src"}, openai_model="fake")
+        client = AiderClient(
+            AiderConfig(model_name="fake", backend="fake", fake=FakeBackendConfig(latency_ms=0, tokens_per_second=1e6)),
+            mock_logger
+        )
+        runner = StepRunner(config, mock_logger, FileContextHandler(config=config.file_context), client)
+        await runner.run_step(Step(prompt="Edit", files=["app.py"]))
+        client.close()
+
+        assert "adrm-fake" in (tmp_path / "app.py").read_text()
+
+    def test_parse_edit_blocks(self):
+        blocks = parse_edit_blocks(
+            "Intro\n\na.py\n<<<<<<< SEARCH\nold\n=======\nnew\n>>>>>>> REPLACE\n"
+            "b/c.py\n<<<<<<< SEARCH\n=======\nadded\n>>>>>>> REPLACE\n"
+        )
+        assert [(b.path, b.search, b.replace) for b in blocks] == [
+            ("a.py", "old\n", "new\n"),
+            ("b/c.py", "", "added\n")
+        ]
+
+    def test_latency_distribution_mean(self):
+        import random
+        config = FakeBackendConfig(latency_ms=100, latency_jitter_ms=30, distribution="lognormal")
+        rng = random.Random(1)
+        samples = [sample_latency(config, rng) for _ in range(5000)]
+        assert abs(sum(samples) / len(samples) - 0.1) < 0.005
+
+class TestTracing:
+    @pytest.mark.asyncio
+    async def test_step_span_phases_and_exports(self, tmp_path, mock_logger, monkeypatch):
+        from adrm.core.models import ConfigModel, Step
+        from adrm.infrastructure.file_context import FileContextHandler
+        from adrm.services.step_runner import StepRunner
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "app.py").write_text("x = 1\n")
+        tracer = Tracer([
+            OtlpJsonExporter(tmp_path / "spans.jsonl"),
+            PrometheusTextfileExporter(tmp_path / "adrm.prom")
+        ])
+        config = ConfigModel(directories={"src": "src"}, openai_api_key="k")
+        client = AiderClient(
+            AiderConfig(model_name="fake", backend="fake", fake=FakeBackendConfig(latency_ms=5, tokens_per_second=1e6)),
+            mock_logger
+        )
+        runner = StepRunner(config, mock_logger, FileContextHandler(config=config.file_context), client, tracer)
+        await runner.run_step(Step(prompt="Edit", files=["app.py"]))
+        client.close()
+
+        request = json.loads((tmp_path / "spans.jsonl").read_text())
+        spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        names = {span["name"] for span in spans}
+        assert {"step", "file_resolution", "file_read", "coder_construction",
+                "time_to_first_token", "model_latency", "edit_apply"} <= names
+        step_attributes = {a["key"]: a["value"] for a in spans[0]["attributes"]}
+        assert int(step_attributes["bytes_read"]["intValue"]) == 6
+        assert int(step_attributes["completion_tokens"]["intValue"]) > 0
+        assert int(step_attributes["bytes_written"]["intValue"]) > 6
+
+        metrics = (tmp_path / "adrm.prom").read_text()
+        assert 'adrm_steps_total{status="ok"} 1' in metrics
+        assert 'adrm_phase_count_total{phase="model_latency"} 1' in metrics
+
+class TestOutputPipeline:
+    def test_slow_renderer_coalesces_without_blocking(self):
+        import io
+        import threading
+        from adrm.infrastructure.output_pipeline import OutputPipeline, PlainRenderer
+
+        release = threading.Event()
+
+        class BlockedRenderer(PlainRenderer):
+            def render(self, updates):
+                release.wait(10)
+                super().render(updates)
+
+        output = io.StringIO()
+        pipeline = OutputPipeline(BlockedRenderer(output), min_interval=0)
+        stream = pipeline.open_stream("step-1")
+
+        def produce():
+            text = ""
+            for index in range(200):
+                text += f"line {index}\n"
+                stream.update(text)
+            stream.update(text + "tail", final=True)
+
+        # The renderer cannot make progress until released, so the producer
+        # only finishes if submitting never waits on it
+        producer = threading.Thread(target=produce)
+        producer.start()
+        producer.join(5)
+        assert not producer.is_alive()
+        release.set()
+        pipeline.close()
+
+        assert pipeline.stats.coalesced > 150
+        lines = output.getvalue().splitlines()
+        assert lines[0] == "[step-1] line 0"
+        assert lines[-1] == "[step-1] tail"
+        assert len(lines) == 201
+
+    @pytest.mark.asyncio
+    async def test_fake_coder_streams_through_pipeline_io(self, tmp_path, mock_logger, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "app.py").write_text("x = 1\n")
+        config = AiderConfig(
+            model_name="fake",
+            backend="fake",
+            output_mode="plain",
+            fake=FakeBackendConfig(latency_ms=0, tokens_per_second=1e6)
+        )
+        client = AiderClient(config, mock_logger)
+        await client.execute_prompt("Edit", ["app.py"])
+        client.close()
+
+        out = capsys.readouterr().out
+        assert client.output.mode == "plain"
+        assert "[response 1] Synthetic response" in out
+        assert "[response 1] app.py" in out
+
+class TestRateGovernor:
+    def test_token_bucket_paces_requests(self):
+        from adrm.infrastructure.rate_governor import TokenBucket
+
+        bucket = TokenBucket(per_minute=600)
+        start = time.monotonic()
+        waited = sum(bucket.acquire(1) for _ in range(605))
+        assert waited >= 0.4
+        assert time.monotonic() - start >= 0.4
+
+    def test_retries_throttled_calls_and_halves_concurrency(self, monkeypatch):
+        from adrm.core.models import RateLimitConfig
+        from adrm.infrastructure import rate_governor
+        from adrm.integrations.fake_backend import FakeRateLimitError
+
+        sleeps = []
+        monkeypatch.setattr(rate_governor.time, "sleep", sleeps.append)
+        governor = rate_governor.ModelGovernor("m", RateLimitConfig(initial_concurrency=8, backoff_base_seconds=2))
+        outcomes = iter([FakeRateLimitError(), FakeRateLimitError(), "ok"])
+
+        def flaky():
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert governor.call(flaky) == "ok"
+        assert governor.stats.retries == 2 and governor.stats.throttled == 2
+        assert 0 <= sleeps[0] <= 2 and 0 <= sleeps[1] <= 4
+        assert 2 <= governor.limiter.limit < 3
+        assert governor.limiter.inflight == 0
+
+        with pytest.raises(ValueError):
+            governor.call(lambda: (_ for _ in ()).throw(ValueError("bad request")))
+        assert governor.stats.failures == 1
+
+    def test_stream_is_not_retried_after_first_chunk(self, monkeypatch):
+        from adrm.core.models import RateLimitConfig
+        from adrm.infrastructure import rate_governor
+        from adrm.integrations.fake_backend import FakeRateLimitError
+
+        monkeypatch.setattr(rate_governor.time, "sleep", lambda seconds: None)
+        governor = rate_governor.ModelGovernor("m", RateLimitConfig())
+
+        def broken_stream():
+            yield "partial"
+            raise FakeRateLimitError()
+
+        chunks = []
+        with pytest.raises(FakeRateLimitError):
+            for chunk in governor.stream(broken_stream):
+                chunks.append(chunk)
+        assert chunks == ["partial"]
+        assert governor.stats.retries == 0 and governor.limiter.inflight == 0
+
+    def test_stream_without_retry_leaves_retrying_to_the_caller(self):
+        from adrm.core.models import RateLimitConfig
+        from adrm.infrastructure import rate_governor
+        from adrm.integrations.fake_backend import FakeRateLimitError
+
+        governor = rate_governor.ModelGovernor("m", RateLimitConfig(initial_concurrency=8))
+        attempts = []
+
+        def throttled():
+            attempts.append(1)
+            raise FakeRateLimitError()
+            yield
+
+        with pytest.raises(FakeRateLimitError):
+            list(governor.stream(throttled, retry=False))
+        assert len(attempts) == 1
+        assert governor.stats.retries == 0 and governor.stats.throttled == 1
+        assert governor.limiter.limit == 4 and governor.limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_fake_429s_do_not_fail_steps(self, tmp_path, mock_logger, monkeypatch):
+        import asyncio
+        from adrm.core.models import RateLimitConfig
+
+        monkeypatch.chdir(tmp_path)
+        for index in range(6):
+            (tmp_path / f"m{index}.py").write_text("x = 1\n")
+        config = AiderConfig(
+            model_name="fake-throttled",
+            backend="fake",
+            output_mode="none",
+            fake=FakeBackendConfig(latency_ms=0, tokens_per_second=1e6, rate_limit_error_rate=0.5, seed=3),
+            rate_limits=RateLimitConfig(backoff_base_seconds=0.001, max_retries=20)
+        )
+        clients = [AiderClient(config, mock_logger) for _ in range(2)]
+        await asyncio.gather(*[
+            clients[index % 2].execute_prompt("Edit", [f"m{index}.py"]) for index in range(6)
+        ])
+        for client in clients:
+            client.close()
+
+        assert clients[0].governor is clients[1].governor
+        assert clients[0].governor.stats.retries > 0
+        assert all("adrm-fake" in (tmp_path / f"m{index}.py").read_text() for index in range(6))
+
+class TestSymbolIndex:
+    def test_reparses_only_changed_contents(self, tmp_path):
+        from aider.repomap import Tag
+        from adrm.infrastructure.symbol_index import SymbolIndex
+
+        parsed = []
+
+        class StubRepoMap:
+            def get_tags_raw(self, fname, rel_fname):
+                parsed.append(rel_fname)
+                content = Path(fname).read_text()
+                return [Tag(rel_fname, fname, 0, content.split()[1], "def")]
+
+        (tmp_path / "a.py").write_text("def alpha(): pass\n")
+        (tmp_path / "b.py").write_text("def alpha(): pass\n")
+        repo_map = StubRepoMap()
+        index = SymbolIndex(tmp_path / "symbols.sqlite", namespace="test")
+        index.install(repo_map)
+
+        first = repo_map.get_tags(str(tmp_path / "a.py"), "a.py")
+        repo_map.get_tags(str(tmp_path / "a.py"), "a.py")
+        shared = repo_map.get_tags(str(tmp_path / "b.py"), "b.py")
+        assert parsed == ["a.py"]
+        assert first[0].name == "alpha():" and shared[0].rel_fname == "b.py"
+        assert len(repo_map.TAGS_CACHE) == 1
+
+        (tmp_path / "a.py").write_text("def beta(): pass\n")
+        assert repo_map.get_tags(str(tmp_path / "a.py"), "a.py")[0].name == "beta():"
+        assert parsed == ["a.py", "a.py"]
+        index.close()
+
+        reopened = SymbolIndex(tmp_path / "symbols.sqlite", namespace="test")
+        reopened.install(repo_map)
+        repo_map.get_tags(str(tmp_path / "b.py"), "b.py")
+        assert parsed == ["a.py", "a.py"]
+        assert reopened.stats.reused == 1 and reopened.stats.parsed == 0
+        reopened.close()
+
+class TestCommitBatcher:
+    @pytest.mark.asyncio
+    async def test_every_n_policy_batches_step_edits(self, tmp_path, mock_logger, monkeypatch):
+        import git
+
+        monkeypatch.chdir(tmp_path)
+        repo = git.Repo.init(tmp_path)
+        with repo.config_writer() as writer:
+            writer.set_value("user", "name", "Test")
+            writer.set_value("user", "email", "test@example.com")
+        for index in range(3):
+            (tmp_path / f"m{index}.py").write_text("x = 1\n")
+        (tmp_path / "gone.py").write_text("y = 1\n")
+        repo.index.add(["m0.py", "m1.py", "m2.py", "gone.py"])
+        repo.index.commit("initial")
+
+        config = AiderConfig(
+            model_name="fake-commits",
+            backend="fake",
+            output_mode="none",
+            commit_policy="every_n",
+            commit_every=2,
+            fake=FakeBackendConfig(latency_ms=0, tokens_per_second=1e6)
+        )
+        client = AiderClient(config, mock_logger)
+        for index in range(3):
+            await client.execute_prompt(f"Edit module {index}", [f"m{index}.py"])
+        assert len(list(repo.iter_commits())) == 2
+
+        (tmp_path / "gone.py").unlink()
+        client.commits.record(["gone.py"], "Delete gone")
+        client.close()
+
+        commits = list(repo.iter_commits())
+        assert len(commits) == 3
+        assert commits[1].message.startswith("adrm: apply 2 steps\n\n- Edit module 0")
+        assert commits[0].message.startswith("adrm: apply 2 steps\n\n- Edit module 2\n- Delete gone")
+        assert "gone.py" not in [item.path for item in commits[0].tree.traverse()]
+        assert not repo.is_dirty()
+        assert client.commits.stats.commits == 2 and client.commits.stats.steps == 4
+
+    @pytest.mark.asyncio
+    async def test_commits_coder_root_paths_without_staged_changes(self, tmp_path, mock_logger, monkeypatch):
+        import git
+
+        repo = git.Repo.init(tmp_path)
+        with repo.config_writer() as writer:
+            writer.set_value("user", "name", "Test")
+            writer.set_value("user", "email", "test@example.com")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "a.py").write_text("a = 1\n")
+        (tmp_path / "staged.py").write_text("s = 1\n")
+        repo.index.add(["sub/a.py", "staged.py"])
+        repo.index.commit("initial")
+        (tmp_path / "staged.py").write_text("s = 2\n")
+        repo.index.add(["staged.py"])
+        elsewhere = tmp_path.parent / f"{tmp_path.name}-cwd"
+        elsewhere.mkdir()
+        monkeypatch.chdir(elsewhere)
+
+        def edit(prompt):
+            (tmp_path / "sub" / "a.py").write_text("a = 2\n")
+
+        # Aider reports edits relative to the git root, above the working directory
+        coder = Mock(root=str(tmp_path), aider_edited_files={"sub/a.py"}, run=Mock(side_effect=edit))
+        config = AiderConfig(model_name="test-model", api_key="test-key", commit_policy="workflow", output_mode="none")
+        with patch("aider.coders.EditBlockCoder.create", return_value=coder):
+            client = AiderClient(config, mock_logger, working_dir=tmp_path / "sub")
+            await client.execute_prompt("Bump a", ["a.py"])
+            client.close()
+
+        head = repo.head.commit
+        assert head.message == "adrm: Bump a"
+        assert (head.tree / "sub/a.py").data_stream.read() == b"a = 2\n"
+        assert (head.tree / "staged.py").data_stream.read() == b"s = 1\n"
+        assert [diff.a_path for diff in repo.index.diff("HEAD")] == ["staged.py"]
+
+    def test_failed_commit_keeps_pending_edits(self, tmp_path, monkeypatch):
+        import git
+        from adrm.infrastructure.commit_batcher import CommitBatcher
+
+        repo = git.Repo.init(tmp_path)
+        with repo.config_writer() as writer:
+            writer.set_value("user", "name", "Test")
+            writer.set_value("user", "email", "test@example.com")
+        (tmp_path / "a.py").write_text("a = 1\n")
+        repo.index.add(["a.py"])
+        repo.index.commit("initial")
+        (tmp_path / "a.py").write_text("a = 2\n")
+
+        batcher = CommitBatcher(tmp_path)
+        batcher.record(["a.py"], "Bump a")
+        write_commit = batcher._write_commit
+        monkeypatch.setattr(batcher, "_write_commit", Mock(side_effect=OSError("index.lock exists")))
+        with pytest.raises(OSError):
+            batcher.flush()
+        monkeypatch.setattr(batcher, "_write_commit", write_commit)
+
+        assert batcher.flush() == repo.head.commit.hexsha
+        assert repo.head.commit.message == "adrm: Bump a"
+        assert (repo.head.commit.tree / "a.py").data_stream.read() == b"a = 2\n"
+        assert batcher.flush() is None
@@ -1,11 +1,24 @@
+import os
 import pytest
+import subprocess
+import sys
 from pathlib import Path
+from unittest.mock import AsyncMock, Mock
 import json
 import structlog
 from rich.console import Console
-from adrm.core.models import ConfigModel, Step
+from adrm.bench.synthetic import make_repo
+from adrm.core.checkpoint import CheckpointJournal
+from adrm.core.config_loader import ConfigLoader
+from adrm.core.models import ConfigModel, FileContextConfig, Step
 from adrm.infrastructure.file_handlers import LocalFileHandler as StandardFileHandler
+from adrm.infrastructure.file_index import FileIndex
+from adrm.infrastructure.import_profile import parse_importtime
+from adrm.infrastructure.lazy_context import build_lazy_content
+from adrm.infrastructure.path_matcher import PathMatcher
+from adrm.infrastructure.snapshot_cache import FileSnapshotCache
 from adrm.services.standards import FileSystemStandardsGenerator
+from adrm.services.context_packer import ContextPacker
 from adrm.services.initializer import ProjectInitializer
 from adrm.services.step_runner import StepRunner
 from pydantic import ValidationError
@@ -39,6 +52,119 @@ class TestStandardFileHandler:
         handler.write("test")
         assert nested_file.exists()
 
+    def test_batch_coalesces_and_dedups_writes(self, temp_dir, monkeypatch):
+        handler = StandardFileHandler(temp_dir / "a.txt", max_cache_entries=2)
+        replaced = []
+        real_replace = os.replace
+        monkeypatch.setattr(os, "replace", lambda src, dst: replaced.append(dst) or real_replace(src, dst))
+
+        with handler.batch():
+            handler.write("first")
+            handler.write("second")
+            assert handler.read() == "second"
+            assert not (temp_dir / "a.txt").exists()
+        assert replaced == [temp_dir / "a.txt"]
+
+        handler.write("second")
+        assert len(replaced) == 1
+
+        for name in ("b.txt", "c.txt"):
+            handler.handle(temp_dir / name, "x")
+        handler.write("second")
+        assert len(replaced) == 4
+        assert list(temp_dir.glob(".*.tmp")) == []
+
+    def test_overlapping_batches_flush_their_own_writes(self, temp_dir):
+        import threading
+
+        handler = StandardFileHandler()
+        b_opened, a_closed = threading.Event(), threading.Event()
+
+        def step_b():
+            with handler.batch():
+                handler.handle(temp_dir / "b.txt", "b")
+                b_opened.set()
+                a_closed.wait(5)
+            assert (temp_dir / "b.txt").exists()
+
+        thread = threading.Thread(target=step_b)
+        thread.start()
+        b_opened.wait(5)
+        with handler.batch():
+            handler.handle(temp_dir / "a.txt", "a")
+        assert (temp_dir / "a.txt").exists()
+        assert not (temp_dir / "b.txt").exists()
+        a_closed.set()
+        thread.join()
+        assert (temp_dir / "b.txt").read_text() == "b"
+
+    def test_background_flush(self, temp_dir):
+        handler = StandardFileHandler(background=True)
+        with handler.batch():
+            for index in range(3):
+                handler.handle(temp_dir / "nested" / f"{index}.txt", str(index))
+        handler.close()
+        assert sorted(p.read_text() for p in (temp_dir / "nested").iterdir()) == ["0", "1", "2"]
+
+class TestFileSnapshotCache:
+    def test_unchanged_file_is_served_from_cache(self, temp_dir):
+        test_file = temp_dir / "a.txt"
+        test_file.write_text("alpha")
+        cache = FileSnapshotCache()
+
+        assert cache.read_text(test_file) == "alpha"
+        assert cache.read_text(test_file) == "alpha"
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_changed_file_is_reread(self, temp_dir):
+        test_file = temp_dir / "a.txt"
+        test_file.write_text("alpha")
+        cache = FileSnapshotCache()
+        first_digest = cache.digest(test_file)
+
+        test_file.write_text("alpha, revised")
+        assert cache.read_text(test_file) == "alpha, revised"
+        assert cache.digest(test_file) != first_digest
+
+    def test_identical_contents_share_a_blob(self, temp_dir):
+        (temp_dir / "a.txt").write_text("same")
+        (temp_dir / "b.txt").write_text("same")
+        cache = FileSnapshotCache()
+        cache.read_text(temp_dir / "a.txt")
+        cache.read_text(temp_dir / "b.txt")
+
+        assert cache.stats.bytes_cached == len("same")
+
+    def test_evicts_to_byte_budget(self, temp_dir):
+        cache = FileSnapshotCache(max_bytes=10)
+        for name in ("a", "b", "c"):
+            (temp_dir / name).write_text(name * 4)
+            cache.read_text(temp_dir / name)
+
+        assert cache.stats.bytes_cached <= 10
+        assert cache.stats.evictions == 1
+
+    def test_path_entries_are_bounded(self, temp_dir):
+        cache = FileSnapshotCache(max_entries=2)
+        for name in ("a", "b", "c"):
+            (temp_dir / name).write_text(name)
+            cache.digest(temp_dir / name)
+
+        assert list(cache._entries) == [str(temp_dir / "b"), str(temp_dir / "c")]
+
+    def test_read_defers_contents_until_accessed(self, temp_dir):
+        from adrm.infrastructure.file_context import FileContextHandler
+        (temp_dir / "a.txt").write_text("alpha")
+        cache = FileSnapshotCache()
+        handler = FileContextHandler(cache, FileContextConfig(use_index=False), working_dir=temp_dir)
+        content = handler.read(["a.txt"])
+
+        assert list(content) == ["a.txt"]
+        assert cache.stats.misses == 0
+        assert content["a.txt"] == "alpha"
+        assert cache.stats.misses == 1
+
 class TestFileSystemStandardsGenerator:
     def test_create_implementation_standards(self, temp_dir, test_config, test_logger):
         test_config.directories["standards"] = str(temp_dir)
@@ -58,6 +184,45 @@ class TestFileSystemStandardsGenerator:
         assert expected_file.exists()
         assert expected_file.read_text() == "Test performance"
 
+    def test_create_standards_generates_and_flushes_once(self, temp_dir, test_logger):
+        config = ConfigModel(
+            directories={"standards": "standards"},
+            files={"test": "test"},
+            file_extensions={"standards": ".md"}
+        )
+        file_handler = StandardFileHandler()
+        file_handler._commit = Mock(wraps=file_handler._commit)
+        prompts = []
+
+        def content_source(prompt):
+            prompts.append(prompt)
+            return f"# {prompt}"
+
+        generator = FileSystemStandardsGenerator(
+            config,
+            test_logger,
+            file_handler,
+            content_source=content_source,
+            base_path=temp_dir
+        )
+        written = generator.create_standards(
+            ["python", "rust", "python"],
+            contents={("rust", "performance"): "Given"}
+        )
+
+        assert len(written) == 4
+        assert len(prompts) == 3
+        assert file_handler._commit.call_count == 1
+        assert (temp_dir / "standards" / "rust_performance_standards.md").read_text() == "Given"
+        assert "python" in (temp_dir / "standards" / "python_performance_standards.md").read_text()
+
+        (temp_dir / "standards" / "python_implementation_standards.md").write_text("Edited")
+        assert generator.create_standards(["python", "rust"]) == []
+        assert len(prompts) == 3
+        assert (temp_dir / "standards" / "python_implementation_standards.md").read_text() == "Edited"
+        assert len(generator.create_standards(["python"], overwrite=True)) == 2
+        assert len(prompts) == 5
+
 class TestStepRunner:
     def test_run_step_validation(self, test_config, test_logger):
         runner = StepRunner(test_config, test_logger)
@@ -181,9 +346,11 @@ def test_project_initializer_with_valid_config(temp_dir, test_logger, test_conso
     result = initializer.initialize("test-model", "test-key")
     assert result is None
 
-def test_file_system_standards_generator_with_invalid_directory(test_logger):
+def test_file_system_standards_generator_with_invalid_directory(test_logger, tmp_path):
+    # Missing directories are created; one that cannot be (here under a file) fails
+    (tmp_path / "not_a_directory").write_text("")
     config = ConfigModel(
-        directories={"standards": "/nonexistent/path"},
+        directories={"standards": str(tmp_path / "not_a_directory" / "standards")},
         files={"test": "test"},
         model={"test": "test"},
         io={"test": "test"},
@@ -194,3 +361,416 @@ def test_file_system_standards_generator_with_invalid_directory(test_logger):
     
     with pytest.raises(RuntimeError, match="Failed to create standards"):
         generator.create_implementation_standards("python", "Test standards")
+
+    config.directories["standards"] = str(tmp_path / "missing" / "standards")
+    generator.create_implementation_standards("python", "Test standards")
+    assert (tmp_path / "missing" / "standards" / "python_implementation_standards.md").read_text() == "Test standards"
+
+class TestAsyncStepRunner:
+    @pytest.mark.asyncio
+    async def test_run_step_awaits_client(self, tmp_path):
+        config = ConfigModel(
+            directories={"test": "test"},
+            files={"test": "test"}
+        )
+        file_handler = Mock()
+        file_handler.resolve.return_value = ["a.py"]
+        file_handler.read.return_value = {"a.py": "print('a')"}
+        client = Mock()
+        client.execute_prompt = AsyncMock()
+        runner = StepRunner(config, Mock(), file_handler, client)
+
+        await runner.run_step(Step(prompt="Test prompt", files=["a.py"], model_name="m", api_key="k"))
+
+        file_handler.resolve.assert_called_once_with(["a.py"])
+        file_handler.read.assert_called_once_with(["a.py"])
+        client.execute_prompt.assert_awaited_once_with("Test prompt", ["a.py"], [])
+
+class TestLazyFileContent:
+    def test_skips_binary_and_oversized_files(self, temp_dir):
+        (temp_dir / "small.py").write_text("print('hi')\n")
+        (temp_dir / "image.bin").write_bytes(b"\x89PNG\0\0data")
+        (temp_dir / "big.txt").write_text("x" * 200)
+
+        content = build_lazy_content(
+            temp_dir,
+            ["small.py", "image.bin", "big.txt"],
+            max_file_bytes=100
+        )
+
+        assert list(content) == ["small.py"]
+        assert dict(content.skipped) == {"image.bin": "binary", "big.txt": "oversized"}
+        assert content["small.py"] == "print('hi')\n"
+
+    def test_step_budget_and_chunked_decoding(self, temp_dir):
+        (temp_dir / "a.txt").write_text("é" * 50)
+        (temp_dir / "b.txt").write_text("b" * 50)
+
+        content = build_lazy_content(temp_dir, ["a.txt", "b.txt"], max_step_bytes=120)
+
+        assert list(content) == ["a.txt"]
+        assert "".join(content.iter_text("a.txt", chunk_bytes=7)) == "é" * 50
+
+class TestFileIndex:
+    @pytest.fixture
+    def tree(self, temp_dir):
+        for rel_path in ["a.py", "src/b.py", "src/pkg/c.py", "src/pkg/d.txt", ".hidden/e.py", "build/f.py"]:
+            (temp_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (temp_dir / rel_path).write_text(rel_path)
+        (temp_dir / ".gitignore").write_text("build/\n")
+        return temp_dir
+
+    def test_glob_matches_glob_module_semantics(self, tree):
+        index = FileIndex(tree)
+        matches = index.glob_many(["**/*.py", "src/*.py", "src/**"])
+
+        assert matches["**/*.py"] == ["a.py", "src/b.py", "src/pkg/c.py"]
+        assert matches["src/*.py"] == ["src/b.py"]
+        assert matches["src/**"] == ["src/b.py", "src/pkg/c.py", "src/pkg/d.txt"]
+
+    def test_persisted_index_refreshes_changed_directories(self, tree):
+        index_path = tree / ".adrm" / "file_index.json"
+        FileIndex(tree, index_path).refresh()
+        assert index_path.exists()
+
+        (tree / "src" / "pkg" / "new.py").write_text("new")
+        reloaded = FileIndex(tree, index_path)
+        assert "src/pkg/new.py" in reloaded.glob("src/**/*.py")
+
+    def test_ignored_only_patterns_fall_back_to_glob(self, tree):
+        from adrm.infrastructure.file_context import FileContextHandler
+
+        handler = FileContextHandler(config=FileContextConfig(index_path=None), working_dir=tree)
+        assert handler.resolve(["build/*.py"], create_missing=False) == ["build/f.py"]
+        assert handler.resolve(["**/*.py"], create_missing=False) == ["a.py", "src/b.py", "src/pkg/c.py"]
+
+class TestPathMatcher:
+    def test_include_and_exclude(self):
+        matcher = PathMatcher(include=["*.py"], exclude=["tests/*", "*_test.py"])
+        assert matcher.filter(["src/main.py", "tests/test_main.py", "src/a_test.py", "README.md"]) == ["src/main.py"]
+
+    def test_negation_and_directory_rules(self):
+        matcher = PathMatcher(exclude=["build/", "*.log", "!keep.log", "/root.txt"])
+        assert not matcher.matches("build/out.py")
+        assert matcher.matches("src/build")
+        assert not matcher.matches("logs/debug.log")
+        assert matcher.matches("logs/keep.log")
+        assert not matcher.matches("root.txt")
+        assert matcher.matches("sub/root.txt")
+
+    def test_absolute_paths_are_matched_relative_to_root(self, temp_dir):
+        matcher = PathMatcher(exclude=["tests/**"], root=temp_dir)
+        assert not matcher.matches(str(temp_dir / "tests" / "unit" / "a.py"))
+        assert matcher.matches(str(temp_dir / "src" / "a.py"))
+
+def test_cli_import_does_not_load_aider():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, adrm.main; print('aider' in sys.modules)"],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert result.stdout.strip() == "False"
+
+def test_parse_importtime():
+    timings = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        150 |   adrm.core\n"
+        "import time:       300 |        450 | adrm\n"
+    )
+    assert [(t.module, t.cumulative_us, t.depth) for t in timings] == [("adrm.core", 150, 1), ("adrm", 450, 0)]
+
+def test_profile_startup_passes_on_command_errors(capsys):
+    from adrm.infrastructure.import_profile import profile_startup
+
+    assert profile_startup(["no-such-command"]) != 0
+    captured = capsys.readouterr()
+    assert "No such command" in captured.err
+    assert "import time:" not in captured.err
+    assert "Import time:" in captured.out
+
+class TestConfigLoader:
+    @pytest.fixture
+    def config_dir(self, temp_dir):
+        (temp_dir / "config.yaml").write_text(
+            "project:\n"
+            "  directories:\n    standards: standards\n"
+            "  files:\n    steps: steps.json\n"
+            "  file_extensions:\n    standards: .md\n"
+            "model:\n  name: gpt-4\n"
+            "aider:\n  coder:\n    type: wholefile\n"
+        )
+        (temp_dir / "aider.yaml").write_text("aider:\n  git_enabled: false\n")
+        return temp_dir
+
+    def test_merges_sources_env_and_overrides(self, config_dir):
+        loader = ConfigLoader(config_dir, environ={"ADRM_API_KEY": "secret", "ADRM__MAX_PARALLEL_STEPS": "2"})
+        loaded = loader.load({"openai_model": "gpt-4o"})
+
+        assert loaded.config.max_parallel_steps == 2
+        assert loaded.config.openai_model == "gpt-4o"
+        assert loaded.aider.model_name == "gpt-4o"
+        assert loaded.aider.api_key == "secret"
+        assert loaded.aider.coder.type == "wholefile"
+        assert loaded.aider.git_enabled is False
+
+    def test_cache_skips_yaml_and_omits_secrets(self, config_dir):
+        cache_path = config_dir / "cache" / "config.json"
+        loader = ConfigLoader(config_dir, cache_path, environ={"ADRM_API_KEY": "secret"})
+
+        assert not loader.load().cache_hit
+        cached = loader.load()
+        assert cached.cache_hit
+        assert cached.aider.api_key == "secret"
+        assert b"secret" not in cache_path.read_bytes()
+
+        (config_dir / "aider.yaml").write_text("aider:\n  git_enabled: true\n")
+        reloaded = loader.load()
+        assert not reloaded.cache_hit
+        assert reloaded.aider.git_enabled is True
+
+        env_loader = ConfigLoader(config_dir, cache_path, environ={"ADRM__OPENAI_API_KEY": "env-secret"})
+        assert env_loader.load().aider.api_key == "env-secret"
+        from_cache = env_loader.load({"openai_api_key": "cli-secret"})
+        assert from_cache.cache_hit and from_cache.config.openai_api_key == "cli-secret"
+        assert b"secret" not in cache_path.read_bytes()
+
+        (config_dir / "aider.yaml").write_text("model:\n  api_key: yaml-secret\n")
+        assert ConfigLoader(config_dir, cache_path, environ={}).load().aider.api_key == "yaml-secret"
+        assert not ConfigLoader(config_dir, cache_path, environ={}).load().cache_hit
+        assert b"secret" not in cache_path.read_bytes()
+
+class TestCheckpointJournal:
+    def test_journal_survives_reload(self, temp_dir):
+        journal = CheckpointJournal(temp_dir / "journal.jsonl")
+        journal.record_state("config_loaded")
+        journal.record_step("build", "hash", {"a.py": "1"})
+        with open(journal.path, "a") as handle:
+            handle.write('{"type": "step", "key"')
+
+        reloaded = CheckpointJournal(journal.path).load()
+        assert reloaded.state == "config_loaded"
+        assert reloaded.is_complete("build", "hash", {"a.py": "1"})
+        assert not reloaded.is_complete("build", "hash", {"a.py": "2"})
+        assert not reloaded.is_complete("build", "other", {"a.py": "1"})
+
+    def test_checkpoints_survive_moving_the_repository(self, temp_dir):
+        from adrm.core.checkpoint import journal_path, prompt_hash
+
+        def located(root):
+            step = Step(prompt="Refactor", files=[str(root / "src/a.py"), "b.py"])
+            return prompt_hash(step, root), journal_path(root, root / "steps.json")
+
+        first, second = located(temp_dir / "one"), located(temp_dir / "two")
+        assert first[0] == second[0]
+        assert first[1].name == second[1].name
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_unchanged_steps(self, temp_dir, test_logger, test_console, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        (temp_dir / "steps.json").write_text(json.dumps([
+            {"id": "one", "prompt": "First", "files": ["a.py"]},
+            {"id": "two", "prompt": "Second", "files": ["b.py"]}
+        ]))
+        config = ConfigModel(directories={"src": "src"}, files={"steps": "steps.json"})
+        digests = {"a.py": {"a.py": "1"}, "b.py": {"b.py": "1"}}
+        step_runner = Mock()
+        step_runner.run_step = AsyncMock()
+        step_runner.input_digests.side_effect = lambda step: digests[Path(step.files[0]).name]
+        api_key = "k" * 20
+
+        def make_initializer():
+            return ProjectInitializer(config, Mock(), test_logger, test_console, step_runner)
+
+        await make_initializer().initialize("test-model", api_key)
+        assert step_runner.run_step.await_count == 2
+
+        step_runner.run_step.reset_mock()
+        digests["b.py"] = {"b.py": "2"}
+        initializer = make_initializer()
+        await initializer.initialize("test-model", api_key, resume=True)
+        assert [call.args[0].id for call in step_runner.run_step.await_args_list] == ["two"]
+        assert initializer.state.state == "completed"
+
+        step_runner.run_step.reset_mock()
+        await make_initializer().initialize("test-model", api_key)
+        assert step_runner.run_step.await_count == 2
+
+def test_synthetic_repo_layout(temp_dir):
+    paths = make_repo(temp_dir, 120)
+    assert len(paths) == len(set(paths)) == 120
+    assert sum(1 for path in temp_dir.rglob("module*") if path.is_file()) == 120
+    assert make_repo(temp_dir, 120) == paths
+
+class TestContextPacker:
+    def test_ranks_by_relevance_within_budget(self, temp_dir):
+        files = {
+            "billing/invoice.py": "def invoice_total(invoice):\n    return sum(invoice.lines)\n",
+            "billing/tax.py": "def tax_rate(region):\n    return 0.2\n" * 20,
+            "util/strings.py": "def slug(text):\n    return text.lower()\n" * 200,
+            "README.md": "readme",
+        }
+        for name, content in files.items():
+            (temp_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            (temp_dir / name).write_text(content)
+        config = FileContextConfig(token_budget=300, read_only_token_budget=1000)
+        packer = ContextPacker(FileSnapshotCache(), config, temp_dir)
+
+        packed = packer.pack("Fix the invoice total rounding", files, pinned=["README.md"])
+
+        assert packed.editable[:2] == ["README.md", "billing/invoice.py"]
+        assert "billing/tax.py" in packed.editable + packed.read_only
+        assert packed.omitted == ["util/strings.py"]
+        assert packed.tokens_saved > 0
+        assert packed.tokens_total == packed.tokens_packed + packed.tokens_saved
+
+        calls = []
+        packer.profile("billing/tax.py", lambda: calls.append(1) or "")
+        assert calls == []
+
+def test_fanout_runs_each_repository(temp_dir):
+    from adrm.services.fanout import read_repo_list, run_fanout, shared_config
+
+    config_dir = temp_dir / "config"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text(
+        "project:\n  directories:\n    docs: docs\nmodel:\n  name: fake\n  api_key: fake-key\n"
+        "aider:\n  backend: fake\n  chat_history_file: null\n"
+        "  fake:\n    latency_ms: 0\n    tokens_per_second: 1000000\n"
+    )
+    (temp_dir / "steps.json").write_text(json.dumps([{"prompt": "Touch", "files": ["app.py"]}]))
+    for name in ("one", "two"):
+        (temp_dir / name).mkdir()
+        (temp_dir / name / "app.py").write_text("x = 1\n")
+    (temp_dir / "repos.txt").write_text("one\n# skipped\ntwo\nmissing\n")
+
+    repos = read_repo_list(temp_dir / "repos.txt")
+    loaded = shared_config(ConfigLoader(config_dir).load(), temp_dir / "steps.json", temp_dir)
+    outcome = run_fanout(repos, loaded, jobs=2)
+
+    assert [result.status for result in outcome.results] == ["ok", "ok", "failed"]
+    assert "adrm-fake" in (temp_dir / "one" / "app.py").read_text()
+    assert (temp_dir / "two" / "docs").is_dir()
+    assert outcome.as_dict()["failed"] == 1
+
+def test_fanout_skips_files_missing_from_a_repository(temp_dir):
+    from adrm.services.fanout import run_fanout, shared_config
+
+    config_dir = temp_dir / "config"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text(
+        "model:\n  name: fake\n  api_key: fake-key\n"
+        "aider:\n  backend: fake\n  chat_history_file: null\n"
+        "  fake:\n    latency_ms: 0\n    tokens_per_second: 1000000\n"
+    )
+    (temp_dir / "steps.json").write_text(json.dumps([{"prompt": "Touch", "files": ["app.py", "extra.py"]}]))
+    for name in ("one", "two"):
+        (temp_dir / name).mkdir()
+        (temp_dir / name / "app.py").write_text("x = 1\n")
+    (temp_dir / "one" / "extra.py").write_text("y = 1\n")
+
+    loaded = shared_config(ConfigLoader(config_dir).load(), temp_dir / "steps.json", temp_dir)
+    outcome = run_fanout([temp_dir / "one", temp_dir / "two"], loaded, jobs=2)
+
+    assert [result.status for result in outcome.results] == ["ok", "ok"]
+    assert "adrm-fake" in (temp_dir / "two" / "app.py").read_text()
+    assert not (temp_dir / "two" / "extra.py").exists()
+
+@pytest.mark.asyncio
+async def test_daemon_runs_queued_jobs(temp_dir, monkeypatch):
+    import asyncio
+    from adrm.services.daemon import AdrmDaemon, send_request
+
+    monkeypatch.chdir(temp_dir)
+    config_dir = temp_dir / "config"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text(
+        "project:\n  directories:\n    docs: docs\nmodel:\n  name: fake\n  api_key: fake-key-0123456789abcdef\n"
+        "aider:\n  backend: fake\n  chat_history_file: null\n  output_mode: none\n"
+        "  fake:\n    latency_ms: 0\n    tokens_per_second: 1000000\n"
+    )
+    (temp_dir / "steps.json").write_text(json.dumps([{"id": "touch", "prompt": "Touch", "files": ["app.py"]}]))
+    (temp_dir / "app.py").write_text("x = 1\n")
+    socket_path = temp_dir / "adrm.sock"
+
+    ready = asyncio.Event()
+    monkeypatch.setattr("typer.confirm", Mock(side_effect=AssertionError("daemon jobs must not prompt")))
+    daemon = AdrmDaemon(ConfigLoader(config_dir).load(), socket_path, concurrency=2)
+    server = asyncio.create_task(daemon.serve(ready=ready.set))
+    await asyncio.wait_for(ready.wait(), 30)
+
+    events = []
+    # Both jobs target the same tree, so they are serialized despite concurrency=2
+    workflow, step = await asyncio.gather(
+        asyncio.to_thread(
+            send_request,
+            {"op": "submit", "kind": "workflow", "steps_file": str(temp_dir / "steps.json"), "working_dir": str(temp_dir)},
+            socket_path,
+            events.append
+        ),
+        asyncio.to_thread(
+            send_request,
+            {"op": "submit", "kind": "step", "step": {"prompt": "Again", "files": ["app.py", "missing.py"]}},
+            socket_path
+        )
+    )
+    rejected = await asyncio.to_thread(send_request, {"op": "submit", "kind": "bogus"}, socket_path)
+    await asyncio.to_thread(send_request, {"op": "shutdown"}, socket_path)
+    await asyncio.wait_for(server, 30)
+
+    assert workflow["status"] == "ok" and step["status"] == "ok"
+    assert [event["event"] for event in events][:2] == ["queued", "started"]
+    assert {"event": "step", "step": "touch", "status": "done", "job": events[0]["job"]} in events
+    assert not (temp_dir / "missing.py").exists()
+    assert (temp_dir / "app.py").read_text().count("adrm-fake") == 2
+    assert rejected["event"] == "error"
+    assert not socket_path.exists()
+
+class TestWorkflowBundle:
+    def test_compile_and_load(self, temp_dir):
+        from adrm.core.workflow import bundle_path, compile_workflow, load_workflow, write_bundle
+
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "a.py").write_text("a = 1\n")
+        (temp_dir / "src" / "b.py").write_text("b = 1\n")
+        steps_file = temp_dir / "steps.json"
+        steps_file.write_text(json.dumps([
+            {"id": "lint", "prompt": "Lint", "files": ["src/*.py"], "allow_edits": False},
+            {"prompt": "Fix", "files": ["src/a.py", "missing.py"], "depends_on": ["lint"]}
+        ]))
+
+        bundle = compile_workflow(steps_file, temp_dir)
+        assert [step.id for step in bundle.workflow.steps] == ["lint", "1"]
+        assert bundle.compiled[0].matches == {"src/*.py": ["src/a.py", "src/b.py"]}
+        assert bundle.compiled[1].matches == {"src/a.py": ["src/a.py"], "missing.py": []}
+        assert bundle.compiled[1].after == ["lint"]
+        assert bundle.levels == [["lint"], ["1"]]
+
+        write_bundle(bundle, bundle_path(steps_file))
+        steps, graph = load_workflow(steps_file)
+        assert [step.id for step in steps] == ["lint", "1"]
+        assert graph.levels() == bundle.levels
+
+        for field, value in (("prompt", "Delete everything"), ("depends_on", [])):
+            compiled = json.loads(bundle_path(steps_file).read_text())
+            compiled["workflow"]["steps"][1][field] = value
+            bundle_path(steps_file).write_text(json.dumps(compiled))
+            with pytest.raises(ValueError, match="modified after compilation"):
+                load_workflow(steps_file)
+
+        write_bundle(bundle, bundle_path(steps_file))
+        steps_file.write_text(json.dumps([{"prompt": "Changed", "files": ["src/a.py"]}]))
+        with pytest.raises(ValueError, match="out of date"):
+            load_workflow(steps_file)
+
+    def test_invalid_workflows_fail_at_compile_time(self, temp_dir):
+        from adrm.core.workflow import compile_workflow
+
+        steps_file = temp_dir / "steps.json"
+        steps_file.write_text(json.dumps([{"prompt": "Fix", "files": ["a.py"], "depends_on": ["nope"]}]))
+        with pytest.raises(ValueError, match="unknown step"):
+            compile_workflow(steps_file, temp_dir)
+        steps_file.write_text(json.dumps({"name": "wf", "description": "", "steps": [{"prompt": "Fix"}]}))
+        with pytest.raises(ValueError, match="has no files"):
+            compile_workflow(steps_file, temp_dir)
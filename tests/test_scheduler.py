@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from adrm.core.models import Step
+from adrm.services.scheduler import StepGraph, StepScheduler, patterns_overlap
+
+def make_step(step_id, files, depends_on=None, allow_edits=True):
+    return Step(
+        id=step_id,
+        prompt=f"prompt {step_id}",
+        files=files,
+        depends_on=depends_on or [],
+        allow_edits=allow_edits
+    )
+
+class TestPatternsOverlap:
+    def test_literal_paths(self):
+        assert patterns_overlap("src/a.py", "src/./a.py")
+        assert not patterns_overlap("src/a.py", "src/b.py")
+
+    def test_literal_against_glob(self):
+        assert patterns_overlap("src/pkg/a.py", "src/**/*.py")
+        assert not patterns_overlap("docs/a.md", "src/**/*.py")
+
+    def test_globs_with_disjoint_prefixes(self):
+        assert patterns_overlap("src/*.py", "src/pkg/*.py")
+        assert not patterns_overlap("src/*.py", "docs/*.md")
+
+class TestStepGraph:
+    def test_disjoint_steps_share_a_level(self):
+        graph = StepGraph([
+            make_step("a", ["src/a.py"]),
+            make_step("b", ["src/b.py"]),
+            make_step("c", ["src/c.py"], depends_on=["a"])
+        ])
+        assert graph.levels() == [["a", "b"], ["c"]]
+
+    def test_conflicting_steps_keep_declared_order(self):
+        graph = StepGraph([
+            make_step("a", ["src/**/*.py"]),
+            make_step("b", ["src/pkg/mod.py"])
+        ])
+        assert graph.levels() == [["a"], ["b"]]
+
+    def test_read_only_steps_do_not_conflict(self):
+        graph = StepGraph([
+            make_step("a", ["README.md"], allow_edits=False),
+            make_step("b", ["README.md"], allow_edits=False)
+        ])
+        assert graph.levels() == [["a", "b"]]
+
+    def test_conflicts_follow_declared_dependencies(self):
+        graph = StepGraph([
+            make_step("a", ["README.md"], depends_on=["b"]),
+            make_step("b", ["README.md"])
+        ])
+        assert graph.levels() == [["b"], ["a"]]
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError, match="unknown step"):
+            StepGraph([make_step("a", ["a.py"], depends_on=["missing"])])
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match="cycle"):
+            StepGraph([
+                make_step("a", ["a.py"], depends_on=["b"]),
+                make_step("b", ["b.py"], depends_on=["a"])
+            ])
+
+class TestStepScheduler:
+    @pytest.mark.asyncio
+    async def test_runs_independent_steps_concurrently(self):
+        active = 0
+        peak = 0
+        finished = []
+
+        async def execute(step):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            finished.append(step.id)
+
+        steps = [make_step(str(i), [f"file{i}.py"]) for i in range(6)]
+        await StepScheduler(max_parallel=3).run(steps, execute)
+
+        assert peak == 3
+        assert sorted(finished) == [str(i) for i in range(6)]
+
+    @pytest.mark.asyncio
+    async def test_dependents_wait_and_failures_propagate(self):
+        started = []
+
+        async def execute(step):
+            started.append(step.id)
+            if step.id == "a":
+                raise RuntimeError("boom")
+
+        steps = [
+            make_step("a", ["a.py"]),
+            make_step("b", ["b.py"], depends_on=["a"])
+        ]
+        with pytest.raises(RuntimeError, match="boom"):
+            await StepScheduler(max_parallel=2).run(steps, execute)
+        assert started == ["a"]